@@ -0,0 +1,56 @@
+"""Notification outbox
+
+Revision ID: 0002_notification_outbox
+Revises: 0001_initial_schema
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_notification_outbox"
+down_revision: Union[str, None] = "0001_initial_schema"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("batch_id", sa.String(length=32), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.Column("chat_id", sa.BigInteger(), nullable=False),
+        sa.Column("kind", sa.Enum("assignment", "summary", name="outbox_kind"), nullable=False),
+        sa.Column("label", sa.String(), nullable=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("pending", "sent", "dead", name="outbox_status"),
+            nullable=False,
+            server_default="pending",
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_notification_outbox_status_next_attempt",
+        "notification_outbox",
+        ["status", "next_attempt_at"],
+    )
+    op.create_index("ix_notification_outbox_batch", "notification_outbox", ["batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_outbox_batch", table_name="notification_outbox")
+    op.drop_index("ix_notification_outbox_status_next_attempt", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
+    op.execute("DROP TYPE IF EXISTS outbox_status")
+    op.execute("DROP TYPE IF EXISTS outbox_kind")
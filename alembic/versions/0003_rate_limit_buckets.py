@@ -0,0 +1,30 @@
+"""Rate limit buckets
+
+Revision ID: 0003_rate_limit_buckets
+Revises: 0002_notification_outbox
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_rate_limit_buckets"
+down_revision: Union[str, None] = "0002_notification_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.String(length=128), primary_key=True),
+        sa.Column("tat", sa.Float(), nullable=False),
+        sa.Column("allowed", sa.Boolean(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
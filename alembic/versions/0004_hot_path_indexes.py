@@ -0,0 +1,37 @@
+"""Indexes for group-scoped lookups
+
+Revision ID: 0004_hot_path_indexes
+Revises: 0003_rate_limit_buckets
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_hot_path_indexes"
+down_revision: Union[str, None] = "0003_rate_limit_buckets"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # assignments.group_id is already the leading column of uq_assignments_group_giver.
+    op.create_index(
+        "ix_group_participants_group_user",
+        "group_participants",
+        ["group_id", "user_id"],
+    )
+    op.create_index(
+        "ix_assignment_history_group_created",
+        "assignment_history",
+        ["group_id", "created_at"],
+    )
+    op.create_index("ix_wishlist_items_group_user", "wishlist_items", ["group_id", "user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wishlist_items_group_user", table_name="wishlist_items")
+    op.drop_index("ix_assignment_history_group_created", table_name="assignment_history")
+    op.drop_index("ix_group_participants_group_user", table_name="group_participants")
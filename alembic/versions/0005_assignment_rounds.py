@@ -0,0 +1,66 @@
+"""Number assignment history rounds
+
+Revision ID: 0005_assignment_rounds
+Revises: 0004_hot_path_indexes
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_assignment_rounds"
+down_revision: Union[str, None] = "0004_hot_path_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("groups", sa.Column("last_round", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("assignment_history", sa.Column("round_number", sa.Integer(), nullable=True))
+
+    # Existing rounds were told apart by their archive timestamp.
+    op.execute(
+        """
+        UPDATE assignment_history AS history
+        SET round_number = numbered.round_number
+        FROM (
+            SELECT id, DENSE_RANK() OVER (PARTITION BY group_id ORDER BY created_at) AS round_number
+            FROM assignment_history
+        ) AS numbered
+        WHERE history.id = numbered.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE groups
+        SET last_round = rounds.last_round
+        FROM (
+            SELECT group_id, MAX(round_number) AS last_round
+            FROM assignment_history
+            GROUP BY group_id
+        ) AS rounds
+        WHERE groups.id = rounds.group_id
+        """
+    )
+
+    op.alter_column("assignment_history", "round_number", nullable=False)
+    op.drop_index("ix_assignment_history_group_created", table_name="assignment_history")
+    op.create_unique_constraint(
+        "uq_assignment_history_group_round_giver",
+        "assignment_history",
+        ["group_id", "round_number", "giver_user_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_assignment_history_group_round_giver", "assignment_history", type_="unique")
+    op.create_index(
+        "ix_assignment_history_group_created",
+        "assignment_history",
+        ["group_id", "created_at"],
+    )
+    op.drop_column("assignment_history", "round_number")
+    op.drop_column("groups", "last_round")
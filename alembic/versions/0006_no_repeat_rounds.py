@@ -0,0 +1,25 @@
+"""No-repeat window per group
+
+Revision ID: 0006_no_repeat_rounds
+Revises: 0005_assignment_rounds
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_no_repeat_rounds"
+down_revision: Union[str, None] = "0005_assignment_rounds"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("groups", sa.Column("no_repeat_rounds", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("groups", "no_repeat_rounds")
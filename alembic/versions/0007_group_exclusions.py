@@ -0,0 +1,37 @@
+"""Group exclusions
+
+Revision ID: 0007_group_exclusions
+Revises: 0006_no_repeat_rounds
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_group_exclusions"
+down_revision: Union[str, None] = "0006_no_repeat_rounds"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "group_exclusions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.Column("giver_user_id", sa.Integer(), nullable=False),
+        sa.Column("receiver_user_id", sa.Integer(), nullable=False),
+        sa.Column("symmetric", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["giver_user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["receiver_user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("group_id", "giver_user_id", "receiver_user_id", name="uq_group_exclusions_pair"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("group_exclusions")
@@ -0,0 +1,33 @@
+"""Denormalised participant count per group
+
+Revision ID: 0008_group_participant_count
+Revises: 0007_group_exclusions
+Create Date: 2026-10-17 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_group_participant_count"
+down_revision: Union[str, None] = "0007_group_exclusions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("groups", sa.Column("participant_count", sa.Integer(), nullable=False, server_default="0"))
+    op.execute(
+        """
+        UPDATE groups
+        SET participant_count = (
+            SELECT COUNT(*) FROM group_participants WHERE group_participants.group_id = groups.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("groups", "participant_count")
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import queue
+import secrets
+import signal
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import uvloop
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import setup_application
+from aiohttp import web
+from loguru import logger
+
+from app.api.webhook import UpdateFeeder, serve_webhook_app
+from app.core.config import RATE_LIMIT_DATABASE, Settings
+from app.core.logging import setup_logging
+from app.db import dispose_async_engine, init_async_engine, init_engine
+from app.services.announcements import join_announcer
+from app.services.rate_limit import SqlRateLimitStore, rate_limiter
+from app.services.solver import solver_pool
+
+QUEUE_SIZE = 1000
+STOP_TIMEOUT_SECONDS = 30.0
+
+CHAT_SOURCES = (
+    "message",
+    "edited_message",
+    "channel_post",
+    "edited_channel_post",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+)
+USER_SOURCES = ("inline_query", "chosen_inline_result", "shipping_query", "pre_checkout_query", "poll_answer")
+
+
+def partition_key(update: Dict[str, Any]) -> int:
+    """Chat the update belongs to, so every update of a chat lands on the same worker."""
+    for field in CHAT_SOURCES:
+        payload = update.get(field)
+        if payload and payload.get("chat"):
+            return payload["chat"]["id"]
+    callback_query = update.get("callback_query")
+    if callback_query:
+        message = callback_query.get("message")
+        if message and message.get("chat"):
+            return message["chat"]["id"]
+        return callback_query["from"]["id"]
+    for field in USER_SOURCES:
+        payload = update.get(field)
+        if payload:
+            sender = payload.get("from") or payload.get("user") or {}
+            if "id" in sender:
+                return sender["id"]
+    return update.get("update_id", 0)
+
+
+def partition_for(update: Dict[str, Any], workers: int) -> int:
+    return partition_key(update) % workers
+
+
+class PartitionedIngress:
+    """Accepts webhook updates and hands each one to the worker that owns its chat."""
+
+    def __init__(self, queues: List[multiprocessing.Queue], secret_token: Optional[str]) -> None:
+        self.queues = queues
+        self.secret_token = secret_token
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.secret_token and not secrets.compare_digest(
+            request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), self.secret_token
+        ):
+            return web.Response(body="Unauthorized", status=401)
+        update = await request.json()
+        try:
+            self.queues[partition_for(update, len(self.queues))].put_nowait(update)
+        except queue.Full:
+            # Telegram redelivers on non-2xx responses, which gives the worker time to catch up.
+            return web.Response(body="Busy", status=503)
+        return web.json_response({})
+
+
+def _worker_log_path(log_path: str, index: int) -> str:
+    path = Path(log_path)
+    return str(path.with_name(f"{path.stem}.worker{index}{path.suffix}"))
+
+
+def run_worker(index: int, updates: multiprocessing.Queue, settings: Settings) -> None:
+    # The supervisor owns signal handling and stops workers with a sentinel.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    setup_logging(settings.log_level, _worker_log_path(settings.log_path, index))
+    uvloop.install()
+    asyncio.run(_consume(index, updates, settings))
+
+
+async def _consume(index: int, updates: multiprocessing.Queue, settings: Settings) -> None:
+    # Imported here so the bot and dispatcher are built inside the worker process.
+    from app.bot import bot, dp
+
+    init_engine(settings.database_url)
+    init_async_engine(settings.database_url)
+    if settings.rate_limit_backend == RATE_LIMIT_DATABASE:
+        rate_limiter.use_store(SqlRateLimitStore())
+    solver_pool.configure(settings.solver_executor, settings.solver_workers, settings.solver_time_budget)
+    join_announcer.configure(settings.join_announce_window, settings.join_announce_max_batch)
+    feeder = UpdateFeeder(dp, settings.webhook_max_in_flight)
+    loop = asyncio.get_running_loop()
+    logger.info("Worker {index} started", index=index)
+
+    while True:
+        update = await loop.run_in_executor(None, updates.get)
+        if update is None:
+            break
+        await feeder.submit(bot, update)
+
+    await feeder.drain(STOP_TIMEOUT_SECONDS)
+    await join_announcer.flush_all()
+    solver_pool.shutdown()
+    await bot.session.close()
+    await dispose_async_engine()
+    logger.info("Worker {index} stopped", index=index)
+
+
+async def stop_workers(
+    queues: List[multiprocessing.Queue],
+    processes: List[multiprocessing.Process],
+    timeout: float = STOP_TIMEOUT_SECONDS,
+) -> None:
+    """Send each worker the stop sentinel and wait for it to exit, terminating stragglers.
+
+    ``put`` blocks while a worker's queue is full, so it runs in the executor
+    with a timeout; a worker that never makes room is terminated instead.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def stop(updates: multiprocessing.Queue, process: multiprocessing.Process) -> None:
+        try:
+            await loop.run_in_executor(None, functools.partial(updates.put, None, timeout=timeout))
+        except queue.Full:
+            logger.warning("Worker {name} is not taking updates, terminating", name=process.name)
+            process.terminate()
+        await loop.run_in_executor(None, process.join, timeout + 5)
+        if process.is_alive():
+            logger.warning("Worker {name} did not stop in time, terminating", name=process.name)
+            process.terminate()
+            await loop.run_in_executor(None, process.join, 5)
+
+    await asyncio.gather(*(stop(updates, process) for updates, process in zip(queues, processes)))
+
+
+async def run_cluster(dispatcher: Dispatcher, bot: Bot, settings: Settings) -> None:
+    """Serve the webhook and process updates in ``settings.workers`` processes.
+
+    The supervisor only routes updates and runs the dispatcher's startup and
+    shutdown hooks (commands, outbox worker); handlers run in the workers.
+    """
+    context = multiprocessing.get_context("spawn")
+    queues = [context.Queue(maxsize=QUEUE_SIZE) for _ in range(settings.workers)]
+    processes = [
+        context.Process(target=run_worker, args=(index, queues[index], settings), name=f"santa-worker-{index}")
+        for index in range(settings.workers)
+    ]
+    for process in processes:
+        process.start()
+
+    async def stop_all_workers(app: web.Application) -> None:
+        await stop_workers(queues, processes)
+
+    app = web.Application()
+    app.router.add_post(settings.webhook_path, PartitionedIngress(queues, settings.webhook_secret).handle)
+    # Registered before the dispatcher hooks so workers drain before on_shutdown runs.
+    app.on_shutdown.append(stop_all_workers)
+    setup_application(app, dispatcher, bot=bot)
+    await serve_webhook_app(app, dispatcher, bot, settings)
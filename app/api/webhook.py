@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import signal
+import time
+from typing import Any, Dict, Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+from loguru import logger
+
+from app.core.config import Settings
+
+
+class UpdateFeeder:
+    """Feeds raw updates to a dispatcher with at most ``max_in_flight`` running at once."""
+
+    def __init__(self, dispatcher: Dispatcher, max_in_flight: int, **data: Any) -> None:
+        self.dispatcher = dispatcher
+        self.data = data
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._in_flight: Set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def submit(self, bot: Bot, update: Dict[str, Any]) -> None:
+        """Wait for a free slot, then process ``update`` in the background."""
+        await self._slots.acquire()
+        task = asyncio.create_task(self._process(bot, update, time.monotonic()))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _process(self, bot: Bot, update: Dict[str, Any], received_at: float) -> None:
+        try:
+            result = await self.dispatcher.feed_raw_update(bot=bot, update=update, **self.data)
+            if isinstance(result, TelegramMethod):
+                await self.dispatcher.silent_call_request(bot=bot, result=result)
+        except Exception as exc:
+            logger.bind(update_id=update.get("update_id")).opt(exception=exc).error(
+                "Failed to process update: {error}", error=str(exc)
+            )
+        finally:
+            self._slots.release()
+            logger.bind(update_id=update.get("update_id")).debug(
+                "Update processed in {elapsed:.1f} ms", elapsed=(time.monotonic() - received_at) * 1000
+            )
+
+    async def drain(self, timeout: float) -> None:
+        if not self._in_flight:
+            return
+        logger.info("Draining {count} in-flight updates", count=len(self._in_flight))
+        _, pending = await asyncio.wait(set(self._in_flight), timeout=timeout)
+        if pending:
+            logger.warning("Cancelling {count} updates still running after drain", count=len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Webhook handler that acknowledges updates immediately and processes them concurrently.
+
+    At most ``max_in_flight`` updates are processed at once; beyond that the HTTP
+    response is held back, which makes Telegram slow down instead of us queueing
+    without bound. Closing the handler drains in-flight updates.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        secret_token: Optional[str],
+        max_in_flight: int,
+        drain_timeout: float = 30.0,
+        **data: Any,
+    ) -> None:
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self.drain_timeout = drain_timeout
+        self.feeder = UpdateFeeder(dispatcher, max_in_flight, **data)
+        self._accepting = True
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if not self._accepting:
+            return web.Response(body="Shutting down", status=503)
+        return await super().handle(request)
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        await self.feeder.submit(bot, await request.json(loads=bot.session.json_loads))
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    async def close(self) -> None:
+        self._accepting = False
+        await self.feeder.drain(self.drain_timeout)
+
+
+def build_webhook_app(dispatcher: Dispatcher, bot: Bot, settings: Settings) -> web.Application:
+    app = web.Application()
+    handler = BoundedRequestHandler(
+        dispatcher,
+        bot,
+        secret_token=settings.webhook_secret,
+        max_in_flight=settings.webhook_max_in_flight,
+    )
+    # The handler's close hook is registered first so in-flight updates are drained
+    # before the dispatcher's shutdown handlers close the bot session.
+    handler.register(app, path=settings.webhook_path)
+    setup_application(app, dispatcher, bot=bot)
+    return app
+
+
+async def serve_webhook_app(app: web.Application, dispatcher: Dispatcher, bot: Bot, settings: Settings) -> None:
+    if not settings.webhook_url:
+        raise ValueError("WEBHOOK_URL is required in webhook mode.")
+    if not settings.webhook_secret:
+        raise ValueError("WEBHOOK_SECRET is required in webhook mode.")
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.webhook_host, settings.webhook_port)
+    await site.start()
+
+    await bot.set_webhook(
+        settings.webhook_url.rstrip("/") + settings.webhook_path,
+        secret_token=settings.webhook_secret,
+        allowed_updates=dispatcher.resolve_used_update_types(),
+        max_connections=min(settings.webhook_max_in_flight * settings.workers, 100),
+    )
+    logger.info(
+        "Webhook server listening on {host}:{port}{path}",
+        host=settings.webhook_host,
+        port=settings.webhook_port,
+        path=settings.webhook_path,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot, settings: Settings) -> None:
+    await serve_webhook_app(build_webhook_app(dispatcher, bot, settings), dispatcher, bot, settings)
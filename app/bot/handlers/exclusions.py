@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from aiogram import Router, types
+from aiogram.filters import Command
+
+from app.bot.utils import check_rate_limit, is_admin, log_handler_exception
+from app.db import get_async_session
+from app.db import repo
+from app.services import entitlements, game_flow
+
+router = Router()
+
+EXCLUDE_USAGE = (
+    "Usage: /exclude @giver @receiver [both]\n"
+    "The giver will never draw the receiver; add \"both\" to exclude the other direction too. "
+    "Participants without a username can be referenced by their Telegram id."
+)
+UNEXCLUDE_USAGE = "Usage: /unexclude @first @second"
+
+
+@router.message(Command("exclude"))
+async def exclude_command_handler(message: types.Message) -> None:
+    if not await check_rate_limit(message.from_user.id, "exclude"):
+        await message.answer("You're doing that too often. Please slow down.")
+        return
+
+    if not await is_admin(message.bot, message.chat.id, message.from_user.id):
+        await message.answer("Only group admins can manage exclusions.")
+        return
+
+    tokens = message.text.split()
+    if len(tokens) not in {3, 4} or (len(tokens) == 4 and tokens[3].lower() != "both"):
+        await message.answer(EXCLUDE_USAGE)
+        return
+    symmetric = len(tokens) == 4
+
+    try:
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
+            if not group:
+                await message.answer("This group is not currently active in Secret Santa.")
+                return
+            await game_flow.require_feature_async(session, group, entitlements.FEATURE_EXCLUSIONS)
+
+            giver = await game_flow.find_participant_async(session, group, tokens[1])
+            receiver = await game_flow.find_participant_async(session, group, tokens[2])
+            if not giver or not receiver:
+                await message.answer("Both people need to have joined this Secret Santa.")
+                return
+            if giver.id == receiver.id:
+                await message.answer("Nobody draws themselves anyway.")
+                return
+
+            added = await game_flow.add_exclusion_async(session, group, giver, receiver, symmetric)
+            arrow = "↔" if symmetric else "→"
+            pair = f"{game_flow.format_user_label(giver)} {arrow} {game_flow.format_user_label(receiver)}"
+        if added:
+            await message.answer(f"Exclusion added: {pair}")
+        else:
+            await message.answer(f"That exclusion already exists: {pair}")
+    except entitlements.EntitlementError:
+        await message.answer("Exclusions are available on the Pro plan. Use /upgrade to unlock it.")
+    except Exception as exc:
+        log_handler_exception("exclude", message.from_user.id, message.chat.id, exc)
+        await message.answer("Something went wrong. Please try again later.")
+
+
+@router.message(Command("unexclude"))
+async def unexclude_command_handler(message: types.Message) -> None:
+    if not await check_rate_limit(message.from_user.id, "unexclude"):
+        await message.answer("You're doing that too often. Please slow down.")
+        return
+
+    if not await is_admin(message.bot, message.chat.id, message.from_user.id):
+        await message.answer("Only group admins can manage exclusions.")
+        return
+
+    tokens = message.text.split()
+    if len(tokens) != 3:
+        await message.answer(UNEXCLUDE_USAGE)
+        return
+
+    try:
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
+            if not group:
+                await message.answer("This group is not currently active in Secret Santa.")
+                return
+            await game_flow.require_feature_async(session, group, entitlements.FEATURE_EXCLUSIONS)
+
+            first = await game_flow.find_participant_async(session, group, tokens[1])
+            second = await game_flow.find_participant_async(session, group, tokens[2])
+            if not first or not second:
+                await message.answer("Both people need to have joined this Secret Santa.")
+                return
+            removed = await game_flow.remove_exclusion_async(session, group, first, second)
+        if removed:
+            await message.answer("Exclusion removed.")
+        else:
+            await message.answer("There was no exclusion between them.")
+    except entitlements.EntitlementError:
+        await message.answer("Exclusions are available on the Pro plan. Use /upgrade to unlock it.")
+    except Exception as exc:
+        log_handler_exception("unexclude", message.from_user.id, message.chat.id, exc)
+        await message.answer("Something went wrong. Please try again later.")
+
+
+@router.message(Command("exclusions"))
+async def exclusions_command_handler(message: types.Message) -> None:
+    if not await check_rate_limit(message.from_user.id, "exclusions"):
+        await message.answer("You're doing that too often. Please slow down.")
+        return
+
+    try:
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
+            if not group:
+                await message.answer("This group is not currently active in Secret Santa.")
+                return
+            await game_flow.require_feature_async(session, group, entitlements.FEATURE_EXCLUSIONS)
+            lines = await game_flow.list_exclusions_async(session, group)
+        if not lines:
+            await message.answer("No exclusions set. Admins can add one with /exclude @giver @receiver.")
+            return
+        await message.answer("Exclusions:\n" + "\n".join(lines))
+    except entitlements.EntitlementError:
+        await message.answer("Exclusions are available on the Pro plan. Use /upgrade to unlock it.")
+    except Exception as exc:
+        log_handler_exception("exclusions", message.from_user.id, message.chat.id, exc)
+        await message.answer("Something went wrong. Please try again later.")
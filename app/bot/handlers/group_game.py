@@ -1,33 +1,38 @@
 from __future__ import annotations
 
 import datetime
-import html
 from decimal import Decimal, InvalidOperation
 
 from aiogram import Router, types
 from aiogram.filters import Command
-from aiogram.enums import ParseMode
-from loguru import logger
 
-from app.bot.keyboards import confirm_end_keyboard
+from app.bot.keyboards import (
+    PAGE_NEXT,
+    PARTICIPANT_PAGE_PREFIX,
+    confirm_end_keyboard,
+    parse_participant_page,
+    participant_page_keyboard,
+)
 from app.bot.utils import check_rate_limit, is_admin, log_handler_exception
-from app.db import GroupStatus, get_session
+from app.db import GroupStatus, get_async_session
 from app.db import repo
 from app.services import entitlements, game_flow
+from app.services.announcements import join_announcer
 from app.services.assignment import AssignmentError
+from app.services.outbox import outbox_worker
 
 router = Router()
 
 
 @router.callback_query(lambda c: c.data == "join")
 async def join_callback_handler(query: types.CallbackQuery) -> None:
-    if not check_rate_limit(query.from_user.id, "join"):
+    if not await check_rate_limit(query.from_user.id, "join"):
         await query.answer("You're doing that too often. Please slow down.", show_alert=True)
         return
 
     try:
-        with get_session() as session:
-            result = game_flow.join_group(
+        async with get_async_session() as session:
+            result = await game_flow.join_group_async(
                 session,
                 query.from_user.id,
                 query.from_user.username,
@@ -40,69 +45,93 @@ async def join_callback_handler(query: types.CallbackQuery) -> None:
             user_label = game_flow.format_user_label(result.user)
             group_id = result.group.telegram_id
 
+        await query.answer(result.message, show_alert=True)
         if joined:
-            await query.answer(result.message, show_alert=True)
-            await query.message.bot.send_message(
-                group_id,
-                f"{user_label} joined the Secret Santa game!",
-            )
-        else:
-            await query.answer(result.message, show_alert=True)
+            join_announcer.add(query.message.bot, group_id, user_label)
     except Exception as exc:
         log_handler_exception("join", query.from_user.id, query.message.chat.id, exc)
         await query.answer("Error joining the Secret Santa game.", show_alert=True)
 
 
+async def _render_participant_page(session, group, snapshot, page) -> str:
+    header = "Participants in Secret Santa:"
+    if page.total > len(page.lines):
+        last = page.first + len(page.lines) - 1
+        header = f"Participants in Secret Santa ({page.first}–{last} of {page.total}):"
+    message_text = header + "\n" + "\n".join(page.lines)
+    if not snapshot.all_have_private_chat:
+        message_text += (
+            "\n\nNote: Users without a ✓ need to start a private chat with the bot by sending /start."
+        )
+
+    group_entitlements = await entitlements.for_group_async(session, group.id)
+    show_budget = group_entitlements.has(entitlements.FEATURE_BUDGET)
+    show_deadline = group_entitlements.has(entitlements.FEATURE_DEADLINE)
+
+    if (show_budget and group.budget_amount is not None) or (show_deadline and group.gift_deadline):
+        message_text += "\n\nDetails:"
+        if show_budget and group.budget_amount is not None:
+            message_text += f"\nBudget: {game_flow.format_budget(group)}"
+        if show_deadline and group.gift_deadline:
+            message_text += f"\nDeadline: {game_flow.format_deadline(group)}"
+    return message_text
+
+
 @router.message(Command("list"))
 async def list_command_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "list"):
+    if not await check_rate_limit(message.from_user.id, "list"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
     try:
-        with get_session() as session:
-            group = repo.get_group_by_telegram_id(session, message.chat.id)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
             if not group:
                 await message.answer("This group is not currently active in Secret Santa.")
                 return
 
-            participants = game_flow.list_participants(session, group)
-            if not participants:
+            snapshot = await game_flow.participant_snapshot_async(session, group)
+            if not snapshot.ids:
                 await message.answer("No participants found in this Secret Santa game.")
                 return
 
-            lines = []
-            for user in participants:
-                label = game_flow.format_user_label(user)
-                suffix = " ✓" if user.has_private_chat else ""
-                lines.append(f"{label}{suffix}")
-
-            message_text = "Participants in Secret Santa:\n" + "\n".join(lines)
-            if any(not user.has_private_chat for user in participants):
-                message_text += (
-                    "\n\nNote: Users without a ✓ need to start a private chat with the bot by sending /start."
-                )
-
-            group_entitlements = entitlements.for_group(session, group.id)
-            show_budget = group_entitlements.has(entitlements.FEATURE_BUDGET)
-            show_deadline = group_entitlements.has(entitlements.FEATURE_DEADLINE)
-
-            if (show_budget and group.budget_amount is not None) or (show_deadline and group.gift_deadline):
-                message_text += "\n\nDetails:"
-                if show_budget and group.budget_amount is not None:
-                    message_text += f"\nBudget: {game_flow.format_budget(group)}"
-                if show_deadline and group.gift_deadline:
-                    message_text += f"\nDeadline: {game_flow.format_deadline(group)}"
-
-            await message.answer(message_text)
+            page = snapshot.page_after()
+            message_text = await _render_participant_page(session, group, snapshot, page)
+
+        await message.answer(message_text, reply_markup=participant_page_keyboard(page))
     except Exception as exc:
         log_handler_exception("list", message.from_user.id, message.chat.id, exc)
         await message.answer("Something went wrong. Please try again later.")
 
 
+@router.callback_query(lambda c: c.data and c.data.startswith(PARTICIPANT_PAGE_PREFIX))
+async def list_page_callback_handler(query: types.CallbackQuery) -> None:
+    if not await check_rate_limit(query.from_user.id, "list"):
+        await query.answer("You're doing that too often. Please slow down.", show_alert=True)
+        return
+
+    try:
+        direction, cursor = parse_participant_page(query.data)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, query.message.chat.id)
+            if not group:
+                await query.answer("This group is not currently active in Secret Santa.", show_alert=True)
+                return
+
+            snapshot = await game_flow.participant_snapshot_async(session, group)
+            page = snapshot.page_after(cursor) if direction == PAGE_NEXT else snapshot.page_before(cursor)
+            message_text = await _render_participant_page(session, group, snapshot, page)
+
+        await query.message.edit_text(message_text, reply_markup=participant_page_keyboard(page))
+        await query.answer()
+    except Exception as exc:
+        log_handler_exception("list_page", query.from_user.id, query.message.chat.id, exc)
+        await query.answer("Something went wrong. Please try again later.", show_alert=True)
+
+
 @router.message(Command("end"))
 async def end_command_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "end"):
+    if not await check_rate_limit(message.from_user.id, "end"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -115,8 +144,8 @@ async def end_command_handler(message: types.Message) -> None:
         return
 
     try:
-        with get_session() as session:
-            group = repo.get_group_by_telegram_id(session, message.chat.id)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
             if not group:
                 await message.answer("This group is not currently active in Secret Santa.")
                 return
@@ -139,7 +168,7 @@ async def end_command_handler(message: types.Message) -> None:
 
 @router.callback_query(lambda c: c.data == "confirm_end")
 async def confirm_end_callback_handler(query: types.CallbackQuery) -> None:
-    if not check_rate_limit(query.from_user.id, "confirm_end"):
+    if not await check_rate_limit(query.from_user.id, "confirm_end"):
         await query.answer("You're doing that too often. Please slow down.", show_alert=True)
         return
 
@@ -148,68 +177,18 @@ async def confirm_end_callback_handler(query: types.CallbackQuery) -> None:
         return
 
     try:
-        with get_session() as session:
-            group = repo.get_group_by_telegram_id(session, query.message.chat.id)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, query.message.chat.id)
             if not group:
                 await query.answer("This group is not currently active in Secret Santa.", show_alert=True)
                 return
 
-            entitlements_for_group = entitlements.for_group(session, group.id)
-            result = game_flow.assign_group(session, group)
-            participants = {participant.id: participant for participant in result.participants}
-
-            wishlist_enabled = entitlements_for_group.has(entitlements.FEATURE_WISHLIST)
-            wishlists = {}
-            if wishlist_enabled:
-                for receiver_id in result.assignments.values():
-                    wishlists[receiver_id] = game_flow.list_wishlist_items(
-                        session, group, receiver_id
-                    )
-
-            budget_text = None
-            if entitlements_for_group.has(entitlements.FEATURE_BUDGET):
-                budget_text = game_flow.format_budget(group)
-            deadline_text = None
-            if entitlements_for_group.has(entitlements.FEATURE_DEADLINE):
-                deadline_text = game_flow.format_deadline(group)
-
-        for giver_id, receiver_id in result.assignments.items():
-            giver = participants[giver_id]
-            receiver = participants[receiver_id]
-            receiver_label = game_flow.format_user_label(receiver)
-
-            message_lines = [
-                f"Secret Santa: You're giving a gift to {receiver_label}!",
-            ]
-            if wishlist_enabled:
-                items = wishlists.get(receiver_id, [])
-                if items:
-                    message_lines.append("")
-                    message_lines.append("Wishlist:")
-                    message_lines.extend([f"- {html.escape(item)}" for item in items])
-            if budget_text:
-                message_lines.append("")
-                message_lines.append(f"Budget: {budget_text}")
-            if deadline_text:
-                message_lines.append("")
-                message_lines.append(f"Deadline: {deadline_text}")
-
-            try:
-                await query.message.bot.send_message(
-                    giver.telegram_id,
-                    "\n".join(message_lines),
-                    parse_mode=ParseMode.HTML,
-                )
-            except Exception as exc:  # pragma: no cover - network dependent
-                logger.bind(user_id=giver.telegram_id).warning(
-                    "Failed to send assignment DM: {error}", error=str(exc)
-                )
-
-        await query.answer("Secret Santa distribution completed!", show_alert=True)
-        await query.message.bot.send_message(
-            query.message.chat.id,
-            "Secret Santa distribution completed! Check your private messages.",
-        )
+            await game_flow.assign_group_async(session, group)
+
+        # Assignment DMs were queued in the same transaction; the outbox worker
+        # delivers them and posts the summary once every DM has settled.
+        outbox_worker.wake()
+        await query.answer("Secret Santa assignments are ready! Sending private messages now.", show_alert=True)
     except AssignmentError as exc:
         await query.answer(str(exc), show_alert=True)
     except Exception as exc:
@@ -219,7 +198,7 @@ async def confirm_end_callback_handler(query: types.CallbackQuery) -> None:
 
 @router.message(Command("lock"))
 async def lock_command_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "lock"):
+    if not await check_rate_limit(message.from_user.id, "lock"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -228,13 +207,13 @@ async def lock_command_handler(message: types.Message) -> None:
         return
 
     try:
-        with get_session() as session:
-            group = repo.get_group_by_telegram_id(session, message.chat.id)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
             if not group:
                 await message.answer("This group is not currently active in Secret Santa.")
                 return
 
-            if game_flow.lock_group(session, group):
+            if await game_flow.lock_group_async(session, group):
                 await message.answer("Secret Santa is now locked.")
             else:
                 await message.answer("Secret Santa is already locked or assigned.")
@@ -245,7 +224,7 @@ async def lock_command_handler(message: types.Message) -> None:
 
 @router.message(Command("unlock"))
 async def unlock_command_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "unlock"):
+    if not await check_rate_limit(message.from_user.id, "unlock"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -254,13 +233,13 @@ async def unlock_command_handler(message: types.Message) -> None:
         return
 
     try:
-        with get_session() as session:
-            group = repo.get_group_by_telegram_id(session, message.chat.id)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
             if not group:
                 await message.answer("This group is not currently active in Secret Santa.")
                 return
 
-            if game_flow.unlock_group(session, group):
+            if await game_flow.unlock_group_async(session, group):
                 await message.answer("Secret Santa is now open.")
             else:
                 await message.answer("Secret Santa is not locked.")
@@ -271,7 +250,7 @@ async def unlock_command_handler(message: types.Message) -> None:
 
 @router.message(Command("reset"))
 async def reset_command_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "reset"):
+    if not await check_rate_limit(message.from_user.id, "reset"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -280,12 +259,12 @@ async def reset_command_handler(message: types.Message) -> None:
         return
 
     try:
-        with get_session() as session:
-            group = repo.get_group_by_telegram_id(session, message.chat.id)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
             if not group:
                 await message.answer("This group is not currently active in Secret Santa.")
                 return
-            game_flow.reset_group(session, group)
+            await game_flow.reset_group_async(session, group)
         await message.answer("Secret Santa has been reset. Participants are kept, assignments cleared.")
     except Exception as exc:
         log_handler_exception("reset", message.from_user.id, message.chat.id, exc)
@@ -294,7 +273,7 @@ async def reset_command_handler(message: types.Message) -> None:
 
 @router.message(Command("setbudget"))
 async def set_budget_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "setbudget"):
+    if not await check_rate_limit(message.from_user.id, "setbudget"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -319,13 +298,13 @@ async def set_budget_handler(message: types.Message) -> None:
     currency = parts[2].upper() if len(parts) > 2 else None
 
     try:
-        with get_session() as session:
-            group = repo.get_group_by_telegram_id(session, message.chat.id)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
             if not group:
                 await message.answer("This group is not currently active in Secret Santa.")
                 return
-            game_flow.require_feature(session, group, entitlements.FEATURE_BUDGET)
-            game_flow.set_budget(session, group, budget_amount, currency)
+            await game_flow.require_feature_async(session, group, entitlements.FEATURE_BUDGET)
+            await game_flow.set_budget_async(session, group, budget_amount, currency)
         await message.answer("Budget updated.")
     except entitlements.EntitlementError:
         await message.answer("Budget is available on the Pro plan. Use /upgrade to unlock it.")
@@ -336,7 +315,7 @@ async def set_budget_handler(message: types.Message) -> None:
 
 @router.message(Command("setdeadline"))
 async def set_deadline_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "setdeadline"):
+    if not await check_rate_limit(message.from_user.id, "setdeadline"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -356,16 +335,57 @@ async def set_deadline_handler(message: types.Message) -> None:
         return
 
     try:
-        with get_session() as session:
-            group = repo.get_group_by_telegram_id(session, message.chat.id)
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
             if not group:
                 await message.answer("This group is not currently active in Secret Santa.")
                 return
-            game_flow.require_feature(session, group, entitlements.FEATURE_DEADLINE)
-            game_flow.set_deadline(session, group, deadline)
+            await game_flow.require_feature_async(session, group, entitlements.FEATURE_DEADLINE)
+            await game_flow.set_deadline_async(session, group, deadline)
         await message.answer("Deadline updated.")
     except entitlements.EntitlementError:
         await message.answer("Deadlines are available on the Pro plan. Use /upgrade to unlock it.")
     except Exception as exc:
         log_handler_exception("setdeadline", message.from_user.id, message.chat.id, exc)
         await message.answer("Something went wrong. Please try again later.")
+
+
+@router.message(Command("setnorepeat"))
+async def set_no_repeat_handler(message: types.Message) -> None:
+    if not await check_rate_limit(message.from_user.id, "setnorepeat"):
+        await message.answer("You're doing that too often. Please slow down.")
+        return
+
+    if not await is_admin(message.bot, message.chat.id, message.from_user.id):
+        await message.answer("Only group admins can change the no-repeat window.")
+        return
+
+    parts = message.text.split(maxsplit=1)
+    if len(parts) < 2:
+        await message.answer("Usage: /setnorepeat 3")
+        return
+
+    try:
+        rounds = int(parts[1])
+        if not 1 <= rounds <= game_flow.MAX_NO_REPEAT_ROUNDS:
+            raise ValueError
+    except ValueError:
+        await message.answer(
+            f"Number of rounds should be a whole number from 1 to {game_flow.MAX_NO_REPEAT_ROUNDS}."
+        )
+        return
+
+    try:
+        async with get_async_session() as session:
+            group = await repo.get_group_by_telegram_id_async(session, message.chat.id)
+            if not group:
+                await message.answer("This group is not currently active in Secret Santa.")
+                return
+            await game_flow.require_feature_async(session, group, entitlements.FEATURE_NO_REPEAT)
+            await game_flow.set_no_repeat_rounds_async(session, group, rounds)
+        await message.answer(f"Nobody will get the same person as in the last {rounds} round(s).")
+    except entitlements.EntitlementError:
+        await message.answer("No-repeat rounds are available on the Pro plan. Use /upgrade to unlock it.")
+    except Exception as exc:
+        log_handler_exception("setnorepeat", message.from_user.id, message.chat.id, exc)
+        await message.answer("Something went wrong. Please try again later.")
@@ -0,0 +1,16 @@
+from aiogram import Router, types
+
+from app.services.admin_cache import ADMIN_STATUSES, admin_roster
+
+router = Router()
+
+
+@router.my_chat_member()
+async def my_chat_member_handler(update: types.ChatMemberUpdated) -> None:
+    admin_roster.invalidate(update.chat.id)
+
+
+@router.chat_member()
+async def chat_member_handler(update: types.ChatMemberUpdated) -> None:
+    if update.old_chat_member.status in ADMIN_STATUSES or update.new_chat_member.status in ADMIN_STATUSES:
+        admin_roster.invalidate(update.chat.id)
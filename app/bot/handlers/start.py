@@ -4,7 +4,7 @@ from loguru import logger
 
 from app.bot.keyboards import join_keyboard
 from app.bot.utils import check_rate_limit, log_handler_exception
-from app.db import get_session
+from app.db import get_async_session
 from app.services import game_flow
 
 router = Router()
@@ -12,14 +12,14 @@ router = Router()
 
 @router.message(CommandStart())
 async def command_start_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "start"):
+    if not await check_rate_limit(message.from_user.id, "start"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
     try:
         if message.chat.type == "private":
-            with get_session() as session:
-                game_flow.register_private_chat(
+            async with get_async_session() as session:
+                await game_flow.register_private_chat_async(
                     session,
                     message.from_user.id,
                     message.from_user.username,
@@ -6,7 +6,7 @@ from aiogram import Router, types
 from aiogram.filters import Command
 
 from app.bot.utils import check_rate_limit, is_admin, log_handler_exception
-from app.db import get_session
+from app.db import get_async_session
 from app.db import repo
 from app.services import entitlements
 
@@ -15,7 +15,7 @@ router = Router()
 
 @router.message(Command("upgrade"))
 async def upgrade_command_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "upgrade"):
+    if not await check_rate_limit(message.from_user.id, "upgrade"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -28,20 +28,20 @@ async def upgrade_command_handler(message: types.Message) -> None:
         return
 
     try:
-        with get_session() as session:
-            group = repo.get_or_create_group(
+        async with get_async_session() as session:
+            group = await repo.get_or_create_group_async(
                 session,
                 message.chat.id,
                 message.from_user.id,
                 message.chat.title,
             )
 
-            current = entitlements.for_group(session, group.id)
+            current = await entitlements.for_group_async(session, group.id)
             if current.plan == "pro":
                 await message.answer("This group is already on the Pro plan.")
                 return
 
-            token = entitlements.create_upgrade_token(session, group.id, days_valid=7)
+            token = await entitlements.create_upgrade_token_async(session, group.id, days_valid=7)
 
         await message.answer(
             "Upgrade to Pro to unlock wishlists, exclusions, no-repeat, budgets, and deadlines.\n\n"
@@ -55,7 +55,7 @@ async def upgrade_command_handler(message: types.Message) -> None:
 
 @router.message(Command("activate"))
 async def activate_command_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "activate"):
+    if not await check_rate_limit(message.from_user.id, "activate"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -67,8 +67,8 @@ async def activate_command_handler(message: types.Message) -> None:
     token = tokens[1].strip()
 
     try:
-        with get_session() as session:
-            upgrade_session = repo.get_upgrade_session_by_token(session, token)
+        async with get_async_session() as session:
+            upgrade_session = await repo.get_upgrade_session_by_token_async(session, token)
             if not upgrade_session:
                 await message.answer("Invalid upgrade token.")
                 return
@@ -81,11 +81,12 @@ async def activate_command_handler(message: types.Message) -> None:
                 await message.answer("This upgrade token has expired.")
                 return
 
-            if not await is_admin(message.bot, upgrade_session.group_id, message.from_user.id):
+            group = await repo.get_group_by_id_async(session, upgrade_session.group_id)
+            if not group or not await is_admin(message.bot, group.telegram_id, message.from_user.id):
                 await message.answer("Only group admins can activate this upgrade.")
                 return
 
-            if entitlements.activate_upgrade_token(session, token):
+            if await entitlements.activate_upgrade_token_async(session, token):
                 await message.answer("Pro activated for this group. Enjoy the new features!")
                 return
 
@@ -6,7 +6,7 @@ from aiogram import Router, types
 from aiogram.filters import Command
 
 from app.bot.utils import check_rate_limit, log_handler_exception
-from app.db import get_session
+from app.db import get_async_session
 from app.db import repo
 from app.services import entitlements, game_flow
 
@@ -15,7 +15,7 @@ router = Router()
 
 @router.message(Command("wish"))
 async def wish_command_handler(message: types.Message) -> None:
-    if not check_rate_limit(message.from_user.id, "wish"):
+    if not await check_rate_limit(message.from_user.id, "wish"):
         await message.answer("You're doing that too often. Please slow down.")
         return
 
@@ -52,11 +52,11 @@ async def wish_command_handler(message: types.Message) -> None:
         return
 
     try:
-        with get_session() as session:
-            group = game_flow.resolve_user_group(session, message.from_user.id, group_identifier)
+        async with get_async_session() as session:
+            group = await game_flow.resolve_user_group_async(session, message.from_user.id, group_identifier)
             if not group:
-                user = repo.get_user_by_telegram_id(session, message.from_user.id)
-                groups = repo.list_groups_for_user(session, user.id) if user else []
+                user = await repo.get_user_by_telegram_id_async(session, message.from_user.id)
+                groups = await repo.list_groups_for_user_async(session, user.id) if user else []
                 if not groups:
                     await message.answer("You are not in any Secret Santa groups yet.")
                 else:
@@ -71,18 +71,19 @@ async def wish_command_handler(message: types.Message) -> None:
                     )
                 return
 
-            game_flow.require_feature(session, group, entitlements.FEATURE_WISHLIST)
+            await game_flow.require_feature_async(session, group, entitlements.FEATURE_WISHLIST)
+            user = await repo.get_user_by_telegram_id_async(session, message.from_user.id)
 
             if action == "add":
                 if not text:
                     await message.answer("Wishlist item text cannot be empty.")
                     return
-                game_flow.add_wishlist_item(session, group, message.from_user.id, text)
+                await game_flow.add_wishlist_item_async(session, group, user.id, text)
                 await message.answer("Wishlist item added.")
                 return
 
             if action == "list":
-                items = game_flow.list_wishlist_items(session, group, message.from_user.id)
+                items = await game_flow.list_wishlist_items_async(session, group, user.id)
                 if not items:
                     await message.answer("Your wishlist is empty.")
                     return
@@ -93,7 +94,7 @@ async def wish_command_handler(message: types.Message) -> None:
                 return
 
             if action == "clear":
-                cleared = game_flow.clear_wishlist_items(session, group, message.from_user.id)
+                cleared = await game_flow.clear_wishlist_items_async(session, group, user.id)
                 await message.answer(f"Cleared {cleared} wishlist items.")
                 return
     except entitlements.EntitlementError:
@@ -11,3 +11,27 @@ def confirm_end_keyboard():
     keyboard = InlineKeyboardBuilder()
     keyboard.button(text="Yes, End Secret Santa!", callback_data="confirm_end")
     return keyboard.as_markup()
+
+
+PARTICIPANT_PAGE_PREFIX = "list:"
+PAGE_NEXT = "next"
+PAGE_PREV = "prev"
+
+
+def participant_page_keyboard(page):
+    """Prev/next buttons for a /list page; the cursor is a user id, so joins never shift pages."""
+    if page.prev_before is None and page.next_after is None:
+        return None
+    keyboard = InlineKeyboardBuilder()
+    if page.prev_before is not None:
+        keyboard.button(text="« Prev", callback_data=f"{PARTICIPANT_PAGE_PREFIX}{PAGE_PREV}:{page.prev_before}")
+    if page.next_after is not None:
+        keyboard.button(text="Next »", callback_data=f"{PARTICIPANT_PAGE_PREFIX}{PAGE_NEXT}:{page.next_after}")
+    return keyboard.as_markup()
+
+
+def parse_participant_page(data: str) -> tuple[str, int]:
+    direction, cursor = data[len(PARTICIPANT_PAGE_PREFIX):].split(":")
+    if direction not in {PAGE_NEXT, PAGE_PREV}:
+        raise ValueError(f"Unknown page direction: {direction}")
+    return direction, int(cursor)
@@ -0,0 +1,82 @@
+"""Operator commands that run against the database directly.
+
+Usage:
+    python -m app.cli assign 12 13 14
+    python -m app.cli assign --status locked --workers 4
+    python -m app.cli reconcile-counts
+
+Assignment DMs are queued in the notification outbox; the running bot's outbox
+worker delivers them on its next poll.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from app.db import GroupStatus, get_session, init_engine, repo
+from app.services import game_flow
+
+
+def assign(args: argparse.Namespace) -> int:
+    with get_session() as session:
+        group_ids = list(args.group_ids)
+        if args.status:
+            group_ids += repo.list_group_ids_by_status(session, GroupStatus(args.status))
+        if not group_ids:
+            print("No groups to assign.", file=sys.stderr)
+            return 1
+        outcomes = game_flow.assign_groups_bulk(session, group_ids, seed=args.seed, max_workers=args.workers)
+
+    for outcome in outcomes:
+        if outcome.assigned:
+            print(f"group {outcome.group_id}: assigned {outcome.assignments} participants")
+        else:
+            print(f"group {outcome.group_id}: FAILED {outcome.error}")
+    assigned = sum(1 for outcome in outcomes if outcome.assigned)
+    print(f"{assigned}/{len(outcomes)} groups assigned", file=sys.stderr)
+    return 0 if assigned == len(outcomes) else 1
+
+
+def reconcile_counts(args: argparse.Namespace) -> int:
+    with get_session() as session:
+        repaired = game_flow.reconcile_participant_counts(session, args.group_ids or None)
+    print(f"{repaired} participant counts repaired")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="Defaults to DATABASE_URL.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    assign_parser = commands.add_parser("assign", help="Assign many groups at once.")
+    assign_parser.add_argument("group_ids", nargs="*", type=int, help="Database ids of the groups.")
+    assign_parser.add_argument(
+        "--status",
+        choices=[GroupStatus.OPEN.value, GroupStatus.LOCKED.value],
+        help="Also assign every group with this status.",
+    )
+    assign_parser.add_argument("--workers", type=int, help="Solver processes (defaults to the CPU count).")
+    assign_parser.add_argument("--seed", type=int, help="Seed for reproducible runs.")
+    assign_parser.set_defaults(handler=assign)
+
+    reconcile_parser = commands.add_parser(
+        "reconcile-counts", help="Recount group participants and repair stored counts."
+    )
+    reconcile_parser.add_argument("group_ids", nargs="*", type=int, help="Database ids (defaults to every group).")
+    reconcile_parser.set_defaults(handler=reconcile_counts)
+
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("DATABASE_URL is required. Set it in the environment or pass --database-url.")
+    init_engine(args.database_url)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,21 @@
+"""Core utilities for configuration and logging."""
 import os
 from dataclasses import dataclass
+from typing import Optional
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
+MODE_POLLING = "polling"
+MODE_WEBHOOK = "webhook"
+
+RATE_LIMIT_MEMORY = "memory"
+RATE_LIMIT_DATABASE = "database"
+
+SOLVER_THREAD = "thread"
+SOLVER_PROCESS = "process"
+
 
 @dataclass(frozen=True)
 class Settings:
@@ -11,6 +23,20 @@ class Settings:
     database_url: str
     log_level: str
     log_path: str
+    mode: str = MODE_POLLING
+    webhook_url: Optional[str] = None
+    webhook_path: str = "/webhook"
+    webhook_secret: Optional[str] = None
+    webhook_host: str = "0.0.0.0"
+    webhook_port: int = 8080
+    webhook_max_in_flight: int = 64
+    workers: int = 1
+    rate_limit_backend: str = RATE_LIMIT_MEMORY
+    solver_executor: str = SOLVER_THREAD
+    solver_workers: Optional[int] = None
+    solver_time_budget: float = 10.0
+    join_announce_window: float = 5.0
+    join_announce_max_batch: int = 50
 
 
 def load_settings() -> Settings:
@@ -18,15 +44,51 @@ def load_settings() -> Settings:
     database_url = os.getenv("DATABASE_URL")
     log_level = os.getenv("LOG_LEVEL", "INFO")
     log_path = os.getenv("LOG_PATH", "logs/telegram_bot.log")
+    mode = os.getenv("BOT_MODE", MODE_POLLING).lower()
+    workers = int(os.getenv("WORKERS", "1"))
+    rate_limit_backend = os.getenv("RATE_LIMIT_BACKEND", RATE_LIMIT_MEMORY).lower()
+    solver_executor = os.getenv("SOLVER_EXECUTOR", SOLVER_THREAD).lower()
+    solver_workers = int(os.getenv("SOLVER_WORKERS", "0")) or None
+    solver_time_budget = float(os.getenv("SOLVER_TIME_BUDGET", "10"))
+    join_announce_window = float(os.getenv("JOIN_ANNOUNCE_WINDOW", "5"))
+    join_announce_max_batch = int(os.getenv("JOIN_ANNOUNCE_MAX_BATCH", "50"))
 
     if not bot_token:
         raise ValueError("BOT_TOKEN is required. Set it in the environment or .env file.")
     if not database_url:
         raise ValueError("DATABASE_URL is required. Set it in the environment or .env file.")
+    if mode not in {MODE_POLLING, MODE_WEBHOOK}:
+        raise ValueError("BOT_MODE should be either 'polling' or 'webhook'.")
+    if workers < 1:
+        raise ValueError("WORKERS should be at least 1.")
+    if rate_limit_backend not in {RATE_LIMIT_MEMORY, RATE_LIMIT_DATABASE}:
+        raise ValueError("RATE_LIMIT_BACKEND should be either 'memory' or 'database'.")
+    if solver_executor not in {SOLVER_THREAD, SOLVER_PROCESS}:
+        raise ValueError("SOLVER_EXECUTOR should be either 'thread' or 'process'.")
+    if solver_time_budget <= 0:
+        raise ValueError("SOLVER_TIME_BUDGET should be a positive number of seconds.")
+    if join_announce_window < 0:
+        raise ValueError("JOIN_ANNOUNCE_WINDOW should not be negative.")
+    if join_announce_max_batch < 1:
+        raise ValueError("JOIN_ANNOUNCE_MAX_BATCH should be at least 1.")
 
     return Settings(
         bot_token=bot_token,
         database_url=database_url,
         log_level=log_level,
         log_path=log_path,
+        mode=mode,
+        webhook_url=os.getenv("WEBHOOK_URL"),
+        webhook_path=os.getenv("WEBHOOK_PATH", "/webhook"),
+        webhook_secret=os.getenv("WEBHOOK_SECRET"),
+        webhook_host=os.getenv("WEBHOOK_HOST", "0.0.0.0"),
+        webhook_port=int(os.getenv("WEBHOOK_PORT", "8080")),
+        webhook_max_in_flight=int(os.getenv("WEBHOOK_MAX_IN_FLIGHT", "64")),
+        workers=workers,
+        rate_limit_backend=rate_limit_backend,
+        solver_executor=solver_executor,
+        solver_workers=solver_workers,
+        solver_time_budget=solver_time_budget,
+        join_announce_window=join_announce_window,
+        join_announce_max_batch=join_announce_max_batch,
     )
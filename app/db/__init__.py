@@ -4,13 +4,26 @@ from app.db.models import (
     Base,
     Group,
     GroupEntitlement,
+    GroupExclusion,
     GroupStatus,
+    NotificationOutbox,
+    OutboxKind,
+    OutboxStatus,
+    RateLimitBucket,
     UpgradeSession,
     User,
     WishlistItem,
     group_participants,
 )
-from app.db.session import SessionLocal, get_session, init_engine
+from app.db.session import (
+    AsyncSessionLocal,
+    SessionLocal,
+    dispose_async_engine,
+    get_async_session,
+    get_session,
+    init_async_engine,
+    init_engine,
+)
 
 __all__ = [
     "Assignment",
@@ -18,12 +31,21 @@ __all__ = [
     "Base",
     "Group",
     "GroupEntitlement",
+    "GroupExclusion",
     "GroupStatus",
+    "NotificationOutbox",
+    "OutboxKind",
+    "OutboxStatus",
+    "RateLimitBucket",
     "UpgradeSession",
     "User",
     "WishlistItem",
     "group_participants",
+    "AsyncSessionLocal",
     "SessionLocal",
+    "dispose_async_engine",
+    "get_async_session",
     "get_session",
+    "init_async_engine",
     "init_engine",
 ]
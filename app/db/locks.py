@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from sqlalchemy import select, update
+
+from app.db.models import Group
+
+
+def acquire_group_lock(session, group_id: int) -> None:
+    """Serialize work on one group across workers until the transaction ends.
+
+    PostgreSQL locks the group row, which is also the lock an upsert of that
+    group takes, so joins and assignments queue behind each other. SQLite has a
+    single writer, so taking its write lock up front gives the same guarantee
+    for local runs.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        session.execute(update(Group).where(Group.id == group_id).values(id=Group.id))
+    else:
+        session.execute(select(Group.id).where(Group.id == group_id).with_for_update())
@@ -3,17 +3,22 @@ from __future__ import annotations
 import enum
 
 from sqlalchemy import (
+    DDL,
     BigInteger,
     Boolean,
     Column,
     Date,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
+    Text,
     UniqueConstraint,
+    event,
 )
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
@@ -28,12 +33,36 @@ class GroupStatus(str, enum.Enum):
     ARCHIVED = "archived"
 
 
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+class OutboxKind(str, enum.Enum):
+    ASSIGNMENT = "assignment"
+    SUMMARY = "summary"
+
+
 group_participants = Table(
     "group_participants",
     Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
     Column("group_id", Integer, ForeignKey("groups.id", ondelete="CASCADE"), primary_key=True),
     UniqueConstraint("user_id", "group_id", name="uq_group_participants_user_group"),
+    # The primary key leads with user_id; counting and listing a group's members needs group_id first.
+    Index("ix_group_participants_group_user", "group_id", "user_id"),
+)
+
+# SQLite has no data-modifying CTEs, so a join bumps the group's count from a trigger
+# inside the insert; PostgreSQL does it in add_user_to_group's statement instead.
+event.listen(
+    group_participants,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER group_participants_count AFTER INSERT ON group_participants "
+        "BEGIN UPDATE groups SET participant_count = participant_count + 1 WHERE id = NEW.group_id; END"
+    ).execute_if(dialect="sqlite"),
 )
 
 
@@ -75,6 +104,10 @@ class Group(Base):
     budget_amount = Column(Integer, nullable=True)
     currency = Column(String(3), nullable=False, server_default="EUR")
     gift_deadline = Column(Date, nullable=True)
+    last_round = Column(Integer, nullable=False, default=0, server_default="0")
+    no_repeat_rounds = Column(Integer, nullable=False, default=1, server_default="1")
+    # Bumped by the statement that adds a participant; `python -m app.cli reconcile-counts` repairs drift.
+    participant_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     participants = relationship("User", secondary=group_participants, back_populates="groups")
     assignments = relationship("Assignment", back_populates="group", cascade="all, delete-orphan")
@@ -108,8 +141,15 @@ class AssignmentHistory(Base):
     group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
     giver_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     receiver_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    round_number = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        UniqueConstraint(
+            "group_id", "round_number", "giver_user_id", name="uq_assignment_history_group_round_giver"
+        ),
+    )
+
 
 class WishlistItem(Base):
     __tablename__ = "wishlist_items"
@@ -120,6 +160,28 @@ class WishlistItem(Base):
     text = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_wishlist_items_group_user", "group_id", "user_id"),
+    )
+
+
+class GroupExclusion(Base):
+    __tablename__ = "group_exclusions"
+
+    id = Column(Integer, primary_key=True)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+    giver_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    receiver_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    symmetric = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    giver = relationship("User", foreign_keys=[giver_user_id])
+    receiver = relationship("User", foreign_keys=[receiver_user_id])
+
+    __table_args__ = (
+        UniqueConstraint("group_id", "giver_user_id", "receiver_user_id", name="uq_group_exclusions_pair"),
+    )
+
 
 class GroupEntitlement(Base):
     __tablename__ = "group_entitlements"
@@ -140,3 +202,39 @@ class UpgradeSession(Base):
     status = Column(String, nullable=False, default="pending")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class NotificationOutbox(Base):
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(String(32), nullable=False)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+    chat_id = Column(BigInteger, nullable=False)
+    kind = Column(Enum(OutboxKind, name="outbox_kind"), nullable=False)
+    label = Column(String, nullable=True)
+    text = Column(Text, nullable=False)
+    status = Column(
+        Enum(OutboxStatus, name="outbox_status"),
+        nullable=False,
+        default=OutboxStatus.PENDING,
+        server_default=OutboxStatus.PENDING.value,
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_notification_outbox_batch", "batch_id"),
+    )
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(128), primary_key=True)
+    tat = Column(Float, nullable=False)
+    allowed = Column(Boolean, nullable=False, default=True)
@@ -1,56 +1,90 @@
 from __future__ import annotations
 
 import datetime
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
-from sqlalchemy import and_, delete, func, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Integer, and_, case, delete, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.db.models import (
     Assignment,
     AssignmentHistory,
     Group,
     GroupEntitlement,
+    GroupExclusion,
     GroupStatus,
+    NotificationOutbox,
+    OutboxKind,
+    OutboxStatus,
+    RateLimitBucket,
     UpgradeSession,
     User,
     WishlistItem,
     group_participants,
 )
 
+PARTICIPANT_PAGE_SIZE = 1000
+
+
+class ParticipantRow(NamedTuple):
+    """The user columns participant listings need, without an ORM identity."""
+
+    id: int
+    telegram_id: int
+    telegram_username: Optional[str]
+    display_name: Optional[str]
+    has_private_chat: bool
+
+
+_PARTICIPANT_COLUMNS = (
+    User.id,
+    User.telegram_id,
+    User.telegram_username,
+    User.display_name,
+    User.has_private_chat,
+)
+
 
 def get_user_by_telegram_id(session, telegram_id: int) -> Optional[User]:
     return session.scalar(select(User).where(User.telegram_id == telegram_id))
 
 
+def _upsert(session, table):
+    """The dialect's ``insert`` with ``ON CONFLICT`` support."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise ValueError(f"Upserts are not supported on the {dialect} dialect.")
+
+
+def _upsert_returning_one(session, statement):
+    # populate_existing would overwrite unflushed edits, and sessions here do not autoflush.
+    session.flush()
+    return session.scalars(statement.execution_options(populate_existing=True)).one()
+
+
 def upsert_user(
     session,
     telegram_id: int,
     telegram_username: Optional[str],
     display_name: Optional[str],
 ) -> User:
-    user = get_user_by_telegram_id(session, telegram_id)
-    if user:
-        user.telegram_username = telegram_username
-        user.display_name = display_name
-        return user
-
-    user = User(
-        telegram_id=telegram_id,
-        telegram_username=telegram_username,
-        display_name=display_name,
+    statement = _upsert(session, User).values(
+        telegram_id=telegram_id, telegram_username=telegram_username, display_name=display_name
     )
-    session.add(user)
-    session.flush()
-    return user
-
-
-def mark_user_private_chat(session, telegram_id: int) -> Optional[User]:
-    user = get_user_by_telegram_id(session, telegram_id)
-    if not user:
-        return None
-    user.has_private_chat = True
-    return user
+    statement = statement.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_={
+            "telegram_username": statement.excluded.telegram_username,
+            "display_name": statement.excluded.display_name,
+        },
+    ).returning(User)
+    return _upsert_returning_one(session, statement)
 
 
 def get_group_by_telegram_id(session, telegram_id: int) -> Optional[Group]:
@@ -83,14 +117,24 @@ def get_or_create_group(
     created_by_telegram_id: Optional[int],
     title: Optional[str],
 ) -> Group:
-    group = get_group_by_telegram_id(session, telegram_id)
-    if group:
-        if title and group.title != title:
-            group.title = title
-        if created_by_telegram_id and group.created_by_telegram_id is None:
-            group.created_by_telegram_id = created_by_telegram_id
-        return group
-    return create_group(session, telegram_id, created_by_telegram_id, title)
+    """Insert or refresh the group in one statement.
+
+    An existing group is updated, so its row stays locked until the transaction
+    ends; the join path relies on this instead of a separate group lock.
+    """
+    statement = _upsert(session, Group).values(
+        telegram_id=telegram_id, created_by_telegram_id=created_by_telegram_id, title=title
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[Group.telegram_id],
+        set_={
+            "title": func.coalesce(statement.excluded.title, Group.title),
+            "created_by_telegram_id": func.coalesce(
+                Group.created_by_telegram_id, statement.excluded.created_by_telegram_id
+            ),
+        },
+    ).returning(Group)
+    return _upsert_returning_one(session, statement)
 
 
 def count_group_participants(session, group_id: int) -> int:
@@ -109,24 +153,149 @@ def is_user_in_group(session, user_id: int, group_id: int) -> bool:
     ) > 0
 
 
-def add_user_to_group(session, user_id: int, group_id: int) -> bool:
-    if is_user_in_group(session, user_id, group_id):
-        return False
-    try:
-        session.execute(group_participants.insert().values(user_id=user_id, group_id=group_id))
-        return True
-    except IntegrityError:
+def add_user_to_group(session, user_id: int, group: Group, max_participants: Optional[int] = None) -> bool:
+    """Add the user unless they are already in the group or it is full, in one statement.
+
+    The cap is checked against ``groups.participant_count`` in the insert itself,
+    and the same statement bumps the count: on PostgreSQL the insert is a CTE
+    feeding the ``UPDATE``, on SQLite the ``group_participants_count`` trigger
+    does it. The caller must hold the group lock so concurrent joins cannot
+    both see room for one more participant.
+    """
+    statement = _upsert(session, group_participants)
+    if max_participants:
+        count = select(Group.participant_count).where(Group.id == group.id).scalar_subquery()
+        statement = statement.from_select(
+            ["user_id", "group_id"], select(literal(user_id), literal(group.id)).where(count < max_participants)
+        )
+    else:
+        statement = statement.values(user_id=user_id, group_id=group.id)
+    statement = statement.on_conflict_do_nothing()
+    if session.get_bind().dialect.name == "postgresql":
+        inserted = statement.returning(group_participants.c.group_id).cte("inserted")
+        statement = (
+            update(Group)
+            .where(Group.id == inserted.c.group_id)
+            .values(participant_count=Group.participant_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+    if session.execute(statement).rowcount != 1:
         return False
+    # The group row is locked, so the count loaded with it is still exact.
+    set_committed_value(group, "participant_count", group.participant_count + 1)
+    return True
+
+
+def find_group_participant(
+    session, group_id: int, telegram_id: Optional[int] = None, username: Optional[str] = None
+) -> Optional[User]:
+    """The participant with this Telegram id, or else this username (case-insensitive)."""
+    statement = (
+        select(User)
+        .join(group_participants, group_participants.c.user_id == User.id)
+        .where(group_participants.c.group_id == group_id)
+    )
+    if telegram_id is not None:
+        statement = statement.where(User.telegram_id == telegram_id)
+    else:
+        statement = statement.where(func.lower(User.telegram_username) == (username or "").lower())
+    return session.scalars(statement.limit(1)).first()
+
+
+def list_group_participant_ids(session, group_id: int) -> List[int]:
+    return list(
+        session.scalars(
+            select(group_participants.c.user_id)
+            .where(group_participants.c.group_id == group_id)
+            .order_by(group_participants.c.user_id)
+        ).all()
+    )
+
+
+def list_group_participant_rows(
+    session, group_id: int, after_id: int = 0, limit: Optional[int] = None
+) -> List[ParticipantRow]:
+    """Participants ordered by user id, starting after ``after_id``, one query per page."""
+    statement = (
+        select(*_PARTICIPANT_COLUMNS)
+        .join(group_participants, group_participants.c.user_id == User.id)
+        .where(group_participants.c.group_id == group_id, group_participants.c.user_id > after_id)
+        .order_by(group_participants.c.user_id)
+        .limit(limit)
+    )
+    return [ParticipantRow._make(row) for row in session.execute(statement)]
+
+
+def iter_group_participant_rows(
+    session, group_id: int, page_size: int = PARTICIPANT_PAGE_SIZE
+) -> Iterator[ParticipantRow]:
+    """Stream participants page by page so huge groups are never held in memory at once."""
+    after_id = 0
+    while True:
+        page = list_group_participant_rows(session, group_id, after_id, page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        after_id = page[-1].id
+
+
+def get_groups_by_ids(session, group_ids: Iterable[int]) -> List[Group]:
+    # populate_existing so groups already in the session reflect rows read under a lock.
+    statement = select(Group).where(Group.id.in_(list(group_ids))).execution_options(populate_existing=True)
+    return list(session.scalars(statement).all())
+
 
+def list_group_ids(session) -> List[int]:
+    return list(session.scalars(select(Group.id).order_by(Group.id)).all())
 
-def list_group_participants(session, group_id: int) -> List[User]:
-    group = session.scalar(select(Group).where(Group.id == group_id))
-    return list(group.participants) if group else []
+
+def reconcile_participant_counts(session, group_ids: Iterable[int]) -> int:
+    """Reset ``participant_count`` from ``group_participants`` where they disagree; returns groups fixed."""
+    actual = (
+        select(func.count())
+        .select_from(group_participants)
+        .where(group_participants.c.group_id == Group.id)
+        .scalar_subquery()
+    )
+    statement = (
+        update(Group)
+        .where(Group.id.in_(list(group_ids)), Group.participant_count != actual)
+        .values(participant_count=actual)
+        .execution_options(synchronize_session="fetch")
+    )
+    return session.execute(statement).rowcount or 0
 
 
-def list_groups_for_user(session, user_id: int) -> List[Group]:
-    user = session.scalar(select(User).where(User.id == user_id))
-    return list(user.groups) if user else []
+def list_group_ids_by_status(session, status: GroupStatus) -> List[int]:
+    return list(session.scalars(select(Group.id).where(Group.status == status).order_by(Group.id)).all())
+
+
+def list_participants_for_groups(session, group_ids: Iterable[int]) -> Dict[int, List[ParticipantRow]]:
+    group_ids = list(group_ids)
+    participants: Dict[int, List[ParticipantRow]] = {group_id: [] for group_id in group_ids}
+    rows = session.execute(
+        select(group_participants.c.group_id, *_PARTICIPANT_COLUMNS)
+        .join(User, User.id == group_participants.c.user_id)
+        .where(group_participants.c.group_id.in_(group_ids))
+        .order_by(group_participants.c.group_id, group_participants.c.user_id)
+    )
+    for group_id, *columns in rows:
+        participants[group_id].append(ParticipantRow._make(columns))
+    return participants
+
+
+def list_groups_for_user(
+    session, user_id: int, statuses: Optional[Iterable[GroupStatus]] = None
+) -> List[Group]:
+    statement = (
+        select(Group)
+        .join(group_participants, group_participants.c.group_id == Group.id)
+        .where(group_participants.c.user_id == user_id)
+        .order_by(group_participants.c.group_id)
+    )
+    if statuses is not None:
+        statement = statement.where(Group.status.in_(list(statuses)))
+    return list(session.scalars(statement).all())
 
 
 def update_group_status(
@@ -156,50 +325,87 @@ def update_group_deadline(session, group: Group, gift_deadline: Optional[datetim
     group.gift_deadline = gift_deadline
 
 
+def update_group_no_repeat_rounds(session, group: Group, rounds: int) -> None:
+    group.no_repeat_rounds = rounds
+
+
 def update_group_assignment_seed(session, group: Group, seed: Optional[int]) -> None:
     group.last_assignment_seed = seed
 
 
+def insert_assignments(session, rows: List[Dict[str, int]]) -> None:
+    """Insert ``group_id``/``giver_user_id``/``receiver_user_id`` rows for any number of groups at once."""
+    if rows:
+        session.execute(insert(Assignment), rows)
+
+
 def create_assignments(session, group_id: int, assignments: dict[int, int]) -> None:
-    rows = [
-        Assignment(group_id=group_id, giver_user_id=giver_id, receiver_user_id=receiver_id)
-        for giver_id, receiver_id in assignments.items()
-    ]
-    session.add_all(rows)
+    insert_assignments(
+        session,
+        [
+            {"group_id": group_id, "giver_user_id": giver_id, "receiver_user_id": receiver_id}
+            for giver_id, receiver_id in assignments.items()
+        ],
+    )
 
 
 def list_assignments(session, group_id: int) -> List[Assignment]:
     return list(session.scalars(select(Assignment).where(Assignment.group_id == group_id)).all())
 
 
-def archive_assignments(session, group_id: int) -> int:
-    assignments = list_assignments(session, group_id)
-    if not assignments:
-        return 0
-    history_rows = [
-        AssignmentHistory(
-            group_id=group_id,
-            giver_user_id=assignment.giver_user_id,
-            receiver_user_id=assignment.receiver_user_id,
+def archive_assignments(session, group: Group) -> int:
+    """Copy the group's assignments into history as its next round, inside the database."""
+    round_number = group.last_round + 1
+    rows = select(
+        Assignment.group_id,
+        Assignment.giver_user_id,
+        Assignment.receiver_user_id,
+        literal(round_number, Integer),
+    ).where(Assignment.group_id == group.id)
+    archived = session.execute(
+        insert(AssignmentHistory).from_select(
+            ["group_id", "giver_user_id", "receiver_user_id", "round_number"], rows
         )
-        for assignment in assignments
-    ]
-    session.add_all(history_rows)
-    return len(history_rows)
+    ).rowcount
+    if archived:
+        group.last_round = round_number
+    return archived
 
 
 def clear_assignments(session, group_id: int) -> None:
     session.execute(delete(Assignment).where(Assignment.group_id == group_id))
 
 
-def get_latest_assignment_history(session, group_id: int) -> List[AssignmentHistory]:
-    return list(
-        session.scalars(
-            select(AssignmentHistory)
-            .where(AssignmentHistory.group_id == group_id)
-            .order_by(AssignmentHistory.created_at.desc())
-        ).all()
+def get_assignment_rounds(session, group_id: int, first_round: int, last_round: int) -> Dict[int, Set[int]]:
+    """Receivers each giver had in rounds ``first_round`` to ``last_round`` inclusive."""
+    return get_assignment_rounds_for_groups(session, {group_id: (first_round, last_round)})[group_id]
+
+
+def get_assignment_rounds_for_groups(
+    session, windows: Dict[int, Tuple[int, int]]
+) -> Dict[int, Dict[int, Set[int]]]:
+    """``get_assignment_rounds`` for several groups, each with its own round window, in one query."""
+    receivers: Dict[int, Dict[int, Set[int]]] = {group_id: {} for group_id in windows}
+    if not windows:
+        return receivers
+    rows = session.execute(
+        select(
+            AssignmentHistory.group_id, AssignmentHistory.giver_user_id, AssignmentHistory.receiver_user_id
+        ).where(
+            or_(
+                *(
+                    and_(
+                        AssignmentHistory.group_id == group_id,
+                        AssignmentHistory.round_number.between(first_round, last_round),
+                    )
+                    for group_id, (first_round, last_round) in windows.items()
+                )
+            )
+        )
     )
+    for group_id, giver_id, receiver_id in rows:
+        receivers[group_id].setdefault(giver_id, set()).add(receiver_id)
+    return receivers
 
 
 def list_wishlist_items(session, group_id: int, user_id: int) -> List[WishlistItem]:
@@ -212,6 +418,21 @@ def list_wishlist_items(session, group_id: int, user_id: int) -> List[WishlistIt
     )
 
 
+def list_wishlist_items_for_group(session, group_id: int, user_ids: Iterable[int]) -> Dict[int, List[str]]:
+    user_ids = list(user_ids)
+    wishlists: Dict[int, List[str]] = {user_id: [] for user_id in user_ids}
+    if not user_ids:
+        return wishlists
+    rows = session.execute(
+        select(WishlistItem.user_id, WishlistItem.text)
+        .where(and_(WishlistItem.group_id == group_id, WishlistItem.user_id.in_(user_ids)))
+        .order_by(WishlistItem.id)
+    )
+    for user_id, text in rows:
+        wishlists[user_id].append(text)
+    return wishlists
+
+
 def add_wishlist_item(session, group_id: int, user_id: int, text: str) -> WishlistItem:
     item = WishlistItem(group_id=group_id, user_id=user_id, text=text)
     session.add(item)
@@ -228,6 +449,76 @@ def clear_wishlist_items(session, group_id: int, user_id: int) -> int:
     return result.rowcount or 0
 
 
+def get_group_exclusion(session, group_id: int, giver_id: int, receiver_id: int) -> Optional[GroupExclusion]:
+    return session.scalar(
+        select(GroupExclusion).where(
+            and_(
+                GroupExclusion.group_id == group_id,
+                GroupExclusion.giver_user_id == giver_id,
+                GroupExclusion.receiver_user_id == receiver_id,
+            )
+        )
+    )
+
+
+def add_group_exclusion(
+    session, group_id: int, giver_id: int, receiver_id: int, symmetric: bool
+) -> GroupExclusion:
+    exclusion = GroupExclusion(
+        group_id=group_id, giver_user_id=giver_id, receiver_user_id=receiver_id, symmetric=symmetric
+    )
+    session.add(exclusion)
+    session.flush()
+    return exclusion
+
+
+def delete_group_exclusions(session, group_id: int, first_id: int, second_id: int) -> int:
+    """Delete the exclusion between two users, in either direction."""
+    result = session.execute(
+        delete(GroupExclusion).where(
+            and_(
+                GroupExclusion.group_id == group_id,
+                GroupExclusion.giver_user_id.in_([first_id, second_id]),
+                GroupExclusion.receiver_user_id.in_([first_id, second_id]),
+            )
+        )
+    )
+    return result.rowcount or 0
+
+
+def list_group_exclusions(session, group_id: int) -> List[GroupExclusion]:
+    return list(
+        session.scalars(
+            select(GroupExclusion).where(GroupExclusion.group_id == group_id).order_by(GroupExclusion.id)
+        ).all()
+    )
+
+
+def list_exclusion_pairs(session, group_id: int) -> List[Tuple[int, int]]:
+    """Every (giver, receiver) pair a group's exclusions forbid, with symmetric ones in both directions."""
+    return list_exclusion_pairs_for_groups(session, [group_id])[group_id]
+
+
+def list_exclusion_pairs_for_groups(session, group_ids: Iterable[int]) -> Dict[int, List[Tuple[int, int]]]:
+    group_ids = list(group_ids)
+    pairs: Dict[int, List[Tuple[int, int]]] = {group_id: [] for group_id in group_ids}
+    if not group_ids:
+        return pairs
+    rows = session.execute(
+        select(
+            GroupExclusion.group_id,
+            GroupExclusion.giver_user_id,
+            GroupExclusion.receiver_user_id,
+            GroupExclusion.symmetric,
+        ).where(GroupExclusion.group_id.in_(group_ids))
+    )
+    for group_id, giver_id, receiver_id, symmetric in rows:
+        pairs[group_id].append((giver_id, receiver_id))
+        if symmetric:
+            pairs[group_id].append((receiver_id, giver_id))
+    return pairs
+
+
 def get_group_entitlement(session, group_id: int) -> Optional[GroupEntitlement]:
     return session.scalar(select(GroupEntitlement).where(GroupEntitlement.group_id == group_id))
 
@@ -272,3 +563,191 @@ def get_upgrade_session_by_token(session, token: str) -> Optional[UpgradeSession
 
 def activate_upgrade_session(session, upgrade_session: UpgradeSession) -> None:
     upgrade_session.status = "activated"
+
+
+def enqueue_notifications(session, rows: Iterable[NotificationOutbox]) -> None:
+    session.add_all(list(rows))
+
+
+def claim_due_notifications(
+    session,
+    now: datetime.datetime,
+    lease_until: datetime.datetime,
+    limit: int,
+) -> List[NotificationOutbox]:
+    rows = list(
+        session.scalars(
+            select(NotificationOutbox)
+            .where(
+                and_(
+                    NotificationOutbox.status == OutboxStatus.PENDING,
+                    NotificationOutbox.kind == OutboxKind.ASSIGNMENT,
+                    NotificationOutbox.next_attempt_at <= now,
+                )
+            )
+            .order_by(NotificationOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+    )
+    # Push the claimed rows into the future so another drain (or another worker)
+    # skips them while they are in flight; a crash lets the lease expire.
+    for row in rows:
+        row.next_attempt_at = lease_until
+    return rows
+
+
+def mark_notifications_sent(session, notification_ids: List[int], sent_at: datetime.datetime) -> None:
+    if not notification_ids:
+        return
+    session.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(notification_ids))
+        .values(status=OutboxStatus.SENT, sent_at=sent_at, attempts=NotificationOutbox.attempts + 1)
+    )
+
+
+def mark_notification_failed(
+    session,
+    notification_id: int,
+    error: str,
+    next_attempt_at: Optional[datetime.datetime],
+) -> None:
+    values = {"attempts": NotificationOutbox.attempts + 1, "last_error": error[:500]}
+    if next_attempt_at is None:
+        values["status"] = OutboxStatus.DEAD
+    else:
+        values["next_attempt_at"] = next_attempt_at
+    session.execute(update(NotificationOutbox).where(NotificationOutbox.id == notification_id).values(**values))
+
+
+def claim_ready_summaries(
+    session,
+    now: datetime.datetime,
+    lease_until: datetime.datetime,
+    limit: int,
+) -> List[NotificationOutbox]:
+    """Claim summaries whose batch has no pending assignment DMs left.
+
+    Claimed rows are leased like ``claim_due_notifications`` so a second worker
+    cannot post the same summary while the first is sending it.
+    """
+    summary = aliased(NotificationOutbox, name="summary")
+    pending_assignments = (
+        select(NotificationOutbox.id)
+        .where(
+            and_(
+                NotificationOutbox.batch_id == summary.batch_id,
+                NotificationOutbox.kind == OutboxKind.ASSIGNMENT,
+                NotificationOutbox.status == OutboxStatus.PENDING,
+            )
+        )
+        .exists()
+    )
+    rows = list(
+        session.scalars(
+            select(summary)
+            .where(
+                and_(
+                    summary.status == OutboxStatus.PENDING,
+                    summary.kind == OutboxKind.SUMMARY,
+                    summary.next_attempt_at <= now,
+                    ~pending_assignments,
+                )
+            )
+            .order_by(summary.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+    )
+    for row in rows:
+        row.next_attempt_at = lease_until
+    return rows
+
+
+def list_dead_notification_labels(session, batch_id: str) -> List[str]:
+    return list(
+        session.scalars(
+            select(NotificationOutbox.label).where(
+                and_(
+                    NotificationOutbox.batch_id == batch_id,
+                    NotificationOutbox.kind == OutboxKind.ASSIGNMENT,
+                    NotificationOutbox.status == OutboxStatus.DEAD,
+                )
+            )
+        ).all()
+    )
+
+
+def hit_rate_limit_buckets(
+    session, keys: List[str], now: float, interval: float, period: float
+) -> Dict[str, Tuple[float, bool]]:
+    """Record one GCRA hit for each distinct key in a single upsert.
+
+    Returns each key's theoretical arrival time after the hit and whether the
+    hit was allowed. A denied hit leaves the stored arrival time unchanged.
+    """
+    table = RateLimitBucket.__table__
+    base = case((table.c.tat > now, table.c.tat), else_=now)
+    fits = base + interval - now <= period
+    statement = (
+        _upsert(session, table)
+        .values([{"key": key, "tat": now + interval, "allowed": True} for key in keys])
+        .on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={"tat": case((fits, base + interval), else_=table.c.tat), "allowed": fits},
+        )
+        .returning(table.c.key, table.c.tat, table.c.allowed)
+    )
+    return {key: (tat, bool(allowed)) for key, tat, allowed in session.execute(statement)}
+
+
+def purge_rate_limit_buckets(session, now: float) -> int:
+    result = session.execute(delete(RateLimitBucket).where(RateLimitBucket.tat < now))
+    return result.rowcount or 0
+
+
+# Async variants for handlers running on the event loop. Each one runs the sync
+# query above through ``AsyncSession.run_sync`` so the IO goes through the async
+# driver (asyncpg/aiosqlite) instead of blocking the loop.
+
+
+async def get_user_by_telegram_id_async(session: AsyncSession, telegram_id: int) -> Optional[User]:
+    return await session.run_sync(get_user_by_telegram_id, telegram_id)
+
+
+async def get_group_by_telegram_id_async(session: AsyncSession, telegram_id: int) -> Optional[Group]:
+    return await session.run_sync(get_group_by_telegram_id, telegram_id)
+
+
+async def get_group_by_id_async(session: AsyncSession, group_id: int) -> Optional[Group]:
+    return await session.run_sync(get_group_by_id, group_id)
+
+
+async def get_or_create_group_async(
+    session: AsyncSession,
+    telegram_id: int,
+    created_by_telegram_id: Optional[int],
+    title: Optional[str],
+) -> Group:
+    return await session.run_sync(get_or_create_group, telegram_id, created_by_telegram_id, title)
+
+
+async def list_groups_for_user_async(
+    session: AsyncSession, user_id: int, statuses: Optional[Iterable[GroupStatus]] = None
+) -> List[Group]:
+    return await session.run_sync(list_groups_for_user, user_id, statuses)
+
+
+async def get_upgrade_session_by_token_async(session: AsyncSession, token: str) -> Optional[UpgradeSession]:
+    return await session.run_sync(get_upgrade_session_by_token, token)
+
+
+async def hit_rate_limit_buckets_async(
+    session: AsyncSession, keys: List[str], now: float, interval: float, period: float
+) -> Dict[str, Tuple[float, bool]]:
+    return await session.run_sync(hit_rate_limit_buckets, keys, now, interval, period)
+
+
+async def purge_rate_limit_buckets_async(session: AsyncSession, now: float) -> int:
+    return await session.run_sync(purge_rate_limit_buckets, now)
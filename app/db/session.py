@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
 
 def init_engine(database_url: str):
@@ -14,11 +22,36 @@ def init_engine(database_url: str):
     return engine
 
 
+def to_async_url(database_url: str) -> str:
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if url.get_driver_name() in {"asyncpg", "aiosqlite"} or backend not in ASYNC_DRIVERS:
+        return url.render_as_string(hide_password=False)
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def init_async_engine(database_url: str):
+    engine = create_async_engine(to_async_url(database_url), pool_pre_ping=True)
+    AsyncSessionLocal.configure(bind=engine)
+    return engine
+
+
+async def dispose_async_engine() -> None:
+    engine = AsyncSessionLocal.kw.get("bind")
+    if engine is not None:
+        await engine.dispose()
+
+
 def _ensure_initialized() -> None:
     if SessionLocal.kw.get("bind") is None:
         raise RuntimeError("Database engine not initialized. Call init_engine() before use.")
 
 
+def _ensure_async_initialized() -> None:
+    if AsyncSessionLocal.kw.get("bind") is None:
+        raise RuntimeError("Async database engine not initialized. Call init_async_engine() before use.")
+
+
 @contextmanager
 def get_session():
     _ensure_initialized()
@@ -31,3 +64,17 @@ def get_session():
         raise
     finally:
         session.close()
+
+
+@asynccontextmanager
+async def get_async_session():
+    _ensure_async_initialized()
+    session = AsyncSessionLocal()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, FrozenSet, Optional
+
+from aiogram.enums import ChatMemberStatus
+from loguru import logger
+
+from app.services.cache import TTLCache
+
+ADMIN_STATUSES = {ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.CREATOR}
+
+
+class AdminRoster:
+    """Per-chat admin lists loaded with one ``get_chat_administrators`` call.
+
+    Rosters expire after ``ttl_seconds`` and are dropped early when a
+    ``my_chat_member``/``chat_member`` update says an admin changed.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_chats: int = 10_000) -> None:
+        self._rosters: TTLCache[int, FrozenSet[int]] = TTLCache(ttl_seconds, max_chats)
+        self._loading: Dict[int, asyncio.Task] = {}
+
+    async def is_admin(self, bot, chat_id: int, user_id: int) -> bool:
+        roster = self._rosters.get(chat_id)
+        if roster is None:
+            roster = await self._load(bot, chat_id)
+            if roster is None:
+                return await self._check_member(bot, chat_id, user_id)
+        return user_id in roster
+
+    def invalidate(self, chat_id: int) -> None:
+        self._rosters.invalidate(chat_id)
+
+    def clear(self) -> None:
+        self._rosters.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return self._rosters.stats()
+
+    async def _load(self, bot, chat_id: int) -> Optional[FrozenSet[int]]:
+        # Admin commands tend to arrive in bursts; share one API call per chat.
+        task = self._loading.get(chat_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(bot, chat_id))
+            self._loading[chat_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(chat_id, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, bot, chat_id: int) -> Optional[FrozenSet[int]]:
+        try:
+            members = await bot.get_chat_administrators(chat_id)
+        except Exception as exc:  # pragma: no cover - network dependent
+            logger.bind(chat_id=chat_id).warning(
+                "Failed to load chat administrators: {error}", error=str(exc)
+            )
+            return None
+        roster = frozenset(member.user.id for member in members)
+        self._rosters.set(chat_id, roster)
+        return roster
+
+    async def _check_member(self, bot, chat_id: int, user_id: int) -> bool:
+        try:
+            member = await bot.get_chat_member(chat_id, user_id)
+        except Exception as exc:  # pragma: no cover - network dependent
+            logger.bind(chat_id=chat_id, user_id=user_id).warning(
+                "Failed to check admin status: {error}", error=str(exc)
+            )
+            return False
+        return member.status in ADMIN_STATUSES
+
+
+admin_roster = AdminRoster()
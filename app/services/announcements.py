@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, List, Optional, Set
+
+from loguru import logger
+
+from app.services.delivery import DeliveryEngine, OutgoingMessage, delivery_engine
+
+MAX_NAMES_IN_ANNOUNCEMENT = 5
+
+
+def compose_join_announcement(labels: List[str], max_names: int = MAX_NAMES_IN_ANNOUNCEMENT) -> str:
+    if len(labels) == 1:
+        names = labels[0]
+    elif len(labels) <= max_names:
+        names = ", ".join(labels[:-1]) + " and " + labels[-1]
+    else:
+        others = len(labels) - max_names
+        names = ", ".join(labels[:max_names]) + f" and {others} {'other' if others == 1 else 'others'}"
+    return f"{names} joined the Secret Santa game!"
+
+
+class JoinAnnouncer:
+    """Collects joins per chat and announces them in one message.
+
+    The first join in a chat opens a window of ``window_seconds``; everyone who
+    joins before it closes is named in a single message, so a busy join button
+    costs one send per window instead of one per person. A batch that reaches
+    ``max_batch`` people is announced straight away.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[DeliveryEngine] = None,
+        window_seconds: float = 5.0,
+        max_batch: int = 50,
+    ) -> None:
+        self.engine = engine or delivery_engine
+        self.configure(window_seconds, max_batch)
+        self._pending: Dict[int, List[str]] = {}
+        self._timers: Dict[int, asyncio.Task] = {}
+        self._flushing: Set[asyncio.Task] = set()
+        self._bots: Dict[int, object] = {}
+
+    def configure(self, window_seconds: float, max_batch: int) -> None:
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+
+    def add(self, bot, chat_id: int, label: str) -> None:
+        labels = self._pending.setdefault(chat_id, [])
+        labels.append(label)
+        self._bots[chat_id] = bot
+        if len(labels) >= self.max_batch:
+            timer = self._timers.pop(chat_id, None)
+            if timer is not None:
+                timer.cancel()
+            task = asyncio.create_task(self._flush(chat_id), name=f"join-announcement-{chat_id}")
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+        elif chat_id not in self._timers:
+            self._timers[chat_id] = asyncio.create_task(
+                self._flush_later(chat_id), name=f"join-announcement-{chat_id}"
+            )
+
+    def pending(self, chat_id: int) -> List[str]:
+        return list(self._pending.get(chat_id, []))
+
+    async def flush_all(self) -> None:
+        """Announce every open batch now; used on shutdown so no join goes unannounced."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        await asyncio.gather(*self._flushing, *(self._flush(chat_id) for chat_id in list(self._pending)))
+
+    async def _flush_later(self, chat_id: int) -> None:
+        await asyncio.sleep(self.window_seconds)
+        self._timers.pop(chat_id, None)
+        await self._flush(chat_id)
+
+    async def _flush(self, chat_id: int) -> None:
+        labels = self._pending.pop(chat_id, None)
+        bot = self._bots.pop(chat_id, None)
+        if not labels or bot is None:
+            return
+        try:
+            await self.engine.deliver(bot, [OutgoingMessage(chat_id, compose_join_announcement(labels))])
+        except Exception as exc:
+            logger.bind(chat_id=chat_id).warning(
+                "Failed to announce {count} joins: {error}", count=len(labels), error=str(exc)
+            )
+
+
+join_announcer = JoinAnnouncer()
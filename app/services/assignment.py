@@ -1,82 +1,368 @@
 from __future__ import annotations
 
 import random
+import time
+from collections import deque
+from itertools import chain
 from dataclasses import dataclass
-from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+from typing import Collection, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+UNMATCHED = -1
+UNREACHABLE = float("inf")
+
+# Receivers each giver must not get again: one per giver for the previous round,
+# or a collection of them for a window of several rounds.
+NoRepeatMap = Mapping[int, Union[int, Collection[int]]]
 
 
 class AssignmentError(RuntimeError):
     pass
 
 
+class AssignmentTimeout(AssignmentError):
+    pass
+
+
+class UnsatisfiableError(AssignmentError):
+    """No valid assignment exists.
+
+    ``givers`` can only give to ``receivers``, and there are fewer receivers than
+    givers (Hall's condition fails), so no change of seed will help.
+    """
+
+    def __init__(self, givers: List[int], receivers: List[int]) -> None:
+        super().__init__("Assignment constraints are too strict to satisfy.")
+        self.givers = givers
+        self.receivers = receivers
+
+
 @dataclass(frozen=True)
-class AssignmentConstraints:
-    exclusions: Set[Tuple[int, int]]
-    no_repeat_map: Dict[int, int]
+class AssignmentSolution:
+    assignments: Dict[int, int]
+    strategy: str
+    edges: int = 0
+    phases: int = 0
 
 
-def _build_constraints(
+@dataclass(frozen=True)
+class CompiledConstraints:
+    """Participants mapped to dense indexes, with each giver's forbidden receivers as index sets."""
+
+    participants: List[int]
+    forbidden: List[Set[int]]
+
+    @property
+    def empty(self) -> bool:
+        return not any(self.forbidden)
+
+
+def compile_constraints(
     participant_ids: Sequence[int],
-    exclusions: Optional[Iterable[Tuple[int, int]]],
-    no_repeat_map: Optional[Dict[int, int]],
-) -> AssignmentConstraints:
-    exclusion_set = set(exclusions or [])
-    no_repeat = dict(no_repeat_map or {})
-    for participant_id in participant_ids:
-        exclusion_set.add((participant_id, participant_id))
-    return AssignmentConstraints(exclusions=exclusion_set, no_repeat_map=no_repeat)
+    exclusions: Optional[Iterable[Tuple[int, int]]] = None,
+    no_repeat_map: Optional[NoRepeatMap] = None,
+) -> CompiledConstraints:
+    participants = list(participant_ids)
+    index = {participant: position for position, participant in enumerate(participants)}
+    forbidden: List[Set[int]] = [set() for _ in participants]
 
+    # Pairs involving people outside this round cannot affect it, so they are dropped
+    # up front; that is what lets an unconstrained round take the fast path.
+    def forbid(giver: int, receiver: int) -> None:
+        giver_index = index.get(giver)
+        receiver_index = index.get(receiver)
+        if giver_index is not None and receiver_index is not None and giver_index != receiver_index:
+            forbidden[giver_index].add(receiver_index)
 
-def generate_assignments(
+    for giver, receiver in exclusions or []:
+        forbid(giver, receiver)
+    for giver, receivers in (no_repeat_map or {}).items():
+        if isinstance(receivers, int):
+            receivers = (receivers,)
+        for receiver in receivers:
+            forbid(giver, receiver)
+    return CompiledConstraints(participants=participants, forbidden=forbidden)
+
+
+def _single_cycle(participants: List[int], rng: random.Random) -> Dict[int, int]:
+    """Shuffle, then link each giver to the next one: a uniformly random single cycle, in O(n)."""
+    order = list(participants)
+    rng.shuffle(order)
+    return {giver: order[(index + 1) % len(order)] for index, giver in enumerate(order)}
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _lowest_bit(mask: int) -> int:
+    return (mask & -mask).bit_length() - 1
+
+
+def _allowed_rows(compiled: CompiledConstraints, givers: List[int], receivers: List[int]) -> List[int]:
+    """One bitmask per giver row; bit ``p`` is set when the receiver at position ``p`` is allowed."""
+    size = len(receivers)
+    position = [0] * size
+    for index, receiver in enumerate(receivers):
+        position[receiver] = index
+
+    everyone = bytearray(b"\xff" * ((size + 7) // 8))
+    if size % 8:
+        everyone[-1] = (1 << (size % 8)) - 1
+
+    rows = []
+    for giver in givers:
+        row = bytearray(everyone)
+        for receiver in chain((giver,), compiled.forbidden[giver]):
+            bit = position[receiver]
+            row[bit >> 3] &= ~(1 << (bit & 7)) & 0xFF
+        rows.append(int.from_bytes(row, "little"))
+    return rows
+
+
+def _layer(
+    rows: List[int], match_left: List[int], match_right: List[int], free: int
+) -> Tuple[bool, List[float], List[int]]:
+    """BFS from the unmatched givers along alternating paths.
+
+    Returns whether a free receiver is reachable, each giver's distance, and for
+    each distance ``d`` the mask of receivers whose owner sits at ``d``. Every
+    receiver is expanded once, via one mask operation per giver.
+    """
+    dist: List[float] = [UNREACHABLE] * len(rows)
+    queue = deque()
+    for giver, receiver in enumerate(match_left):
+        if receiver == UNMATCHED:
+            dist[giver] = 0
+            queue.append(giver)
+
+    layers = [0]
+    unseen = (1 << len(rows)) - 1
+    limit = UNREACHABLE
+    while queue:
+        giver = queue.popleft()
+        if dist[giver] > limit:
+            break
+        reached = rows[giver] & unseen
+        if not reached:
+            continue
+        unseen &= ~reached
+        if reached & free:
+            limit = min(limit, dist[giver])
+        depth = dist[giver] + 1
+        for receiver in _bits(reached & ~free):
+            owner = match_right[receiver]
+            dist[owner] = depth
+            if depth == len(layers):
+                layers.append(0)
+            layers[depth] |= 1 << receiver
+            queue.append(owner)
+    return limit != UNREACHABLE, dist, layers
+
+
+def _augment(
+    root: int,
+    rows: List[int],
+    match_left: List[int],
+    match_right: List[int],
+    dist: List[float],
+    layers: List[int],
+    free: int,
+    used: int,
+) -> Tuple[bool, int, int]:
+    """Iterative DFS along the BFS layers, so large groups never hit the recursion limit.
+
+    ``used`` holds receivers already on a path (or behind a dead end) in this
+    phase; the updated ``free`` and ``used`` masks are returned.
+    """
+    stack = [root]
+    chosen: List[int] = []
+    while stack:
+        giver = stack[-1]
+        depth = int(dist[giver]) + 1
+        next_layer = layers[depth] if depth < len(layers) else 0
+        candidates = rows[giver] & (free | next_layer) & ~used
+        if not candidates:
+            stack.pop()
+            if chosen:
+                chosen.pop()
+            continue
+        receiver = _lowest_bit(candidates)
+        used |= 1 << receiver
+        chosen.append(receiver)
+        if free >> receiver & 1:
+            free &= ~(1 << receiver)
+            for path_giver, path_receiver in zip(stack, chosen):
+                match_left[path_giver] = path_receiver
+                match_right[path_receiver] = path_giver
+            return True, free, used
+        stack.append(match_right[receiver])
+    return False, free, used
+
+
+def _check_deadline(deadline: Optional[float]) -> None:
+    if deadline is not None and time.monotonic() > deadline:
+        raise AssignmentTimeout("Assignment constraints are too tight to solve in time.")
+
+
+def _maximum_matching(rows: List[int], deadline: Optional[float] = None) -> Tuple[List[int], List[int], int]:
+    """Hopcroft–Karp on the giver → allowed receiver bitmask rows.
+
+    Returns the receiver of each giver, the giver of each receiver (``UNMATCHED``
+    where there is none) and the number of augmenting phases it took.
+    """
+    size = len(rows)
+    match_left = [UNMATCHED] * size
+    match_right = [UNMATCHED] * size
+    free = (1 << size) - 1
+
+    # Greedy seed in the (already shuffled) row and bit order keeps results varied
+    # and leaves only a few free givers for the augmenting phases.
+    for giver, row in enumerate(rows):
+        available = row & free
+        if available:
+            receiver = _lowest_bit(available)
+            match_left[giver] = receiver
+            match_right[receiver] = giver
+            free &= ~(1 << receiver)
+
+    phases = 0
+    while True:
+        _check_deadline(deadline)
+        reachable, dist, layers = _layer(rows, match_left, match_right, free)
+        if not reachable:
+            break
+        phases += 1
+        used = 0
+        augmented = False
+        for giver in range(size):
+            if match_left[giver] == UNMATCHED:
+                _check_deadline(deadline)
+                found, free, used = _augment(giver, rows, match_left, match_right, dist, layers, free, used)
+                augmented = augmented or found
+        if not augmented:
+            break
+
+    return match_left, match_right, phases
+
+
+def _hall_violator(rows: List[int], match_left: List[int], match_right: List[int]) -> Tuple[Set[int], Set[int]]:
+    """Givers reachable from an unmatched giver by alternating paths, and their receivers.
+
+    Once the matching is maximum every such receiver is matched to a giver in the
+    set, so the set has more givers than receivers it can give to.
+    """
+    givers = {giver for giver, receiver in enumerate(match_left) if receiver == UNMATCHED}
+    reached = 0
+    queue = deque(givers)
+    while queue:
+        giver = queue.popleft()
+        new = rows[giver] & ~reached
+        reached |= new
+        for receiver in _bits(new):
+            owner = match_right[receiver]
+            if owner != UNMATCHED and owner not in givers:
+                givers.add(owner)
+                queue.append(owner)
+    return givers, set(_bits(reached))
+
+
+def solve_assignments(
     participant_ids: Sequence[int],
     exclusions: Optional[Iterable[Tuple[int, int]]] = None,
-    no_repeat_map: Optional[Dict[int, int]] = None,
+    no_repeat_map: Optional[NoRepeatMap] = None,
     seed: Optional[int] = None,
-    max_attempts: int = 200,
-) -> Dict[int, int]:
+    deadline: Optional[float] = None,
+) -> AssignmentSolution:
+    """Solve one round.
+
+    ``deadline`` is a ``time.monotonic()`` value; past it the search gives up
+    with ``AssignmentTimeout``.
+    """
     if len(participant_ids) < 2:
         raise AssignmentError("At least 2 participants are required.")
 
     rng = random.Random(seed)
-    participants = list(participant_ids)
-    constraints = _build_constraints(participants, exclusions, no_repeat_map)
-
-    allowed_receivers = {
-        giver: set(participants)
-        - {giver}
-        - {constraints.no_repeat_map.get(giver)}
-        for giver in participants
-    }
-
-    for giver, receiver in constraints.exclusions:
-        if giver in allowed_receivers:
-            allowed_receivers[giver].discard(receiver)
-
-    if any(not receivers for receivers in allowed_receivers.values()):
-        raise AssignmentError("Assignment constraints are too strict to satisfy.")
-
-    def backtrack(assignments: Dict[int, int], remaining_receivers: Set[int]) -> bool:
-        if len(assignments) == len(participants):
-            return True
-
-        unassigned = [giver for giver in participants if giver not in assignments]
-        giver = min(unassigned, key=lambda g: len(allowed_receivers[g] & remaining_receivers))
-        choices = list(allowed_receivers[giver] & remaining_receivers)
-        rng.shuffle(choices)
-        for receiver in choices:
-            assignments[giver] = receiver
-            remaining_receivers.remove(receiver)
-            if backtrack(assignments, remaining_receivers):
-                return True
-            remaining_receivers.add(receiver)
-            assignments.pop(giver, None)
-        return False
-
-    for _ in range(max_attempts):
-        rng.shuffle(participants)
-        assignments: Dict[int, int] = {}
-        remaining = set(participants)
-        if backtrack(assignments, remaining):
-            return assignments
-
-    raise AssignmentError("Failed to generate assignments with the given constraints.")
+    compiled = compile_constraints(participant_ids, exclusions, no_repeat_map)
+    participants = compiled.participants
+
+    if compiled.empty:
+        return AssignmentSolution(_single_cycle(participants, rng), strategy="cycle")
+
+    # Everything below works on dense indexes; ids come back only in the result.
+    size = len(participants)
+    givers = list(range(size))
+    receivers = list(range(size))
+    rng.shuffle(givers)
+    rng.shuffle(receivers)
+
+    rows = _allowed_rows(compiled, givers, receivers)
+    for giver, row in zip(givers, rows):
+        if not row:
+            raise UnsatisfiableError([participants[giver]], [])
+
+    match_left, match_right, phases = _maximum_matching(rows, deadline)
+    if UNMATCHED in match_left:
+        stuck_givers, reachable = _hall_violator(rows, match_left, match_right)
+        raise UnsatisfiableError(
+            [participants[giver] for giver in sorted(givers[row] for row in stuck_givers)],
+            [participants[receiver] for receiver in sorted(receivers[position] for position in reachable)],
+        )
+    return AssignmentSolution(
+        {
+            participants[giver]: participants[receivers[match_left[row]]]
+            for row, giver in enumerate(givers)
+        },
+        strategy="matching",
+        edges=sum(row.bit_count() for row in rows),
+        phases=phases,
+    )
+
+
+def generate_assignments(
+    participant_ids: Sequence[int],
+    exclusions: Optional[Iterable[Tuple[int, int]]] = None,
+    no_repeat_map: Optional[NoRepeatMap] = None,
+    seed: Optional[int] = None,
+) -> Dict[int, int]:
+    return solve_assignments(participant_ids, exclusions, no_repeat_map, seed).assignments
+
+
+@dataclass(frozen=True)
+class AssignmentJob:
+    """Everything needed to solve one group, in a form that can be sent to a worker process."""
+
+    group_id: int
+    participant_ids: List[int]
+    exclusions: List[Tuple[int, int]]
+    no_repeat_map: Dict[int, Set[int]]
+    seed: int
+    time_budget: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class AssignmentJobResult:
+    group_id: int
+    assignments: Optional[Dict[int, int]] = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    # (givers, receivers) of an UnsatisfiableError; exceptions with extra fields do not pickle.
+    conflict: Optional[Tuple[List[int], List[int]]] = None
+
+
+def run_assignment_job(job: AssignmentJob) -> AssignmentJobResult:
+    # The deadline is taken here, in whichever thread or process runs the job.
+    deadline = time.monotonic() + job.time_budget if job.time_budget is not None else None
+    try:
+        assignments = solve_assignments(
+            job.participant_ids, job.exclusions, job.no_repeat_map, job.seed, deadline
+        ).assignments
+    except AssignmentTimeout as exc:
+        return AssignmentJobResult(job.group_id, error=str(exc), timed_out=True)
+    except UnsatisfiableError as exc:
+        return AssignmentJobResult(job.group_id, error=str(exc), conflict=(exc.givers, exc.receivers))
+    except AssignmentError as exc:
+        return AssignmentJobResult(job.group_id, error=str(exc))
+    return AssignmentJobResult(job.group_id, assignments=assignments)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_PENDING_KEY = "cache_invalidations"
+
+
+class TTLCache(Generic[K, V]):
+    """An in-process map whose entries expire after ``ttl_seconds``, bounded by LRU eviction.
+
+    Each process keeps its own copy, so a change made elsewhere shows up here
+    once the entry's TTL runs out.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 10_000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def invalidate_on_commit(session: Optional[Session], cache: TTLCache, key: Hashable) -> None:
+    """Drop ``key`` now, and again once ``session`` commits the change behind it."""
+    cache.invalidate(key)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, []).append((cache, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # A read that ran between the change and the commit may have cached the old value again.
+    for cache, key in session.info.pop(_PENDING_KEY, ()):
+        cache.invalidate(key)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from aiogram.enums import ParseMode
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from loguru import logger
+
+TRANSIENT_ERRORS = (TelegramNetworkError, TelegramServerError, asyncio.TimeoutError)
+
+
+@dataclass(frozen=True)
+class DeliveryPolicy:
+    concurrency: int = 16
+    messages_per_second: float = 28.0
+    per_chat_interval: float = 1.0
+    max_attempts: int = 4
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+
+
+@dataclass(frozen=True)
+class OutgoingMessage:
+    chat_id: int
+    text: str
+
+
+@dataclass(frozen=True)
+class DeliveryOutcome:
+    chat_id: int
+    delivered: bool
+    attempts: int
+    error: Optional[str] = None
+    retryable: bool = False
+
+
+@dataclass
+class DeliveryReport:
+    outcomes: List[DeliveryOutcome] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def delivered(self) -> List[DeliveryOutcome]:
+        return [outcome for outcome in self.outcomes if outcome.delivered]
+
+    @property
+    def failed(self) -> List[DeliveryOutcome]:
+        return [outcome for outcome in self.outcomes if not outcome.delivered]
+
+
+class _Pacer:
+    """Hands out send slots at least ``interval`` seconds apart; can be paused on flood control."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def wait(self) -> None:
+        while True:
+            now = time.monotonic()
+            if self._paused_until > now:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            if self._paused_until <= time.monotonic():
+                return
+
+
+class DeliveryEngine:
+    def __init__(self, policy: Optional[DeliveryPolicy] = None) -> None:
+        self.policy = policy or DeliveryPolicy()
+        # Telegram's global limit applies to the bot as a whole, so the pacer is
+        # shared across every delivery run of this engine.
+        self._global = _Pacer(1.0 / self.policy.messages_per_second)
+
+    async def deliver(self, bot, messages: Sequence[OutgoingMessage]) -> DeliveryReport:
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.policy.concurrency)
+        per_chat: Dict[int, _Pacer] = {}
+
+        async def send(message: OutgoingMessage) -> DeliveryOutcome:
+            chat_pacer = per_chat.setdefault(message.chat_id, _Pacer(self.policy.per_chat_interval))
+            async with semaphore:
+                return await self._send_with_retries(bot, message, chat_pacer)
+
+        outcomes = await asyncio.gather(*(send(message) for message in messages))
+        report = DeliveryReport(outcomes=list(outcomes), elapsed_seconds=time.monotonic() - started)
+        logger.bind(delivered=len(report.delivered), failed=len(report.failed)).info(
+            "Delivery finished in {elapsed:.2f}s", elapsed=report.elapsed_seconds
+        )
+        return report
+
+    async def _send_with_retries(
+        self, bot, message: OutgoingMessage, chat_pacer: _Pacer
+    ) -> DeliveryOutcome:
+        attempts = 0
+        while True:
+            attempts += 1
+            await chat_pacer.wait()
+            await self._global.wait()
+            try:
+                await bot.send_message(message.chat_id, message.text, parse_mode=ParseMode.HTML)
+                return DeliveryOutcome(message.chat_id, True, attempts)
+            except TelegramRetryAfter as exc:
+                # Flood control is bot-wide: hold every sender, not just this one.
+                self._global.pause(exc.retry_after)
+                chat_pacer.pause(exc.retry_after)
+                error = exc
+            except TRANSIENT_ERRORS as exc:
+                error = exc
+                if attempts < self.policy.max_attempts:
+                    backoff = min(self.policy.backoff_base * 2 ** (attempts - 1), self.policy.backoff_max)
+                    await asyncio.sleep(backoff)
+            except Exception as exc:
+                logger.bind(user_id=message.chat_id).warning(
+                    "Failed to send message: {error}", error=str(exc)
+                )
+                return DeliveryOutcome(message.chat_id, False, attempts, str(exc))
+
+            if attempts >= self.policy.max_attempts:
+                logger.bind(user_id=message.chat_id).warning(
+                    "Giving up on message after {attempts} attempts: {error}",
+                    attempts=attempts,
+                    error=str(error),
+                )
+                return DeliveryOutcome(message.chat_id, False, attempts, str(error), retryable=True)
+
+
+delivery_engine = DeliveryEngine()
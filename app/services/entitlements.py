@@ -5,7 +5,12 @@ import secrets
 from dataclasses import dataclass
 from typing import Optional, Set
 
-from app.db import repo
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
+
+from app.db import GroupEntitlement, repo
+from app.services.cache import TTLCache, invalidate_on_commit
 
 FEATURE_WISHLIST = "wishlist"
 FEATURE_EXCLUSIONS = "exclusions"
@@ -40,7 +45,51 @@ def _is_valid(valid_until: Optional[datetime.datetime]) -> bool:
     return valid_until >= now
 
 
+def _seconds_until(valid_until: datetime.datetime) -> float:
+    if valid_until.tzinfo is not None:
+        now = datetime.datetime.now(tz=valid_until.tzinfo)
+    else:
+        now = datetime.datetime.utcnow()
+    return (valid_until - now).total_seconds()
+
+
+class EntitlementCache(TTLCache[int, Entitlements]):
+    """Per-group entitlements; entries never outlive the plan's ``valid_until``.
+
+    Writes to ``group_entitlements`` made through the ORM invalidate the group
+    here (see the listeners below).
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_size: int = 10_000) -> None:
+        super().__init__(ttl_seconds, max_size)
+
+    def set(self, group_id: int, entitlements: Entitlements, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if entitlements.valid_until is not None:
+            ttl = min(ttl, _seconds_until(entitlements.valid_until))
+        super().set(group_id, entitlements, ttl)
+
+
+entitlement_cache = EntitlementCache()
+
+
+@event.listens_for(GroupEntitlement, "after_insert")
+@event.listens_for(GroupEntitlement, "after_update")
+@event.listens_for(GroupEntitlement, "after_delete")
+def _invalidate_on_write(mapper, connection, target: GroupEntitlement) -> None:
+    invalidate_on_commit(object_session(target), entitlement_cache, target.group_id)
+
+
 def for_group(session, group_id: int) -> Entitlements:
+    cached = entitlement_cache.get(group_id)
+    if cached is not None:
+        return cached
+    entitlements = _load_entitlements(session, group_id)
+    entitlement_cache.set(group_id, entitlements)
+    return entitlements
+
+
+def _load_entitlements(session, group_id: int) -> Entitlements:
     entitlement = repo.get_group_entitlement(session, group_id)
     plan = entitlement.plan.lower() if entitlement else "free"
     if not entitlement or plan != "pro" or not _is_valid(entitlement.valid_until):
@@ -77,3 +126,15 @@ def activate_upgrade_token(session, token: str) -> bool:
     repo.upsert_group_entitlement(session, upgrade_session.group_id, "pro", None)
     repo.activate_upgrade_session(session, upgrade_session)
     return True
+
+
+async def for_group_async(session: AsyncSession, group_id: int) -> Entitlements:
+    return await session.run_sync(for_group, group_id)
+
+
+async def create_upgrade_token_async(session: AsyncSession, group_id: int, days_valid: int = 7) -> str:
+    return await session.run_sync(create_upgrade_token, group_id, days_valid)
+
+
+async def activate_upgrade_token_async(session: AsyncSession, token: str) -> bool:
+    return await session.run_sync(activate_upgrade_token, token)
@@ -1,16 +1,29 @@
 from __future__ import annotations
 
 import datetime
+import multiprocessing
 import random
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
 import html
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Union
 
 from loguru import logger
 from sqlalchemy.exc import IntegrityError
-
-from app.db import Group, GroupStatus, User, repo
-from app.services.assignment import AssignmentError, generate_assignments
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import Group, GroupStatus, NotificationOutbox, OutboxKind, User, repo
+from app.db.locks import acquire_group_lock
+from app.db.repo import ParticipantRow
+from app.services.assignment import (
+    AssignmentError,
+    AssignmentJob,
+    AssignmentJobResult,
+    UnsatisfiableError,
+    generate_assignments,
+    run_assignment_job,
+)
 from app.services.entitlements import (
     FEATURE_BUDGET,
     FEATURE_DEADLINE,
@@ -18,8 +31,26 @@ from app.services.entitlements import (
     FEATURE_NO_REPEAT,
     FEATURE_WISHLIST,
     EntitlementError,
+    Entitlements,
     for_group,
 )
+from app.services.participant_list import ParticipantSnapshot, mark_changed, participant_list_cache
+from app.services.solver import solver_pool
+
+DISTRIBUTION_COMPLETED_TEXT = "Secret Santa distribution completed! Check your private messages."
+SOLVER_TIMEOUT_TEXT = (
+    "The exclusions are too tight to find a draw in time. "
+    "Remove some exclusions or shorten /setnorepeat and try again."
+)
+DRAW_OUTDATED_TEXT = "The participants or exclusions changed during the draw. Please try again."
+MAX_NO_REPEAT_ROUNDS = 10
+# A group that keeps changing under the solver is reported instead of drawn forever.
+MAX_DRAW_ATTEMPTS = 3
+# Callback alerts are capped at 200 characters, so conflict reports only name a few people.
+MAX_NAMES_IN_CONFLICT = 3
+
+# Listings and assignment use projected rows; handlers that change a user still get the ORM object.
+Person = Union[User, ParticipantRow]
 
 
 @dataclass(frozen=True)
@@ -33,11 +64,19 @@ class JoinResult:
 @dataclass(frozen=True)
 class AssignmentResult:
     assignments: Dict[int, int]
-    participants: List[User]
+    participants: List[ParticipantRow]
     group: Group
 
 
-def format_user_label(user: User) -> str:
+@dataclass(frozen=True)
+class BulkAssignmentOutcome:
+    group_id: int
+    assigned: bool
+    assignments: int = 0
+    error: Optional[str] = None
+
+
+def format_user_label(user: Person) -> str:
     if user.telegram_username:
         return f"@{html.escape(user.telegram_username)}"
     if user.display_name:
@@ -45,7 +84,7 @@ def format_user_label(user: User) -> str:
     return f"user-{user.telegram_id}"
 
 
-def format_user_display(user: User) -> str:
+def format_user_display(user: Person) -> str:
     if user.display_name:
         return html.escape(user.display_name)
     if user.telegram_username:
@@ -72,6 +111,10 @@ def register_private_chat(
     last_name: Optional[str],
 ) -> User:
     user = ensure_user(session, telegram_id, telegram_username, first_name, last_name)
+    if not user.has_private_chat:
+        # The ✓ next to this user changes in every list they appear in.
+        for group in repo.list_groups_for_user(session, user.id):
+            mark_changed(session, group.id)
     user.has_private_chat = True
     return user
 
@@ -86,38 +129,59 @@ def join_group(
     group_title: Optional[str],
 ) -> JoinResult:
     user = ensure_user(session, telegram_user_id, telegram_username, first_name, last_name)
+    # The upsert locks the group row, so the checks below cannot race another join or /end.
     group = repo.get_or_create_group(session, group_telegram_id, telegram_user_id, group_title)
 
     if group.status in {GroupStatus.ASSIGNED, GroupStatus.ARCHIVED}:
         return JoinResult(False, "This Secret Santa is already finished.", group, user)
 
-    already_member = repo.is_user_in_group(session, user.id, group.id)
-    if group.status == GroupStatus.LOCKED and not already_member:
-        return JoinResult(False, "This Secret Santa is locked. Ask an admin to unlock it.", group, user)
+    if group.status == GroupStatus.OPEN:
+        entitlements = for_group(session, group.id)
+        if repo.add_user_to_group(session, user.id, group, entitlements.max_participants):
+            mark_changed(session, group.id)
+            return JoinResult(True, "You have joined the Secret Santa game!", group, user)
 
-    if already_member:
+    # Only failed joins pay for working out why.
+    if repo.is_user_in_group(session, user.id, group.id):
         return JoinResult(False, "You are already in this Secret Santa game!", group, user)
+    if group.status == GroupStatus.LOCKED:
+        return JoinResult(False, "This Secret Santa is locked. Ask an admin to unlock it.", group, user)
+    return JoinResult(
+        False,
+        "This group is on the free plan and reached the 20 participant limit.",
+        group,
+        user,
+    )
 
-    entitlements = for_group(session, group.id)
-    if entitlements.max_participants:
-        current_count = repo.count_group_participants(session, group.id)
-        if current_count >= entitlements.max_participants:
-            return JoinResult(
-                False,
-                "This group is on the free plan and reached the 20 participant limit.",
-                group,
-                user,
-            )
 
-    added = repo.add_user_to_group(session, user.id, group.id)
-    if not added:
-        return JoinResult(False, "You are already in this Secret Santa game!", group, user)
+def list_participants(session, group: Group) -> List[ParticipantRow]:
+    return repo.list_group_participant_rows(session, group.id)
 
-    return JoinResult(True, "You have joined the Secret Santa game!", group, user)
 
+def reconcile_participant_counts(session, group_ids: Optional[Iterable[int]] = None) -> int:
+    """Repair ``participant_count`` drift for the given groups, or every group; returns groups fixed."""
+    group_ids = sorted(set(group_ids)) if group_ids is not None else repo.list_group_ids(session)
+    # Locks are taken in id order, like bulk assignment, so joins cannot change a count mid-repair.
+    for group_id in group_ids:
+        acquire_group_lock(session, group_id)
+    return repo.reconcile_participant_counts(session, group_ids)
 
-def list_participants(session, group: Group) -> List[User]:
-    return repo.list_group_participants(session, group.id)
+
+def participant_snapshot(session, group: Group) -> ParticipantSnapshot:
+    """The group's rendered participant list, cached until someone joins."""
+    cached = participant_list_cache.get(group.id)
+    if cached is not None:
+        return cached
+    ids: List[int] = []
+    lines: List[str] = []
+    all_have_private_chat = True
+    for row in repo.iter_group_participant_rows(session, group.id):
+        ids.append(row.id)
+        lines.append(format_user_label(row) + (" ✓" if row.has_private_chat else ""))
+        all_have_private_chat = all_have_private_chat and row.has_private_chat
+    snapshot = ParticipantSnapshot(ids=ids, lines=lines, all_have_private_chat=all_have_private_chat)
+    participant_list_cache.set(group.id, snapshot)
+    return snapshot
 
 
 def lock_group(session, group: Group) -> bool:
@@ -137,7 +201,8 @@ def unlock_group(session, group: Group) -> bool:
 
 
 def reset_group(session, group: Group) -> None:
-    repo.archive_assignments(session, group.id)
+    acquire_group_lock(session, group.id)
+    repo.archive_assignments(session, group)
     repo.clear_assignments(session, group.id)
     repo.update_group_status(session, group, GroupStatus.OPEN, locked_at=None, assigned_at=None)
     repo.update_group_assignment_seed(session, group, None)
@@ -151,16 +216,18 @@ def set_deadline(session, group: Group, deadline: Optional[datetime.date]) -> No
     repo.update_group_deadline(session, group, deadline)
 
 
+def set_no_repeat_rounds(session, group: Group, rounds: int) -> None:
+    repo.update_group_no_repeat_rounds(session, group, rounds)
+
+
 def resolve_user_group(session, telegram_user_id: int, group_identifier: Optional[str]) -> Optional[Group]:
     user = repo.get_user_by_telegram_id(session, telegram_user_id)
     if not user:
         return None
 
-    groups = [
-        group
-        for group in repo.list_groups_for_user(session, user.id)
-        if group.status in {GroupStatus.OPEN, GroupStatus.LOCKED, GroupStatus.ASSIGNED}
-    ]
+    groups = repo.list_groups_for_user(
+        session, user.id, statuses=[GroupStatus.OPEN, GroupStatus.LOCKED, GroupStatus.ASSIGNED]
+    )
     if not groups:
         return None
 
@@ -184,31 +251,76 @@ def require_feature(session, group: Group, feature: str) -> None:
         raise EntitlementError("This feature is available on the Pro plan.")
 
 
-def build_no_repeat_map(session, group: Group) -> Dict[int, int]:
-    history = repo.get_latest_assignment_history(session, group.id)
-    if not history:
+def build_no_repeat_map(session, group: Group) -> Dict[int, Set[int]]:
+    if not group.last_round:
         return {}
+    return repo.get_assignment_rounds(session, group.id, *_no_repeat_window(group))
 
-    latest_timestamp = max(item.created_at for item in history)
-    latest = [item for item in history if item.created_at == latest_timestamp]
-    return {item.giver_user_id: item.receiver_user_id for item in latest}
 
+def _name_list(names: List[str]) -> str:
+    if len(names) > MAX_NAMES_IN_CONFLICT:
+        shown = names[:MAX_NAMES_IN_CONFLICT]
+        return ", ".join(shown) + f" and {len(names) - len(shown)} more"
+    if len(names) > 1:
+        return ", ".join(names[:-1]) + " and " + names[-1]
+    return names[0] if names else "nobody"
 
-def assign_group(
-    session,
-    group: Group,
-    seed: Optional[int] = None,
-) -> AssignmentResult:
+
+def describe_unsatisfiable(error: UnsatisfiableError, participants: List[ParticipantRow]) -> str:
+    names = {participant.id: format_user_display(participant) for participant in participants}
+    givers = _name_list([names[user_id] for user_id in error.givers])
+    if not error.receivers:
+        return (
+            f"Constraints are too tight: {givers} has nobody left to give to. "
+            "Remove an exclusion or shorten /setnorepeat."
+        )
+    receivers = _name_list([names[user_id] for user_id in error.receivers])
+    return (
+        f"Constraints are too tight: {len(error.givers)} people ({givers}) "
+        f"can only give to {len(error.receivers)} ({receivers})."
+    )
+
+
+def find_participant(session, group: Group, reference: str) -> Optional[User]:
+    """Resolve ``@username`` or a Telegram id to a participant of ``group``."""
+    reference = reference.strip()
+    if reference.lstrip("-").isdigit():
+        return repo.find_group_participant(session, group.id, telegram_id=int(reference))
+    return repo.find_group_participant(session, group.id, username=reference.lstrip("@"))
+
+
+def add_exclusion(session, group: Group, giver: User, receiver: User, symmetric: bool) -> bool:
+    existing = repo.get_group_exclusion(session, group.id, giver.id, receiver.id)
+    if existing:
+        if symmetric and not existing.symmetric:
+            existing.symmetric = True
+            return True
+        return False
+    repo.add_group_exclusion(session, group.id, giver.id, receiver.id, symmetric)
+    return True
+
+
+def remove_exclusion(session, group: Group, first: User, second: User) -> int:
+    return repo.delete_group_exclusions(session, group.id, first.id, second.id)
+
+
+def list_exclusions(session, group: Group) -> List[str]:
+    lines = []
+    for exclusion in repo.list_group_exclusions(session, group.id):
+        arrow = "↔" if exclusion.symmetric else "→"
+        lines.append(f"{format_user_label(exclusion.giver)} {arrow} {format_user_label(exclusion.receiver)}")
+    return lines
+
+
+def _check_ready(group: Group, participants: List[ParticipantRow], entitlements: Entitlements) -> None:
     if group.status == GroupStatus.ASSIGNED:
         raise AssignmentError("Secret Santa has already been assigned for this group.")
     if group.status == GroupStatus.ARCHIVED:
         raise AssignmentError("This Secret Santa is archived.")
 
-    participants = repo.list_group_participants(session, group.id)
     if len(participants) < 2:
         raise AssignmentError("Not enough participants to start Secret Santa.")
 
-    entitlements = for_group(session, group.id)
     if entitlements.max_participants and len(participants) > entitlements.max_participants:
         raise AssignmentError("This group is over the free plan participant limit.")
 
@@ -219,39 +331,287 @@ def assign_group(
             + ", ".join(missing)
         )
 
-    no_repeat_map: Dict[int, int] = {}
+
+def _no_repeat_window(group: Group) -> tuple[int, int]:
+    return max(group.last_round - group.no_repeat_rounds + 1, 1), group.last_round
+
+
+def _record_assignments(
+    session,
+    group: Group,
+    participants: List[ParticipantRow],
+    entitlements: Entitlements,
+    assignments: Dict[int, int],
+    seed: int,
+) -> None:
+    repo.update_group_status(
+        session,
+        group,
+        GroupStatus.ASSIGNED,
+        locked_at=group.locked_at,
+        assigned_at=datetime.datetime.utcnow(),
+    )
+    repo.update_group_assignment_seed(session, group, seed)
+    enqueue_assignment_notifications(session, group, assignments, participants, entitlements)
+    logger.bind(group_id=group.id, seed=seed).info("Assignments generated")
+
+
+class DrawOutdatedError(AssignmentError):
+    """The group's participants or exclusions changed while its draw was being solved."""
+
+
+@dataclass(frozen=True)
+class PreparedAssignment:
+    group: Group
+    status: GroupStatus
+    participants: List[ParticipantRow]
+    entitlements: Entitlements
+    job: AssignmentJob
+
+
+def prepare_assignment(session, group: Group, seed: Optional[int] = None) -> PreparedAssignment:
+    """Lock the group and load everything the solver needs for one round."""
+    # Another worker may have assigned this group since it was loaded.
+    acquire_group_lock(session, group.id)
+    session.refresh(group)
+
+    participants = repo.list_group_participant_rows(session, group.id)
+    entitlements = for_group(session, group.id)
+    _check_ready(group, participants, entitlements)
+
+    no_repeat_map: Dict[int, Set[int]] = {}
     if entitlements.has(FEATURE_NO_REPEAT):
         no_repeat_map = build_no_repeat_map(session, group)
 
     exclusions: List[tuple[int, int]] = []
     if entitlements.has(FEATURE_EXCLUSIONS):
-        exclusions = []
+        exclusions = repo.list_exclusion_pairs(session, group.id)
 
     if seed is None:
         seed = random.randint(1, 2**31 - 1)
 
-    assignments = generate_assignments(
-        [participant.id for participant in participants],
+    job = AssignmentJob(
+        group_id=group.id,
+        participant_ids=[participant.id for participant in participants],
         exclusions=exclusions,
         no_repeat_map=no_repeat_map,
         seed=seed,
     )
+    return PreparedAssignment(
+        group=group, status=group.status, participants=participants, entitlements=entitlements, job=job
+    )
+
 
+def _check_unchanged(session, prepared: PreparedAssignment) -> None:
+    group = prepared.group
+    acquire_group_lock(session, group.id)
+    session.refresh(group)
+    if group.status != prepared.status:
+        _check_ready(group, prepared.participants, prepared.entitlements)
+    job = prepared.job
+    if repo.list_group_participant_ids(session, group.id) != job.participant_ids:
+        raise DrawOutdatedError(DRAW_OUTDATED_TEXT)
+    if prepared.entitlements.has(FEATURE_EXCLUSIONS):
+        if sorted(repo.list_exclusion_pairs(session, group.id)) != sorted(job.exclusions):
+            raise DrawOutdatedError(DRAW_OUTDATED_TEXT)
+
+
+def complete_assignment(session, prepared: PreparedAssignment, assignments: Dict[int, int]) -> AssignmentResult:
+    """Lock the group again and save the draw if the group still matches its snapshot."""
+    _check_unchanged(session, prepared)
+    group = prepared.group
     try:
         repo.create_assignments(session, group.id, assignments)
     except IntegrityError as exc:
         raise AssignmentError("Secret Santa assignments already exist for this group.") from exc
-    repo.update_group_status(
+    _record_assignments(session, group, prepared.participants, prepared.entitlements, assignments, prepared.job.seed)
+
+    return AssignmentResult(assignments=assignments, participants=prepared.participants, group=group)
+
+
+def assign_group(
+    session,
+    group: Group,
+    seed: Optional[int] = None,
+) -> AssignmentResult:
+    prepared = prepare_assignment(session, group, seed)
+    job = prepared.job
+    try:
+        assignments = generate_assignments(
+            job.participant_ids,
+            exclusions=job.exclusions,
+            no_repeat_map=job.no_repeat_map,
+            seed=job.seed,
+        )
+    except UnsatisfiableError as exc:
+        raise AssignmentError(describe_unsatisfiable(exc, prepared.participants)) from exc
+    return complete_assignment(session, prepared, assignments)
+
+
+def _run_jobs(
+    jobs: List[AssignmentJob], executor: Optional[Executor], max_workers: Optional[int]
+) -> List[AssignmentJobResult]:
+    if not jobs:
+        return []
+    if executor is not None:
+        return list(executor.map(run_assignment_job, jobs))
+    # Spawned workers import only the solver, not the database engine or bot state.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        return list(pool.map(run_assignment_job, jobs))
+
+
+def assign_groups_bulk(
+    session,
+    group_ids: Iterable[int],
+    seed: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+) -> List[BulkAssignmentOutcome]:
+    """Assign many groups in one transaction, solving them in parallel.
+
+    Participants and constraints for every group are loaded with one query each,
+    the solver runs in ``executor`` (a process pool by default) and all
+    assignments are written with one bulk insert. A group that cannot be
+    assigned is reported and skipped; the others still go through.
+    """
+    group_ids = sorted(set(group_ids))
+    # Locks are taken in id order so overlapping bulk runs cannot deadlock.
+    for group_id in group_ids:
+        acquire_group_lock(session, group_id)
+
+    groups = {group.id: group for group in repo.get_groups_by_ids(session, group_ids)}
+    participants_by_group = repo.list_participants_for_groups(session, group_ids)
+
+    failures: Dict[int, str] = {}
+    ready: Dict[int, tuple[Group, List[ParticipantRow], Entitlements]] = {}
+    windows: Dict[int, tuple[int, int]] = {}
+    exclusion_groups: List[int] = []
+    for group_id in group_ids:
+        group = groups.get(group_id)
+        if group is None:
+            failures[group_id] = "Group not found."
+            continue
+        participants = participants_by_group[group_id]
+        entitlements = for_group(session, group_id)
+        try:
+            _check_ready(group, participants, entitlements)
+        except AssignmentError as exc:
+            failures[group_id] = str(exc)
+            continue
+        ready[group_id] = (group, participants, entitlements)
+        if entitlements.has(FEATURE_NO_REPEAT) and group.last_round:
+            windows[group_id] = _no_repeat_window(group)
+        if entitlements.has(FEATURE_EXCLUSIONS):
+            exclusion_groups.append(group_id)
+
+    history = repo.get_assignment_rounds_for_groups(session, windows)
+    exclusions = repo.list_exclusion_pairs_for_groups(session, exclusion_groups)
+    rng = random.Random(seed)
+    jobs = [
+        AssignmentJob(
+            group_id=group_id,
+            participant_ids=[participant.id for participant in participants],
+            exclusions=exclusions.get(group_id, []),
+            no_repeat_map=history.get(group_id, {}),
+            seed=rng.randint(1, 2**31 - 1),
+        )
+        for group_id, (_, participants, _) in ready.items()
+    ]
+    seeds = {job.group_id: job.seed for job in jobs}
+
+    solved: Dict[int, Dict[int, int]] = {}
+    for result in _run_jobs(jobs, executor, max_workers):
+        if result.assignments is not None:
+            solved[result.group_id] = result.assignments
+        elif result.conflict is not None:
+            participants = ready[result.group_id][1]
+            failures[result.group_id] = describe_unsatisfiable(UnsatisfiableError(*result.conflict), participants)
+        else:
+            failures[result.group_id] = result.error or "Assignment failed."
+
+    repo.insert_assignments(
         session,
-        group,
-        GroupStatus.ASSIGNED,
-        locked_at=group.locked_at,
-        assigned_at=datetime.datetime.utcnow(),
+        [
+            {"group_id": group_id, "giver_user_id": giver_id, "receiver_user_id": receiver_id}
+            for group_id, assignments in solved.items()
+            for giver_id, receiver_id in assignments.items()
+        ],
     )
-    repo.update_group_assignment_seed(session, group, seed)
-    logger.bind(group_id=group.id, seed=seed).info("Assignments generated")
+    for group_id, assignments in solved.items():
+        group, participants, entitlements = ready[group_id]
+        _record_assignments(session, group, participants, entitlements, assignments, seeds[group_id])
+
+    return [
+        BulkAssignmentOutcome(group_id, assigned=True, assignments=len(solved[group_id]))
+        if group_id in solved
+        else BulkAssignmentOutcome(group_id, assigned=False, error=failures[group_id])
+        for group_id in group_ids
+    ]
 
-    return AssignmentResult(assignments=assignments, participants=participants, group=group)
+
+def compose_assignment_message(
+    receiver: Person,
+    wishlist_items: Optional[List[str]],
+    budget_text: Optional[str],
+    deadline_text: Optional[str],
+) -> str:
+    message_lines = [
+        f"Secret Santa: You're giving a gift to {format_user_label(receiver)}!",
+    ]
+    if wishlist_items:
+        message_lines.append("")
+        message_lines.append("Wishlist:")
+        message_lines.extend([f"- {html.escape(item)}" for item in wishlist_items])
+    if budget_text:
+        message_lines.append("")
+        message_lines.append(f"Budget: {budget_text}")
+    if deadline_text:
+        message_lines.append("")
+        message_lines.append(f"Deadline: {deadline_text}")
+    return "\n".join(message_lines)
+
+
+def enqueue_assignment_notifications(
+    session,
+    group: Group,
+    assignments: Dict[int, int],
+    participants: List[ParticipantRow],
+    entitlements: Entitlements,
+) -> str:
+    by_id = {participant.id: participant for participant in participants}
+
+    wishlists: Dict[int, List[str]] = {}
+    if entitlements.has(FEATURE_WISHLIST):
+        wishlists = list_wishlists_for_group(session, group, assignments.values())
+    budget_text = format_budget(group) if entitlements.has(FEATURE_BUDGET) else None
+    deadline_text = format_deadline(group) if entitlements.has(FEATURE_DEADLINE) else None
+
+    batch_id = uuid.uuid4().hex
+    rows = [
+        NotificationOutbox(
+            batch_id=batch_id,
+            group_id=group.id,
+            chat_id=by_id[giver_id].telegram_id,
+            kind=OutboxKind.ASSIGNMENT,
+            label=format_user_label(by_id[giver_id]),
+            text=compose_assignment_message(
+                by_id[receiver_id], wishlists.get(receiver_id), budget_text, deadline_text
+            ),
+        )
+        for giver_id, receiver_id in assignments.items()
+    ]
+    rows.append(
+        NotificationOutbox(
+            batch_id=batch_id,
+            group_id=group.id,
+            chat_id=group.telegram_id,
+            kind=OutboxKind.SUMMARY,
+            text=DISTRIBUTION_COMPLETED_TEXT,
+        )
+    )
+    repo.enqueue_notifications(session, rows)
+    return batch_id
 
 
 def list_wishlist_items(session, group: Group, user_id: int) -> List[str]:
@@ -260,6 +620,11 @@ def list_wishlist_items(session, group: Group, user_id: int) -> List[str]:
     return [item.text for item in items]
 
 
+def list_wishlists_for_group(session, group: Group, user_ids: Iterable[int]) -> Dict[int, List[str]]:
+    require_feature(session, group, FEATURE_WISHLIST)
+    return repo.list_wishlist_items_for_group(session, group.id, user_ids)
+
+
 def add_wishlist_item(session, group: Group, user_id: int, text: str) -> None:
     require_feature(session, group, FEATURE_WISHLIST)
     repo.add_wishlist_item(session, group.id, user_id, text)
@@ -281,3 +646,155 @@ def format_deadline(group: Group) -> Optional[str]:
     if not group.gift_deadline:
         return None
     return group.gift_deadline.isoformat()
+
+
+# Async variants used by the bot handlers. The game rules live in the sync
+# functions above; these run them on the async session's connection so the
+# database round-trips never block the event loop.
+
+
+async def register_private_chat_async(
+    session: AsyncSession,
+    telegram_id: int,
+    telegram_username: Optional[str],
+    first_name: Optional[str],
+    last_name: Optional[str],
+) -> User:
+    return await session.run_sync(
+        register_private_chat, telegram_id, telegram_username, first_name, last_name
+    )
+
+
+async def join_group_async(
+    session: AsyncSession,
+    telegram_user_id: int,
+    telegram_username: Optional[str],
+    first_name: Optional[str],
+    last_name: Optional[str],
+    group_telegram_id: int,
+    group_title: Optional[str],
+) -> JoinResult:
+    return await session.run_sync(
+        join_group,
+        telegram_user_id,
+        telegram_username,
+        first_name,
+        last_name,
+        group_telegram_id,
+        group_title,
+    )
+
+
+async def participant_snapshot_async(session: AsyncSession, group: Group) -> ParticipantSnapshot:
+    return await session.run_sync(participant_snapshot, group)
+
+
+async def list_participants_async(session: AsyncSession, group: Group) -> List[ParticipantRow]:
+    return await session.run_sync(list_participants, group)
+
+
+async def lock_group_async(session: AsyncSession, group: Group) -> bool:
+    return await session.run_sync(lock_group, group)
+
+
+async def unlock_group_async(session: AsyncSession, group: Group) -> bool:
+    return await session.run_sync(unlock_group, group)
+
+
+async def reset_group_async(session: AsyncSession, group: Group) -> None:
+    await session.run_sync(reset_group, group)
+
+
+async def set_budget_async(
+    session: AsyncSession, group: Group, amount: Optional[int], currency: Optional[str]
+) -> None:
+    await session.run_sync(set_budget, group, amount, currency)
+
+
+async def set_deadline_async(session: AsyncSession, group: Group, deadline: Optional[datetime.date]) -> None:
+    await session.run_sync(set_deadline, group, deadline)
+
+
+async def set_no_repeat_rounds_async(session: AsyncSession, group: Group, rounds: int) -> None:
+    await session.run_sync(set_no_repeat_rounds, group, rounds)
+
+
+async def resolve_user_group_async(
+    session: AsyncSession, telegram_user_id: int, group_identifier: Optional[str]
+) -> Optional[Group]:
+    return await session.run_sync(resolve_user_group, telegram_user_id, group_identifier)
+
+
+async def require_feature_async(session: AsyncSession, group: Group, feature: str) -> None:
+    await session.run_sync(require_feature, group, feature)
+
+
+async def find_participant_async(session: AsyncSession, group: Group, reference: str) -> Optional[User]:
+    return await session.run_sync(find_participant, group, reference)
+
+
+async def add_exclusion_async(
+    session: AsyncSession, group: Group, giver: User, receiver: User, symmetric: bool
+) -> bool:
+    return await session.run_sync(add_exclusion, group, giver, receiver, symmetric)
+
+
+async def remove_exclusion_async(session: AsyncSession, group: Group, first: User, second: User) -> int:
+    return await session.run_sync(remove_exclusion, group, first, second)
+
+
+async def list_exclusions_async(session: AsyncSession, group: Group) -> List[str]:
+    return await session.run_sync(list_exclusions, group)
+
+
+async def assign_group_async(
+    session: AsyncSession,
+    group: Group,
+    seed: Optional[int] = None,
+) -> AssignmentResult:
+    """Assign a group without holding its lock while the solver runs.
+
+    The inputs are snapshotted under the group lock and that transaction is
+    committed, along with anything else pending on the session. The solver
+    then runs in ``solver_pool`` under its time budget with no lock held.
+    ``complete_assignment`` locks the group again and saves the draw only if
+    the group still matches the snapshot. A draw made stale by a join or an
+    exclusion is solved again, up to ``MAX_DRAW_ATTEMPTS`` times.
+    """
+    for attempt in range(1, MAX_DRAW_ATTEMPTS + 1):
+        prepared = await session.run_sync(prepare_assignment, group, seed)
+        await session.commit()
+        result = await solver_pool.solve(prepared.job)
+        if result.timed_out:
+            raise AssignmentError(SOLVER_TIMEOUT_TEXT)
+        if result.conflict is not None:
+            raise AssignmentError(describe_unsatisfiable(UnsatisfiableError(*result.conflict), prepared.participants))
+        if result.assignments is None:
+            raise AssignmentError(result.error or "Assignment failed.")
+        try:
+            return await session.run_sync(complete_assignment, prepared, result.assignments)
+        except DrawOutdatedError:
+            await session.rollback()
+            if attempt == MAX_DRAW_ATTEMPTS:
+                raise
+            logger.bind(group_id=prepared.job.group_id, attempt=attempt).info(
+                "Group changed during the draw; solving again"
+            )
+
+
+async def list_wishlist_items_async(session: AsyncSession, group: Group, user_id: int) -> List[str]:
+    return await session.run_sync(list_wishlist_items, group, user_id)
+
+
+async def list_wishlists_for_group_async(
+    session: AsyncSession, group: Group, user_ids: Iterable[int]
+) -> Dict[int, List[str]]:
+    return await session.run_sync(list_wishlists_for_group, group, list(user_ids))
+
+
+async def add_wishlist_item_async(session: AsyncSession, group: Group, user_id: int, text: str) -> None:
+    await session.run_sync(add_wishlist_item, group, user_id, text)
+
+
+async def clear_wishlist_items_async(session: AsyncSession, group: Group, user_id: int) -> int:
+    return await session.run_sync(clear_wishlist_items, group, user_id)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+from typing import Optional
+
+from loguru import logger
+
+from app.db import get_async_session, repo
+from app.services.delivery import DeliveryEngine, OutgoingMessage, delivery_engine
+
+
+class OutboxWorker:
+    """Drains ``notification_outbox`` in the background.
+
+    Rows are written in the same transaction as the assignments, so a crash
+    never loses a notification: unsent rows are simply picked up again.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[DeliveryEngine] = None,
+        batch_size: int = 100,
+        poll_interval: float = 5.0,
+        max_attempts: int = 5,
+        lease_seconds: int = 300,
+        retry_base_seconds: int = 30,
+        retry_max_seconds: int = 3600,
+    ) -> None:
+        self.engine = engine or delivery_engine
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._bot = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def start(self, bot) -> None:
+        if self._task is not None:
+            return
+        self._bot = bot
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="notification-outbox")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        logger.info("Notification outbox worker started")
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception as exc:
+                logger.opt(exception=exc).error("Outbox drain failed: {error}", error=str(exc))
+                processed = 0
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        now = datetime.datetime.utcnow()
+        lease_until = now + datetime.timedelta(seconds=self.lease_seconds)
+        async with get_async_session() as session:
+            rows = await session.run_sync(repo.claim_due_notifications, now, lease_until, self.batch_size)
+            claimed = [(row.id, row.chat_id, row.text, row.attempts) for row in rows]
+
+        if claimed:
+            report = await self.engine.deliver(
+                self._bot, [OutgoingMessage(chat_id, text) for _, chat_id, text, _ in claimed]
+            )
+            finished = datetime.datetime.utcnow()
+            async with get_async_session() as session:
+                sent_ids = []
+                for (notification_id, _, _, attempts), outcome in zip(claimed, report.outcomes):
+                    if outcome.delivered:
+                        sent_ids.append(notification_id)
+                        continue
+                    next_attempt_at = None
+                    if outcome.retryable and attempts + 1 < self.max_attempts:
+                        delay = min(self.retry_base_seconds * 2**attempts, self.retry_max_seconds)
+                        next_attempt_at = finished + datetime.timedelta(seconds=delay)
+                    await session.run_sync(
+                        repo.mark_notification_failed, notification_id, outcome.error or "", next_attempt_at
+                    )
+                await session.run_sync(repo.mark_notifications_sent, sent_ids, finished)
+
+        return len(claimed) + await self._send_summaries()
+
+    async def _send_summaries(self) -> int:
+        now = datetime.datetime.utcnow()
+        lease_until = now + datetime.timedelta(seconds=self.lease_seconds)
+        async with get_async_session() as session:
+            summaries = await session.run_sync(repo.claim_ready_summaries, now, lease_until, self.batch_size)
+            pending = []
+            for summary in summaries:
+                unreachable = await session.run_sync(repo.list_dead_notification_labels, summary.batch_id)
+                text = summary.text
+                if unreachable:
+                    text += (
+                        f"\n\nI couldn't reach: {', '.join(unreachable)}. "
+                        "Make sure you started a private chat with the bot."
+                    )
+                pending.append((summary.id, summary.attempts, OutgoingMessage(summary.chat_id, text)))
+
+        if not pending:
+            return 0
+
+        report = await self.engine.deliver(self._bot, [message for _, _, message in pending])
+        finished = datetime.datetime.utcnow()
+        async with get_async_session() as session:
+            for (notification_id, attempts, _), outcome in zip(pending, report.outcomes):
+                if outcome.delivered:
+                    await session.run_sync(repo.mark_notifications_sent, [notification_id], finished)
+                    continue
+                next_attempt_at = None
+                if outcome.retryable and attempts + 1 < self.max_attempts:
+                    next_attempt_at = finished + datetime.timedelta(seconds=self.retry_base_seconds)
+                await session.run_sync(
+                    repo.mark_notification_failed, notification_id, outcome.error or "", next_attempt_at
+                )
+        return len(pending)
+
+
+outbox_worker = OutboxWorker()
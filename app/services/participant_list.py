@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.services.cache import TTLCache, invalidate_on_commit
+
+PAGE_SIZE = 50
+# Telegram rejects messages over 4096 characters; the rest is left for the header and notes.
+PAGE_CHAR_BUDGET = 3000
+
+
+@dataclass(frozen=True)
+class ParticipantPage:
+    lines: List[str]
+    first: int
+    total: int
+    # Keyset cursors: the next page starts after ``next_after``, the previous one ends before ``prev_before``.
+    next_after: Optional[int]
+    prev_before: Optional[int]
+
+
+@dataclass(frozen=True)
+class ParticipantSnapshot:
+    """A group's participant list, already rendered one line per person."""
+
+    ids: List[int]
+    lines: List[str]
+    all_have_private_chat: bool
+
+    def page_after(self, after_id: int = 0) -> ParticipantPage:
+        start = bisect.bisect_right(self.ids, after_id)
+        end = start
+        used = 0
+        while end < len(self.lines) and end - start < PAGE_SIZE:
+            used += len(self.lines[end]) + 1
+            if used > PAGE_CHAR_BUDGET and end > start:
+                break
+            end += 1
+        return self._page(start, end)
+
+    def page_before(self, before_id: int) -> ParticipantPage:
+        end = bisect.bisect_left(self.ids, before_id)
+        start = end
+        used = 0
+        while start > 0 and end - start < PAGE_SIZE:
+            used += len(self.lines[start - 1]) + 1
+            if used > PAGE_CHAR_BUDGET and start < end:
+                break
+            start -= 1
+        if start == 0:
+            # Keep the first page identical to the one /list shows.
+            return self.page_after()
+        return self._page(start, end)
+
+    def _page(self, start: int, end: int) -> ParticipantPage:
+        return ParticipantPage(
+            lines=self.lines[start:end],
+            first=start + 1,
+            total=len(self.lines),
+            next_after=self.ids[end - 1] if end < len(self.ids) else None,
+            prev_before=self.ids[start] if start > 0 else None,
+        )
+
+
+participant_list_cache: TTLCache[int, ParticipantSnapshot] = TTLCache(ttl_seconds=300.0)
+
+
+def mark_changed(session, group_id: int) -> None:
+    """Drop the group's snapshot after a join or a new private chat changed its list."""
+    invalidate_on_commit(session, participant_list_cache, group_id)
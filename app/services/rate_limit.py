@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import abc
+import asyncio
+import sys
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import Deque, Dict, Tuple
+from typing import Deque, Dict, List, Optional, Union
+
+from loguru import logger
+
+from app.db import get_async_session, repo
+
+MODE_GCRA = "gcra"
+MODE_WINDOW = "window"
 
 
 @dataclass
@@ -12,22 +22,285 @@ class RateLimitResult:
     retry_after: float
 
 
-class RateLimiter:
-    def __init__(self, max_calls: int, period_seconds: int) -> None:
-        self.max_calls = max_calls
-        self.period_seconds = period_seconds
-        self._calls: Dict[str, Deque[float]] = defaultdict(deque)
+class _Bucket:
+    """GCRA state: the theoretical arrival time of the next call, and when the key was last used."""
 
-    def allow(self, key: str) -> RateLimitResult:
-        now = time.time()
-        window = self._calls[key]
-        while window and now - window[0] > self.period_seconds:
+    __slots__ = ("tat", "seen")
+
+    def __init__(self, now: float) -> None:
+        self.tat = now
+        self.seen = now
+
+
+class _Window:
+    """Sliding-window state: timestamps of the calls inside the current period."""
+
+    __slots__ = ("calls", "seen")
+
+    def __init__(self, now: float) -> None:
+        self.calls: Deque[float] = deque()
+        self.seen = now
+
+
+_State = Union[_Bucket, _Window]
+
+
+class RateLimitStore(abc.ABC):
+    """Where limiter state lives. ``hit`` records one call for ``key`` and says whether it fits."""
+
+    @abc.abstractmethod
+    async def hit(self, key: str, max_calls: int, period_seconds: float) -> RateLimitResult:
+        ...
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process limiter state with bounded memory.
+
+    ``gcra`` mode (the default) keeps two floats per key and allows bursts of up
+    to ``max_calls`` spread over the period. ``window`` mode keeps the
+    exact sliding-window semantics at the cost of one timestamp per call.
+
+    Keys live in ``shards`` LRU maps. Every ``sweep_interval`` seconds one shard
+    is swept for keys that are idle (their state is back to "fresh"), so each
+    sweep does a bounded amount of work. ``max_keys`` is a hard cap: past it the
+    least recently used key is dropped even if it is not idle yet.
+    """
+
+    def __init__(
+        self,
+        mode: str = MODE_GCRA,
+        max_keys: int = 100_000,
+        shards: int = 16,
+        sweep_interval: float = 1.0,
+    ) -> None:
+        if mode not in {MODE_GCRA, MODE_WINDOW}:
+            raise ValueError(f"Unknown rate limit mode: {mode}")
+        self.mode = mode
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._shards: List["OrderedDict[str, _State]"] = [OrderedDict() for _ in range(shards)]
+        self._shard_capacity = max(1, max_keys // shards)
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._sweep_cursor = 0
+        self.evicted_idle = 0
+        self.evicted_forced = 0
+
+    async def hit(self, key: str, max_calls: int, period_seconds: float) -> RateLimitResult:
+        return self.record(key, max_calls, period_seconds)
+
+    def record(self, key: str, max_calls: int, period_seconds: float) -> RateLimitResult:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now, period_seconds)
+
+        shard = self._shards[hash(key) % len(self._shards)]
+        state = shard.get(key)
+        if state is None:
+            state = _Bucket(now) if self.mode == MODE_GCRA else _Window(now)
+            shard[key] = state
+            if len(shard) > self._shard_capacity:
+                shard.popitem(last=False)
+                self.evicted_forced += 1
+        else:
+            shard.move_to_end(key)
+        state.seen = now
+
+        if self.mode == MODE_GCRA:
+            return self._allow_gcra(state, now, period_seconds / max_calls, period_seconds)
+        return self._allow_window(state, now, max_calls, period_seconds)
+
+    def _allow_gcra(self, state: _Bucket, now: float, interval: float, period_seconds: float) -> RateLimitResult:
+        new_tat = max(state.tat, now) + interval
+        excess = new_tat - now - period_seconds
+        if excess > 0:
+            return RateLimitResult(False, excess)
+        state.tat = new_tat
+        return RateLimitResult(True, 0)
+
+    def _allow_window(
+        self, state: _Window, now: float, max_calls: int, period_seconds: float
+    ) -> RateLimitResult:
+        window = state.calls
+        while window and now - window[0] > period_seconds:
             window.popleft()
-        if len(window) >= self.max_calls:
-            retry_after = self.period_seconds - (now - window[0])
+        if len(window) >= max_calls:
+            retry_after = period_seconds - (now - window[0])
             return RateLimitResult(False, max(retry_after, 0))
         window.append(now)
         return RateLimitResult(True, 0)
 
+    def _is_idle(self, state: _State, now: float, period_seconds: float) -> bool:
+        if isinstance(state, _Bucket):
+            return state.tat <= now
+        return now - state.seen > period_seconds
+
+    def _sweep(self, now: float, period_seconds: float) -> None:
+        shard = self._shards[self._sweep_cursor]
+        self._sweep_cursor = (self._sweep_cursor + 1) % len(self._shards)
+        self._next_sweep = now + self.sweep_interval
+        # Shards are in LRU order, so stop at the first key that is still active
+        # for window mode; GCRA keys can go idle out of order and are all checked.
+        idle = []
+        for key, state in shard.items():
+            if self._is_idle(state, now, period_seconds):
+                idle.append(key)
+            elif self.mode == MODE_WINDOW:
+                break
+        for key in idle:
+            del shard[key]
+        self.evicted_idle += len(idle)
+
+    def sweep_all(self, period_seconds: float) -> None:
+        now = time.monotonic()
+        for _ in self._shards:
+            self._sweep(now, period_seconds)
+
+    def stats(self) -> Dict[str, int]:
+        keys = sum(len(shard) for shard in self._shards)
+        memory = sum(sys.getsizeof(shard) for shard in self._shards)
+        for shard in self._shards:
+            for key, state in shard.items():
+                memory += sys.getsizeof(key) + sys.getsizeof(state)
+                if isinstance(state, _Window):
+                    memory += sys.getsizeof(state.calls) + len(state.calls) * sys.getsizeof(0.0)
+        return {
+            "keys": keys,
+            "memory_bytes": memory,
+            "evicted_idle": self.evicted_idle,
+            "evicted_forced": self.evicted_forced,
+        }
+
+
+@dataclass
+class _PendingHit:
+    key: str
+    max_calls: int
+    period_seconds: float
+    future: asyncio.Future
+
+
+class SqlRateLimitStore(RateLimitStore):
+    """GCRA state in the ``rate_limit_buckets`` table, shared by every process.
+
+    Calls arriving within ``batch_window`` seconds are checked together with one
+    upsert ... RETURNING statement, so an update costs at most one round-trip.
+    A key that shows up twice in a window goes into the next statement, since
+    one upsert cannot touch the same row twice. If the database is unavailable
+    the hit is counted by the in-process ``fallback`` store instead.
+
+    The clock is ``time.time()`` rather than ``time.monotonic()`` because the
+    arrival times are compared across processes and restarts.
+    """
+
+    def __init__(
+        self,
+        batch_window: float = 0.005,
+        batch_size: int = 500,
+        purge_interval: float = 60.0,
+        fallback: Optional[MemoryRateLimitStore] = None,
+    ) -> None:
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.purge_interval = purge_interval
+        self.fallback = fallback or MemoryRateLimitStore()
+        self._pending: List[_PendingHit] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self._next_purge = 0.0
+        self.round_trips = 0
+        self.fallbacks = 0
+
+    async def hit(self, key: str, max_calls: int, period_seconds: float) -> RateLimitResult:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingHit(key, max_calls, period_seconds, future))
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        try:
+            await asyncio.sleep(self.batch_window)
+            while self._pending:
+                await self._execute(self._take_batch())
+        finally:
+            self._flusher = None
+
+    def _take_batch(self) -> List[_PendingHit]:
+        first = self._pending[0]
+        batch: List[_PendingHit] = []
+        keys = set()
+        remaining: List[_PendingHit] = []
+        for pending in self._pending:
+            same_policy = (pending.max_calls, pending.period_seconds) == (first.max_calls, first.period_seconds)
+            if same_policy and pending.key not in keys and len(batch) < self.batch_size:
+                batch.append(pending)
+                keys.add(pending.key)
+            else:
+                remaining.append(pending)
+        self._pending = remaining
+        return batch
+
+    async def _execute(self, batch: List[_PendingHit]) -> None:
+        max_calls, period_seconds = batch[0].max_calls, batch[0].period_seconds
+        interval = period_seconds / max_calls
+        now = time.time()
+        try:
+            async with get_async_session() as session:
+                outcomes = await repo.hit_rate_limit_buckets_async(
+                    session, [pending.key for pending in batch], now, interval, period_seconds
+                )
+                if now >= self._next_purge:
+                    # Buckets whose arrival time has passed are back to "fresh"; dropping them is free.
+                    self._next_purge = now + self.purge_interval
+                    await repo.purge_rate_limit_buckets_async(session, now)
+        except Exception as exc:
+            self.fallbacks += 1
+            logger.warning("Shared rate limit store unavailable, using local state: {error}", error=str(exc))
+            for pending in batch:
+                _resolve(pending, self.fallback.record(pending.key, max_calls, period_seconds))
+            return
+
+        self.round_trips += 1
+        for pending in batch:
+            tat, allowed = outcomes[pending.key]
+            if allowed:
+                _resolve(pending, RateLimitResult(True, 0))
+            else:
+                _resolve(pending, RateLimitResult(False, max(tat + interval - now - period_seconds, 0)))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "round_trips": self.round_trips,
+            "fallbacks": self.fallbacks,
+            "fallback_keys": self.fallback.stats()["keys"],
+        }
+
+
+def _resolve(pending: _PendingHit, result: RateLimitResult) -> None:
+    # The caller may have been cancelled while its hit was in flight.
+    if not pending.future.done():
+        pending.future.set_result(result)
+
+
+class RateLimiter:
+    """Allows ``max_calls`` per ``period_seconds`` for each key, with state kept in ``store``."""
+
+    def __init__(self, max_calls: int, period_seconds: float, store: Optional[RateLimitStore] = None) -> None:
+        self.max_calls = max_calls
+        self.period_seconds = period_seconds
+        self.store = store or MemoryRateLimitStore()
+
+    def use_store(self, store: RateLimitStore) -> None:
+        self.store = store
+
+    async def allow(self, key: str) -> RateLimitResult:
+        return await self.store.hit(key, self.max_calls, self.period_seconds)
+
+    def stats(self) -> Dict[str, int]:
+        return self.store.stats()
+
 
 rate_limiter = RateLimiter(max_calls=5, period_seconds=10)
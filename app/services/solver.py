@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Optional
+
+from loguru import logger
+
+from app.core.config import SOLVER_PROCESS, SOLVER_THREAD
+from app.services.assignment import AssignmentJob, AssignmentJobResult, run_assignment_job
+
+# Extra time the event loop waits past the budget for the solver to stop by itself.
+GRACE_SECONDS = 1.0
+
+
+class SolverPool:
+    """Runs assignment jobs off the event loop with a time budget.
+
+    The solver checks the budget itself and returns a timed-out result, so the
+    worker is freed. ``solve`` also stops waiting after the budget plus a short
+    grace period, in case a job does not get to its next check in time.
+    """
+
+    def __init__(
+        self, kind: str = SOLVER_THREAD, max_workers: Optional[int] = None, time_budget: float = 10.0
+    ) -> None:
+        self.configure(kind, max_workers, time_budget)
+        self._executor: Optional[Executor] = None
+
+    def configure(self, kind: str, max_workers: Optional[int], time_budget: float) -> None:
+        if kind not in {SOLVER_THREAD, SOLVER_PROCESS}:
+            raise ValueError(f"Unknown solver executor: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.time_budget = time_budget
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == SOLVER_PROCESS:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="solver")
+        return self._executor
+
+    async def solve(self, job: AssignmentJob) -> AssignmentJobResult:
+        if job.time_budget is None:
+            job = replace(job, time_budget=self.time_budget)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), run_assignment_job, job)
+        try:
+            return await asyncio.wait_for(future, job.time_budget + GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            logger.bind(group_id=job.group_id).warning("Solver did not finish within its time budget")
+            return AssignmentJobResult(job.group_id, error="Solver timed out.", timed_out=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+solver_pool = SolverPool()
@@ -0,0 +1,177 @@
+"""Benchmark assignment generation across group sizes and constraint densities.
+
+Usage:
+    python -m benchmarks.bench_assignment --output bench.json
+    python -m benchmarks.bench_assignment --compare baseline.json --output current.json
+
+Each cell of the sweep (participants × exclusion density × no-repeat coverage)
+is solved with ``--trials`` different seeds. Wall time is measured without
+tracing; peak memory comes from one extra run under tracemalloc.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from app.services.assignment import AssignmentError, solve_assignments
+
+DEFAULT_SIZES = [50, 500, 5000]
+DEFAULT_DENSITIES = [0.0, 0.001, 0.01, 0.1]
+DEFAULT_COVERAGES = [0.0, 0.5, 1.0]
+
+
+def build_case(
+    size: int, density: float, coverage: float, rng: random.Random
+) -> Tuple[List[int], List[Tuple[int, int]], Dict[int, int]]:
+    participants = list(range(1, size + 1))
+    per_giver = round(density * (size - 1))
+    exclusions = []
+    if per_giver:
+        for giver in participants:
+            others = rng.sample(participants, min(per_giver + 1, size))
+            exclusions.extend((giver, receiver) for receiver in others if receiver != giver)
+
+    previous = participants[:]
+    rng.shuffle(previous)
+    last_round = {giver: previous[(index + 1) % size] for index, giver in enumerate(previous)}
+    covered = rng.sample(participants, round(coverage * size))
+    no_repeat_map = {giver: last_round[giver] for giver in covered}
+    return participants, exclusions, no_repeat_map
+
+
+def run_cell(size: int, density: float, coverage: float, trials: int, seed: int) -> Dict[str, object]:
+    rng = random.Random(seed)
+    participants, exclusions, no_repeat_map = build_case(size, density, coverage, rng)
+
+    timings: List[float] = []
+    phases: List[int] = []
+    failures = 0
+    strategy: Optional[str] = None
+    for trial in range(trials):
+        started = time.perf_counter()
+        try:
+            solution = solve_assignments(participants, exclusions, no_repeat_map, seed=seed + trial)
+        except AssignmentError:
+            failures += 1
+        else:
+            phases.append(solution.phases)
+            strategy = solution.strategy
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        solve_assignments(participants, exclusions, no_repeat_map, seed=seed)
+    except AssignmentError:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "participants": size,
+        "exclusion_density": density,
+        "no_repeat_coverage": coverage,
+        "exclusions": len(exclusions),
+        "trials": trials,
+        "strategy": strategy,
+        "wall_time_median_s": statistics.median(timings),
+        "wall_time_max_s": max(timings),
+        "peak_memory_bytes": peak,
+        "phases_median": statistics.median(phases) if phases else None,
+        "failure_rate": failures / trials,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cell_key(result: Dict[str, object]) -> Tuple[object, object, object]:
+    return result["participants"], result["exclusion_density"], result["no_repeat_coverage"]
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float) -> int:
+    previous = {cell_key(result): result for result in baseline["results"]}
+    regressions = 0
+    print(f"{'cell':<28} {'time x':>8} {'memory x':>9}")
+    for result in current["results"]:
+        before = previous.get(cell_key(result))
+        if not before:
+            continue
+        time_ratio = result["wall_time_median_s"] / max(before["wall_time_median_s"], 1e-9)
+        memory_ratio = result["peak_memory_bytes"] / max(before["peak_memory_bytes"], 1)
+        flag = ""
+        if time_ratio > threshold or memory_ratio > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        label = "n={0} d={1} r={2}".format(*cell_key(result))
+        print(f"{label:<28} {time_ratio:>8.2f} {memory_ratio:>9.2f}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES)
+    parser.add_argument("--coverages", type=float, nargs="+", default=DEFAULT_COVERAGES)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--max-exclusions",
+        type=int,
+        default=1_000_000,
+        help="Skip cells that would generate more exclusion pairs than this.",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--compare", help="Baseline JSON to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Ratio that counts as a regression.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        for density in args.densities:
+            if size * round(density * (size - 1)) > args.max_exclusions:
+                print(f"skip n={size} d={density}: too many exclusions", file=sys.stderr)
+                continue
+            for coverage in args.coverages:
+                result = run_cell(size, density, coverage, args.trials, args.seed)
+                results.append(result)
+                print(
+                    "n={participants} d={exclusion_density} r={no_repeat_coverage}: "
+                    "{wall_time_median_s:.4f}s, {peak_memory_bytes} B peak, "
+                    "failures {failure_rate:.0%}".format(**result),
+                    file=sys.stderr,
+                )
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        return 1 if compare(baseline, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
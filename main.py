@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
 
 import uvloop
 from aiogram.types import BotCommand, BotCommandScopeDefault
 from loguru import logger
 
+from app.api.cluster import run_cluster
+from app.api.webhook import run_webhook
 from app.bot import bot, dp
-from app.core.config import load_settings
+from app.core.config import MODE_POLLING, MODE_WEBHOOK, RATE_LIMIT_DATABASE, load_settings
 from app.core.logging import setup_logging
-from app.db import init_engine
+from app.db import dispose_async_engine, init_async_engine, init_engine
+from app.services.announcements import join_announcer
+from app.services.outbox import outbox_worker
+from app.services.rate_limit import SqlRateLimitStore, rate_limiter
+from app.services.solver import solver_pool
 
 
 USERS_COMMANDS: dict[str, str] = {
@@ -22,6 +29,10 @@ USERS_COMMANDS: dict[str, str] = {
     "wish": "wishlist commands",
     "setbudget": "set budget",
     "setdeadline": "set deadline",
+    "setnorepeat": "avoid repeats for N rounds",
+    "exclude": "exclude a pairing",
+    "unexclude": "remove an exclusion",
+    "exclusions": "list exclusions",
     "upgrade": "upgrade plan",
     "activate": "activate upgrade",
 }
@@ -58,28 +69,60 @@ async def on_startup() -> None:
     logger.info("Privacy Mode - {mode}", mode=states[not bot_info.can_read_all_group_messages])
     logger.info("Inline Mode  - {mode}", mode=states[bot_info.supports_inline_queries])
 
+    outbox_worker.start(bot)
+
     logger.info("bot started")
 
 
 async def on_shutdown() -> None:
     logger.info("bot stopping...")
 
+    await join_announcer.flush_all()
+    await outbox_worker.stop()
+    solver_pool.shutdown()
+
     await dp.storage.close()
     await dp.fsm.storage.close()
 
     await bot.session.close()
+    await dispose_async_engine()
 
     logger.info("bot stopped")
 
 
-async def main() -> None:
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Secret Santa bot")
+    parser.add_argument(
+        "--mode",
+        choices=[MODE_POLLING, MODE_WEBHOOK],
+        help="How to receive updates (defaults to BOT_MODE, then polling).",
+    )
+    return parser.parse_args()
+
+
+async def main(mode: str | None = None) -> None:
     settings = load_settings()
+    mode = mode or settings.mode
     setup_logging(settings.log_level, settings.log_path)
     init_engine(settings.database_url)
+    init_async_engine(settings.database_url)
+    if settings.rate_limit_backend == RATE_LIMIT_DATABASE:
+        rate_limiter.use_store(SqlRateLimitStore())
+    solver_pool.configure(settings.solver_executor, settings.solver_workers, settings.solver_time_budget)
+    join_announcer.configure(settings.join_announce_window, settings.join_announce_max_batch)
 
     dp.startup.register(on_startup)
     dp.shutdown.register(on_shutdown)
 
+    if mode == MODE_WEBHOOK and settings.workers > 1:
+        await run_cluster(dp, bot, settings)
+        return
+    if mode == MODE_WEBHOOK:
+        await run_webhook(dp, bot, settings)
+        return
+    if settings.workers > 1:
+        raise ValueError("WORKERS > 1 requires webhook mode.")
+
     await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
 
 
@@ -87,4 +130,5 @@ if __name__ == "__main__":
     if not getattr(asyncio, "debug", False):
         uvloop.install()
 
-    asyncio.run(main())
+    args = parse_args()
+    asyncio.run(main(args.mode))
@@ -0,0 +1,45 @@
+import pytest
+
+from app.db import repo
+from app.db.models import GroupEntitlement
+from app.services import game_flow
+from app.services.admin_cache import admin_roster
+from app.services.entitlements import entitlement_cache
+from app.services.participant_list import participant_list_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Every test builds a fresh database, so ids repeat; cached entries from the last one must not leak in.
+    entitlement_cache.clear()
+    participant_list_cache.clear()
+    admin_roster.clear()
+
+
+@pytest.fixture
+def make_group():
+    """Return a factory that creates a group and joins members to it.
+
+    ``names`` is a list of usernames, or a count for ``user<telegram_id>``
+    members. Telegram ids count up from ``first_telegram_id``. A ``pro`` group
+    gets its entitlement before anyone joins, like a group upgraded up front,
+    so it may grow past the free plan's cap.
+    """
+
+    def make(session, names, chat_id=-100, first_telegram_id=1, pro=False, private=True):
+        if isinstance(names, int):
+            names = [f"user{telegram_id}" for telegram_id in range(first_telegram_id, first_telegram_id + names)]
+        group = repo.get_or_create_group(session, chat_id, first_telegram_id, "Office")
+        if pro:
+            session.add(GroupEntitlement(group_id=group.id, plan="pro", valid_until=None))
+            session.flush()
+        users = []
+        for telegram_id, name in enumerate(names, start=first_telegram_id):
+            if private:
+                game_flow.register_private_chat(session, telegram_id, name, name.title(), None)
+            result = game_flow.join_group(session, telegram_id, name, name.title(), None, chat_id, "Office")
+            users.append(result.user)
+        session.commit()
+        return group, users
+
+    return make
@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.admin_cache import AdminRoster
+
+
+class FakeBot:
+    def __init__(self, admins):
+        self.admins = admins
+        self.calls = 0
+
+    async def get_chat_administrators(self, chat_id):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return [SimpleNamespace(user=SimpleNamespace(id=user_id)) for user_id in self.admins[chat_id]]
+
+
+def test_roster_is_loaded_once_per_chat():
+    bot = FakeBot({-1: [10, 11]})
+    roster = AdminRoster()
+
+    async def scenario():
+        return await asyncio.gather(
+            roster.is_admin(bot, -1, 10),
+            roster.is_admin(bot, -1, 11),
+            roster.is_admin(bot, -1, 12),
+        )
+
+    assert asyncio.run(scenario()) == [True, True, False]
+    assert asyncio.run(roster.is_admin(bot, -1, 10))
+    assert bot.calls == 1
+    assert roster.stats()["hits"] == 1
+
+
+def test_invalidate_and_ttl_reload_roster():
+    bot = FakeBot({-1: [10]})
+    roster = AdminRoster(ttl_seconds=60)
+    assert asyncio.run(roster.is_admin(bot, -1, 10))
+
+    bot.admins[-1] = [20]
+    roster.invalidate(-1)
+    assert asyncio.run(roster.is_admin(bot, -1, 20))
+    assert not asyncio.run(roster.is_admin(bot, -1, 10))
+
+    expired = AdminRoster(ttl_seconds=0)
+    asyncio.run(expired.is_admin(bot, -1, 20))
+    asyncio.run(expired.is_admin(bot, -1, 20))
+    assert bot.calls == 4
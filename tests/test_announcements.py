@@ -0,0 +1,62 @@
+import asyncio
+
+from app.services.announcements import JoinAnnouncer, compose_join_announcement
+from app.services.delivery import DeliveryEngine, DeliveryPolicy
+
+FAST_POLICY = DeliveryPolicy(messages_per_second=1000.0, per_chat_interval=0.0, max_attempts=1, backoff_base=0.0)
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+def test_compose_names_a_few_and_counts_the_rest():
+    assert compose_join_announcement(["@a"]) == "@a joined the Secret Santa game!"
+    assert compose_join_announcement(["@a", "@b"]) == "@a and @b joined the Secret Santa game!"
+    labels = [f"@u{index}" for index in range(8)]
+    assert compose_join_announcement(labels, max_names=2) == "@u0, @u1 and 6 others joined the Secret Santa game!"
+    assert compose_join_announcement(labels[:3], max_names=2) == "@u0, @u1 and 1 other joined the Secret Santa game!"
+
+
+def test_joins_within_the_window_share_one_message():
+    bot = FakeBot()
+    announcer = JoinAnnouncer(DeliveryEngine(FAST_POLICY), window_seconds=0.05, max_batch=100)
+
+    async def scenario():
+        for index in range(12):
+            announcer.add(bot, -100, f"@u{index}")
+        announcer.add(bot, -200, "@solo")
+        assert bot.sent == []
+        await asyncio.sleep(0.1)
+        announcer.add(bot, -100, "@late")
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert sorted(bot.sent[:2]) == [
+        (-200, "@solo joined the Secret Santa game!"),
+        (-100, "@u0, @u1, @u2, @u3, @u4 and 7 others joined the Secret Santa game!"),
+    ]
+    assert bot.sent[2:] == [(-100, "@late joined the Secret Santa game!")]
+
+
+def test_full_batch_is_sent_early_and_shutdown_flushes_the_rest():
+    bot = FakeBot()
+    announcer = JoinAnnouncer(DeliveryEngine(FAST_POLICY), window_seconds=60, max_batch=3)
+
+    async def scenario():
+        for index in range(4):
+            announcer.add(bot, -100, f"@u{index}")
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        early = list(bot.sent)
+        await announcer.flush_all()
+        return early
+
+    early = asyncio.run(scenario())
+    assert early == [(-100, "@u0, @u1 and @u2 joined the Secret Santa game!")]
+    assert bot.sent[1:] == [(-100, "@u3 joined the Secret Santa game!")]
+    assert announcer.pending(-100) == []
@@ -1,6 +1,10 @@
+import itertools
+import random
+import tracemalloc
+
 import pytest
 
-from app.services.assignment import AssignmentError, generate_assignments
+from app.services.assignment import AssignmentError, UnsatisfiableError, generate_assignments
 
 
 def test_assignment_basic_bijection():
@@ -54,3 +58,125 @@ def test_assignment_unique_receivers():
     participants = [1, 2, 3, 4, 5, 6]
     assignments = generate_assignments(participants, seed=77)
     assert len(set(assignments.values())) == len(participants)
+
+
+def test_unconstrained_assignment_is_single_cycle():
+    participants = list(range(1, 51))
+    assignments = generate_assignments(participants, seed=11)
+    seen = [1]
+    while assignments[seen[-1]] != 1:
+        seen.append(assignments[seen[-1]])
+    assert len(seen) == len(participants)
+
+
+def test_assignment_large_group_without_recursion_limit():
+    participants = list(range(2000))
+    exclusions = [(giver, (giver + 1) % 2000) for giver in participants]
+    assignments = generate_assignments(participants, exclusions=exclusions, seed=3)
+    assert set(assignments.values()) == set(participants)
+    assert all(assignments[giver] not in {giver, (giver + 1) % 2000} for giver in participants)
+
+
+def test_assignment_deterministic_seed_with_constraints():
+    participants = list(range(1, 30))
+    exclusions = [(giver, giver + 1) for giver in range(1, 29)]
+    first = generate_assignments(participants, exclusions=exclusions, no_repeat_map={1: 3}, seed=5)
+    second = generate_assignments(participants, exclusions=exclusions, no_repeat_map={1: 3}, seed=5)
+    assert first == second
+
+
+def test_assignment_detects_hall_violation():
+    # 1 and 2 may only give to 3: every giver has a choice, but no bijection exists.
+    participants = [1, 2, 3, 4]
+    exclusions = [(1, 2), (1, 4), (2, 1), (2, 4)]
+    with pytest.raises(AssignmentError):
+        generate_assignments(participants, exclusions=exclusions, seed=1)
+
+
+def test_assignment_matches_brute_force_feasibility():
+    rng = random.Random(2024)
+    for _ in range(200):
+        size = rng.randint(2, 6)
+        participants = list(range(size))
+        exclusions = [
+            (giver, receiver)
+            for giver in participants
+            for receiver in participants
+            if giver != receiver and rng.random() < 0.4
+        ]
+        forbidden = set(exclusions)
+        feasible = any(
+            all(giver != receiver and (giver, receiver) not in forbidden for giver, receiver in enumerate(perm))
+            for perm in itertools.permutations(participants)
+        )
+        if feasible:
+            assignments = generate_assignments(participants, exclusions=exclusions, seed=rng.random())
+            assert sorted(assignments.values()) == participants
+            assert not any((giver, receiver) in forbidden for giver, receiver in assignments.items())
+            assert all(giver != receiver for giver, receiver in assignments.items())
+        else:
+            with pytest.raises(AssignmentError):
+                generate_assignments(participants, exclusions=exclusions, seed=1)
+
+
+def test_assignment_respects_multi_round_no_repeat():
+    participants = list(range(1, 9))
+    rng = random.Random(3)
+    history = {}
+    for _ in range(4):
+        previous = generate_assignments(participants, no_repeat_map=history, seed=rng.randint(1, 10_000))
+        for giver, receiver in previous.items():
+            history.setdefault(giver, set()).add(receiver)
+
+    assignments = generate_assignments(participants, no_repeat_map=history, seed=11)
+    assert all(assignments[giver] not in history[giver] for giver in participants)
+
+
+def test_assignment_with_large_forbidden_sets():
+    size = 1000
+    participants = list(range(size))
+    # Every giver has already had the 50 people after them in earlier rounds.
+    history = {giver: {(giver + offset) % size for offset in range(1, 51)} for giver in participants}
+    assignments = generate_assignments(participants, no_repeat_map=history, seed=2)
+    assert sorted(assignments.values()) == participants
+    assert all(assignments[giver] not in history[giver] for giver in participants)
+
+
+def test_unsatisfiable_error_reports_hall_violator():
+    participants = list(range(1, 7))
+    # 1, 2 and 3 may only give to 4 or 5.
+    exclusions = [(giver, receiver) for giver in (1, 2, 3) for receiver in (1, 2, 3, 6) if giver != receiver]
+    with pytest.raises(UnsatisfiableError) as excinfo:
+        generate_assignments(participants, exclusions=exclusions, seed=1)
+    assert set(excinfo.value.givers) == {1, 2, 3}
+    assert set(excinfo.value.receivers) == {4, 5}
+
+
+def test_unsatisfiable_error_names_giver_without_options():
+    exclusions = [(1, 2), (1, 3)]
+    with pytest.raises(UnsatisfiableError) as excinfo:
+        generate_assignments([1, 2, 3], exclusions=exclusions, seed=1)
+    assert excinfo.value.givers == [1]
+    assert excinfo.value.receivers == []
+
+
+def test_assignment_with_many_household_exclusions():
+    participants = list(range(2000))
+    households = [participants[start:start + 4] for start in range(0, 2000, 4)]
+    exclusions = [(giver, receiver) for home in households for giver in home for receiver in home]
+    assignments = generate_assignments(participants, exclusions=exclusions, seed=4)
+    assert sorted(assignments.values()) == participants
+    assert all(assignments[giver] // 4 != giver // 4 for giver in participants)
+
+
+def test_constrained_solver_memory_stays_near_linear():
+    participants = list(range(2000))
+    no_repeat = {giver: (giver + 1) % 2000 for giver in participants}
+    tracemalloc.start()
+    try:
+        generate_assignments(participants, no_repeat_map=no_repeat, seed=1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # One bitmask row per giver is ~250 bytes; adjacency lists of ints were ~130 MB here.
+    assert peak < 10_000_000
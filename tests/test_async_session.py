@@ -0,0 +1,35 @@
+import asyncio
+
+from app.db.models import Base
+from app.db.session import AsyncSessionLocal, get_async_session, init_async_engine, to_async_url
+from app.services import game_flow
+
+
+def test_async_url_uses_async_drivers():
+    assert to_async_url("sqlite:///secretsanta.db") == "sqlite+aiosqlite:///secretsanta.db"
+    assert to_async_url("postgresql://u:p@db/santa") == "postgresql+asyncpg://u:p@db/santa"
+    assert to_async_url("postgresql+psycopg2://u:p@db/santa") == "postgresql+asyncpg://u:p@db/santa"
+    assert to_async_url("postgresql+asyncpg://u:p@db/santa") == "postgresql+asyncpg://u:p@db/santa"
+
+
+def test_join_group_async(tmp_path):
+    async def scenario():
+        engine = init_async_engine(f"sqlite:///{tmp_path / 'santa.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        async with get_async_session() as session:
+            first = await game_flow.join_group_async(session, 1, "alice", "Alice", None, -100, "Office")
+            second = await game_flow.join_group_async(session, 1, "alice", "Alice", None, -100, "Office")
+
+        async with get_async_session() as session:
+            participants = await game_flow.list_participants_async(session, first.group)
+
+        await engine.dispose()
+        AsyncSessionLocal.configure(bind=None)
+        return first, second, participants
+
+    first, second, participants = asyncio.run(scenario())
+    assert first.added
+    assert not second.added
+    assert [user.telegram_username for user in participants] == ["alice"]
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import cli
+from app.db import Assignment, GroupStatus, NotificationOutbox, OutboxKind
+from app.db.models import Base
+from app.services import game_flow
+
+
+def create_session(url="sqlite+pysqlite:///:memory:"):
+    engine = create_engine(url, future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+
+def test_bulk_assign_reports_each_group_and_inserts_in_bulk(make_group):
+    session = create_session()
+    sales, _ = make_group(session, 6, chat_id=-1, first_telegram_id=100)
+    support, _ = make_group(session, 5, chat_id=-2, first_telegram_id=200, pro=True)
+    lonely, _ = make_group(session, 1, chat_id=-3, first_telegram_id=300)
+    shy, _ = make_group(session, 3, chat_id=-4, first_telegram_id=400, private=False)
+    # Every support member except the first refuses everyone but the first: a Hall violation.
+    members = game_flow.list_participants(session, support)
+    for giver in members[1:]:
+        for receiver in members[1:]:
+            if giver != receiver:
+                game_flow.add_exclusion(session, support, giver, receiver, symmetric=False)
+    session.commit()
+
+    inserts = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO assignments"):
+            inserts.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        outcomes = game_flow.assign_groups_bulk(
+            session, [shy.id, lonely.id, support.id, sales.id, 999], seed=5, executor=executor
+        )
+    session.commit()
+
+    by_group = {outcome.group_id: outcome for outcome in outcomes}
+    assert [outcome.group_id for outcome in outcomes] == sorted(by_group)
+    assert by_group[sales.id].assigned and by_group[sales.id].assignments == 6
+    assert "too tight" in by_group[support.id].error
+    assert "Not enough participants" in by_group[lonely.id].error
+    assert "private chat" in by_group[shy.id].error
+    assert by_group[999].error == "Group not found."
+
+    assert len(inserts) == 1
+    assert session.query(Assignment).filter_by(group_id=sales.id).count() == 6
+    assert session.query(Assignment).filter_by(group_id=support.id).count() == 0
+    assert sales.status == GroupStatus.ASSIGNED
+    assert support.status == GroupStatus.OPEN
+    queued = session.query(NotificationOutbox).filter_by(group_id=sales.id, kind=OutboxKind.ASSIGNMENT).count()
+    assert queued == 6
+
+
+def test_bulk_assign_cli_uses_a_process_pool(tmp_path, capsys, make_group):
+    url = f"sqlite:///{tmp_path / 'santa.db'}"
+    session = create_session(url)
+    first, _ = make_group(session, 4, chat_id=-1, first_telegram_id=100)
+    second, _ = make_group(session, 3, chat_id=-2, first_telegram_id=200)
+    session.close()
+
+    exit_code = cli.main(["--database-url", url, "assign", "--status", "open", "--workers", "2", "--seed", "1"])
+
+    output = capsys.readouterr().out
+    assert exit_code == 0
+    assert f"group {first.id}: assigned 4 participants" in output
+    assert f"group {second.id}: assigned 3 participants" in output
@@ -0,0 +1,93 @@
+import asyncio
+import queue
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.cluster import partition_for, partition_key, stop_workers
+from app.db.locks import acquire_group_lock
+from app.db.models import Base, Group, GroupStatus
+from app.services import game_flow
+from app.services.assignment import AssignmentError
+
+
+def create_session():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+
+def test_updates_of_one_chat_share_a_partition():
+    message = {"update_id": 1, "message": {"chat": {"id": -1001}, "from": {"id": 7}}}
+    callback = {
+        "update_id": 2,
+        "callback_query": {"from": {"id": 8}, "message": {"chat": {"id": -1001}}},
+    }
+    member = {"update_id": 3, "my_chat_member": {"chat": {"id": -1001}}}
+    assert partition_key(message) == partition_key(callback) == partition_key(member) == -1001
+    assert len({partition_for(update, 4) for update in (message, callback, member)}) == 1
+    assert 0 <= partition_for(message, 4) < 4
+
+
+def test_partition_falls_back_to_user_and_update_id():
+    assert partition_key({"update_id": 5, "inline_query": {"from": {"id": 42}}}) == 42
+    assert partition_key({"update_id": 5}) == 5
+
+
+class FakeProcess:
+    def __init__(self, name):
+        self.name = name
+        self.alive = True
+        self.terminated = False
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return self.alive and not self.terminated
+
+    def terminate(self):
+        self.terminated = True
+
+
+class FullQueue:
+    def put(self, item, timeout=None):
+        raise queue.Full
+
+
+def test_stop_workers_terminates_a_worker_whose_queue_stays_full():
+    idle, stuck = queue.Queue(maxsize=1), FullQueue()
+    processes = [FakeProcess("idle"), FakeProcess("stuck")]
+    processes[0].join = lambda timeout=None: setattr(processes[0], "alive", False)
+
+    asyncio.run(asyncio.wait_for(stop_workers([idle, stuck], processes, timeout=0.1), timeout=5))
+
+    assert idle.get_nowait() is None
+    assert [process.terminated for process in processes] == [False, True]
+
+
+def test_assign_rechecks_status_under_group_lock():
+    session = create_session()
+    for telegram_id in (1, 2):
+        game_flow.register_private_chat(session, telegram_id, f"user{telegram_id}", None, None)
+        result = game_flow.join_group(session, telegram_id, f"user{telegram_id}", None, None, -100, "Office")
+    session.commit()
+
+    stale = result.group
+    other_session = sessionmaker(bind=session.get_bind(), expire_on_commit=False)()
+    fresh = other_session.get(Group, stale.id)
+    fresh.status = GroupStatus.ASSIGNED
+    other_session.commit()
+
+    assert stale.status == GroupStatus.OPEN
+    with pytest.raises(AssignmentError, match="already been assigned"):
+        game_flow.assign_group(session, stale)
+
+
+def test_group_lock_runs_on_sqlite():
+    session = create_session()
+    session.add(Group(telegram_id=-100))
+    session.flush()
+    acquire_group_lock(session, 1)
+    session.commit()
@@ -0,0 +1,69 @@
+import asyncio
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
+
+from app.services.delivery import DeliveryEngine, DeliveryPolicy, OutgoingMessage
+
+FAST_POLICY = DeliveryPolicy(
+    concurrency=4,
+    messages_per_second=1000.0,
+    per_chat_interval=0.0,
+    max_attempts=3,
+    backoff_base=0.0,
+)
+
+
+class FakeBot:
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            pending = self.failures.get(chat_id)
+            if pending:
+                raise pending.pop(0)
+            self.sent.append(chat_id)
+        finally:
+            self.in_flight -= 1
+
+
+def test_delivers_all_with_bounded_concurrency():
+    bot = FakeBot()
+    messages = [OutgoingMessage(chat_id, "hi") for chat_id in range(20)]
+    report = asyncio.run(DeliveryEngine(FAST_POLICY).deliver(bot, messages))
+    assert sorted(bot.sent) == list(range(20))
+    assert len(report.delivered) == 20
+    assert bot.max_in_flight <= FAST_POLICY.concurrency
+
+
+def test_retries_flood_control_and_transient_errors():
+    bot = FakeBot(
+        {
+            1: [TelegramRetryAfter(method=None, message="flood", retry_after=0)],
+            2: [TelegramNetworkError(method=None, message="timeout")],
+        }
+    )
+    messages = [OutgoingMessage(1, "a"), OutgoingMessage(2, "b")]
+    report = asyncio.run(DeliveryEngine(FAST_POLICY).deliver(bot, messages))
+    assert sorted(bot.sent) == [1, 2]
+    assert {outcome.chat_id: outcome.attempts for outcome in report.outcomes} == {1: 2, 2: 2}
+
+
+def test_reports_permanent_and_exhausted_failures():
+    bot = FakeBot(
+        {
+            1: [TelegramForbiddenError(method=None, message="bot was blocked by the user")],
+            2: [TelegramNetworkError(method=None, message="timeout") for _ in range(3)],
+        }
+    )
+    messages = [OutgoingMessage(1, "a"), OutgoingMessage(2, "b"), OutgoingMessage(3, "c")]
+    report = asyncio.run(DeliveryEngine(FAST_POLICY).deliver(bot, messages))
+    failed = {outcome.chat_id: outcome.attempts for outcome in report.failed}
+    assert failed == {1: 1, 2: 3}
+    assert [outcome.chat_id for outcome in report.delivered] == [3]
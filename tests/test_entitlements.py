@@ -1,8 +1,10 @@
 import datetime
+import time
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.db import repo
 from app.db.models import Base, GroupEntitlement
 from app.services import entitlements
 
@@ -40,3 +42,52 @@ def test_expired_plan_falls_back_to_free():
     result = entitlements.for_group(session, group_id=1)
     assert result.plan == "free"
     assert result.max_participants == 20
+
+
+def test_cached_entitlements_skip_the_query(monkeypatch):
+    session = create_session()
+    session.add(GroupEntitlement(group_id=7, plan="pro", valid_until=None))
+    session.commit()
+    entitlements.for_group(session, group_id=7)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("entitlements should come from the cache")
+
+    monkeypatch.setattr(entitlements.repo, "get_group_entitlement", fail)
+    assert entitlements.for_group(session, group_id=7).plan == "pro"
+
+
+def test_upgrade_invalidates_cached_free_plan():
+    session = create_session()
+    assert entitlements.for_group(session, group_id=8).plan == "free"
+
+    repo.upsert_group_entitlement(session, 8, "pro", None)
+    session.commit()
+    assert entitlements.for_group(session, group_id=8).plan == "pro"
+
+    repo.upsert_group_entitlement(session, 8, "free", None)
+    session.commit()
+    assert entitlements.for_group(session, group_id=8).plan == "free"
+
+
+def test_cache_never_outlives_valid_until():
+    cache = entitlements.EntitlementCache(ttl_seconds=60)
+    almost_expired = datetime.datetime.utcnow() + datetime.timedelta(milliseconds=1)
+    cache.set(
+        9,
+        entitlements.Entitlements(plan="pro", valid_until=almost_expired, max_participants=None, features=set()),
+    )
+    time.sleep(0.01)
+    assert cache.get(9) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = entitlements.EntitlementCache(ttl_seconds=60, max_size=2)
+    free = entitlements.Entitlements(plan="free", valid_until=None, max_participants=20, features=set())
+    cache.set(1, free)
+    cache.set(2, free)
+    cache.get(1)
+    cache.set(3, free)
+    assert cache.get(2) is None
+    assert cache.get(1) is free
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import repo
+from app.db.models import Base
+from app.services import game_flow
+from app.services.assignment import AssignmentError
+
+
+def create_session():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+
+def test_manage_exclusions_by_username(make_group):
+    session = create_session()
+    group, (alice, bob, carol) = make_group(session, ["alice", "bob", "carol"], pro=True)
+
+    assert game_flow.find_participant(session, group, "@Alice") == alice
+    assert game_flow.find_participant(session, group, str(bob.telegram_id)) == bob
+    assert game_flow.find_participant(session, group, "@nobody") is None
+
+    assert game_flow.add_exclusion(session, group, alice, bob, symmetric=False)
+    assert not game_flow.add_exclusion(session, group, alice, bob, symmetric=False)
+    assert game_flow.add_exclusion(session, group, alice, bob, symmetric=True)
+    assert game_flow.add_exclusion(session, group, carol, alice, symmetric=False)
+    assert game_flow.list_exclusions(session, group) == ["@alice ↔ @bob", "@carol → @alice"]
+    assert sorted(repo.list_exclusion_pairs(session, group.id)) == sorted(
+        [(alice.id, bob.id), (bob.id, alice.id), (carol.id, alice.id)]
+    )
+
+    assert game_flow.remove_exclusion(session, group, bob, alice) == 1
+    assert game_flow.list_exclusions(session, group) == ["@carol → @alice"]
+
+
+def test_assign_group_respects_stored_exclusions(make_group):
+    session = create_session()
+    group, users = make_group(session, ["alice", "bob", "carol", "dave"], pro=True)
+    alice, bob, carol, dave = users
+    game_flow.add_exclusion(session, group, alice, bob, symmetric=True)
+    game_flow.add_exclusion(session, group, carol, dave, symmetric=True)
+
+    for seed in range(1, 20):
+        assignments = game_flow.assign_group(session, group, seed=seed).assignments
+        assert assignments[alice.id] != bob.id and assignments[bob.id] != alice.id
+        assert assignments[carol.id] != dave.id and assignments[dave.id] != carol.id
+        game_flow.reset_group(session, group)
+
+
+def test_unsatisfiable_exclusions_name_the_people_involved(make_group):
+    session = create_session()
+    group, users = make_group(session, ["alice", "bob", "carol", "dave", "erin"], pro=True)
+    alice, bob, carol, dave, erin = users
+    # Alice, Bob and Carol may only give to Dave.
+    for giver in (alice, bob, carol):
+        for receiver in (alice, bob, carol, erin):
+            if giver != receiver:
+                game_flow.add_exclusion(session, group, giver, receiver, symmetric=False)
+
+    with pytest.raises(AssignmentError) as excinfo:
+        game_flow.assign_group(session, group, seed=1)
+    message = str(excinfo.value)
+    assert "3 people (Alice, Bob and Carol) can only give to 1 (Dave)" in message
+    assert len(message) <= 200
+
+
+def test_draw_is_not_saved_when_an_exclusion_was_added_meanwhile(make_group):
+    session = create_session()
+    group, (alice, bob, carol, dave) = make_group(session, ["alice", "bob", "carol", "dave"], pro=True)
+    prepared = game_flow.prepare_assignment(session, group, seed=1)
+    session.commit()
+    assignments = {alice.id: bob.id, bob.id: carol.id, carol.id: dave.id, dave.id: alice.id}
+
+    game_flow.add_exclusion(session, group, alice, bob, symmetric=False)
+    session.commit()
+
+    with pytest.raises(game_flow.DrawOutdatedError):
+        game_flow.complete_assignment(session, prepared, assignments)
+    session.rollback()
+    assert repo.list_assignments(session, group.id) == []
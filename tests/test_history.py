@@ -0,0 +1,94 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import AssignmentHistory, repo
+from app.db.models import Base
+from app.services import game_flow
+
+
+def create_session():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+
+def as_sets(assignments):
+    return {giver: {receiver} for giver, receiver in assignments.items()}
+
+
+def play_round(session, group, seed):
+    result = game_flow.assign_group(session, group, seed=seed)
+    game_flow.reset_group(session, group)
+    session.commit()
+    return result.assignments
+
+
+def test_reset_archives_numbered_rounds(make_group):
+    session = create_session()
+    group, _ = make_group(session, 4, pro=True)
+    first = play_round(session, group, seed=1)
+    second = play_round(session, group, seed=2)
+
+    assert group.last_round == 2
+    assert repo.get_assignment_rounds(session, group.id, 1, 1) == as_sets(first)
+    assert repo.get_assignment_rounds(session, group.id, 2, 2) == as_sets(second)
+    assert session.query(AssignmentHistory).count() == 8
+
+
+def test_previous_round_is_one_query_and_is_not_repeated(make_group):
+    session = create_session()
+    group, _ = make_group(session, 5, pro=True)
+    for seed in range(1, 6):
+        previous = play_round(session, group, seed=seed)
+
+    statements = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    no_repeat_map = game_flow.build_no_repeat_map(session, group)
+    event.remove(session.get_bind(), "before_cursor_execute", record)
+
+    assert no_repeat_map == as_sets(previous)
+    assert len(statements) == 1
+
+    assignments = game_flow.assign_group(session, group, seed=99).assignments
+    assert all(assignments[giver] != receiver for giver, receiver in previous.items())
+
+
+def test_no_repeat_window_covers_the_last_k_rounds(make_group):
+    session = create_session()
+    group, _ = make_group(session, 6, pro=True)
+    rounds = [play_round(session, group, seed=seed) for seed in range(1, 5)]
+    game_flow.set_no_repeat_rounds(session, group, 3)
+
+    no_repeat_map = game_flow.build_no_repeat_map(session, group)
+    for giver in no_repeat_map:
+        assert no_repeat_map[giver] == {assignments[giver] for assignments in rounds[-3:]}
+
+    assignments = game_flow.assign_group(session, group, seed=7).assignments
+    for previous in rounds[-3:]:
+        assert all(assignments[giver] != receiver for giver, receiver in previous.items())
+
+
+def test_large_group_is_assigned_and_archived_in_a_few_statements(make_group):
+    session = create_session()
+    group, _ = make_group(session, 1000, pro=True)
+    statements = []
+
+    def record(*args):
+        if args[2].startswith(("INSERT INTO assignment", "DELETE FROM assignment")):
+            statements.append(args[2].split("(")[0].strip())
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    assignments = play_round(session, group, seed=1)
+    event.remove(session.get_bind(), "before_cursor_execute", record)
+
+    assert statements == [
+        "INSERT INTO assignments",
+        "INSERT INTO assignment_history",
+        "DELETE FROM assignments WHERE assignments.group_id = ?",
+    ]
+    assert group.last_round == 1
+    assert repo.get_assignment_rounds(session, group.id, 1, 1) == as_sets(assignments)
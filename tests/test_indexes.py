@@ -0,0 +1,77 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import repo
+from app.db.models import Base
+
+HOT_QUERIES = {
+    "list_assignments": lambda session: repo.list_assignments(session, 1),
+    "clear_assignments": lambda session: repo.clear_assignments(session, 1),
+    "get_assignment_rounds": lambda session: repo.get_assignment_rounds(session, 1, 2, 4),
+    "list_wishlist_items": lambda session: repo.list_wishlist_items(session, 1, 2),
+    "clear_wishlist_items": lambda session: repo.clear_wishlist_items(session, 1, 2),
+    "count_group_participants": lambda session: repo.count_group_participants(session, 1),
+    "list_group_participant_rows": lambda session: repo.list_group_participant_rows(session, 1, 10, 50),
+    "list_groups_for_user": lambda session: repo.list_groups_for_user(session, 1),
+}
+
+
+def capture_statements(engine):
+    """Run every hot query once and return the SQL and parameters each one sent."""
+    captured = {}
+    current = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(connection, cursor, statement, parameters, context, executemany):
+        current.append((statement, parameters))
+
+    session = sessionmaker(bind=engine)()
+    for name, query in HOT_QUERIES.items():
+        current.clear()
+        query(session)
+        captured[name] = current[-1]
+    session.rollback()
+    session.close()
+    event.remove(engine, "before_cursor_execute", record)
+    return captured
+
+
+def test_hot_queries_use_indexes_on_sqlite():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as connection:
+        for name, (statement, parameters) in capture_statements(engine).items():
+            plan = " | ".join(
+                row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            )
+            assert "USING" in plan and "INDEX" in plan, f"{name}: {plan}"
+            assert "TEMP B-TREE" not in plan, f"{name}: {plan}"
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_POSTGRES_URL"),
+    reason="Set TEST_POSTGRES_URL to check query plans on PostgreSQL.",
+)
+def test_hot_queries_use_indexes_on_postgres():
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"], future=True)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    try:
+        captured = capture_statements(engine)
+        with engine.connect() as connection:
+            # Empty tables always favour a sequential scan; this asks whether an index could serve the query.
+            connection.execute(text("SET enable_seqscan = off"))
+            for name, (statement, parameters) in captured.items():
+                plan = " | ".join(
+                    row[0] for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                )
+                assert "Index" in plan, f"{name}: {plan}"
+                assert "Seq Scan" not in plan, f"{name}: {plan}"
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
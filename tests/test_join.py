@@ -0,0 +1,104 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import GroupStatus, group_participants, repo
+from app.db.models import Base
+from app.services import game_flow
+
+
+def create_session():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+
+
+def join(session, telegram_id, chat_id=-100):
+    result = game_flow.join_group(session, telegram_id, f"user{telegram_id}", "User", None, chat_id, "Office")
+    session.commit()
+    return result
+
+
+def test_join_checks_the_cap_without_counting_rows():
+    session = create_session()
+    join(session, 1)
+
+    statements = []
+
+    def record(*args):
+        statements.append(args[2].split()[0])
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    result = join(session, 2)
+    event.remove(session.get_bind(), "before_cursor_execute", record)
+
+    assert result.added
+    # The user upsert, the group upsert, and the guarded insert that also bumps the count.
+    assert statements == ["INSERT", "INSERT", "INSERT"]
+    assert result.user.display_name == "User"
+    assert result.group.participant_count == repo.count_group_participants(session, result.group.id) == 2
+
+
+def test_rolled_back_join_leaves_the_count_in_step():
+    session = create_session()
+    group = join(session, 1).group
+    assert game_flow.join_group(session, 2, "user2", "User", None, -100, "Office").added
+    session.rollback()
+
+    session.refresh(group)
+    assert group.participant_count == repo.count_group_participants(session, group.id) == 1
+    assert join(session, 2).added
+    assert group.participant_count == repo.count_group_participants(session, group.id) == 2
+
+
+def test_join_is_idempotent_and_keeps_profile_changes():
+    session = create_session()
+    game_flow.register_private_chat(session, 1, "alice", "Alice", None)
+    first = join(session, 1)
+    again = join(session, 1)
+
+    assert first.added and not again.added
+    assert again.message == "You are already in this Secret Santa game!"
+    assert again.user.telegram_username == "user1"
+    assert again.user.has_private_chat
+    assert again.group.id == first.group.id
+    assert repo.count_group_participants(session, first.group.id) == 1
+
+
+def test_free_plan_cap_is_enforced_by_the_insert():
+    session = create_session()
+    results = [join(session, telegram_id) for telegram_id in range(1, 23)]
+
+    assert [result.added for result in results] == [True] * 20 + [False] * 2
+    assert results[-1].message == "This group is on the free plan and reached the 20 participant limit."
+    assert repo.count_group_participants(session, results[0].group.id) == 20
+    assert results[-1].group.participant_count == 20
+    assert join(session, 5).message == "You are already in this Secret Santa game!"
+
+
+def test_locked_and_finished_groups_turn_joins_away():
+    session = create_session()
+    group = join(session, 1).group
+    game_flow.lock_group(session, group)
+    session.commit()
+    assert join(session, 2).message == "This Secret Santa is locked. Ask an admin to unlock it."
+    assert join(session, 1).message == "You are already in this Secret Santa game!"
+
+    group.status = GroupStatus.ARCHIVED
+    session.commit()
+    assert join(session, 3).message == "This Secret Santa is already finished."
+
+
+def test_reconcile_repairs_drifted_counts():
+    session = create_session()
+    office = join(session, 1, chat_id=-100).group
+    join(session, 2, chat_id=-100)
+    family = join(session, 3, chat_id=-200).group
+    session.execute(
+        group_participants.delete().where(group_participants.c.group_id == office.id, group_participants.c.user_id == 1)
+    )
+    family.participant_count = 7
+    session.commit()
+
+    assert game_flow.reconcile_participant_counts(session) == 2
+    assert (office.participant_count, family.participant_count) == (1, 1)
+    assert game_flow.reconcile_participant_counts(session, [office.id]) == 0
@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError
+
+from app.db import NotificationOutbox, OutboxKind, OutboxStatus, repo
+from app.db.models import Base
+from app.db.session import AsyncSessionLocal, get_async_session, init_async_engine
+from app.services import game_flow
+from app.services.delivery import DeliveryEngine, DeliveryPolicy
+from app.services.outbox import OutboxWorker
+
+FAST_POLICY = DeliveryPolicy(messages_per_second=1000.0, per_chat_interval=0.0, max_attempts=1, backoff_base=0.0)
+
+
+class FakeBot:
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if chat_id in self.failures:
+            raise self.failures[chat_id]
+        self.sent.append((chat_id, text))
+
+
+async def setup_assigned_group(tmp_path):
+    engine = init_async_engine(f"sqlite:///{tmp_path / 'santa.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with get_async_session() as session:
+        for telegram_id, name in [(1, "alice"), (2, "bob"), (3, "carol")]:
+            await game_flow.register_private_chat_async(session, telegram_id, name, None, None)
+            result = await game_flow.join_group_async(session, telegram_id, name, None, None, -100, "Office")
+        await game_flow.assign_group_async(session, result.group, seed=3)
+    return engine
+
+
+async def list_outbox():
+    async with get_async_session() as session:
+        rows = await session.run_sync(lambda s: s.query(NotificationOutbox).order_by(NotificationOutbox.id).all())
+    return rows
+
+
+def run_scenario(tmp_path, bot):
+    async def scenario():
+        engine = await setup_assigned_group(tmp_path)
+        worker = OutboxWorker(engine=DeliveryEngine(FAST_POLICY), max_attempts=2, retry_base_seconds=0)
+        worker._bot = bot
+        processed = [await worker.drain_once() for _ in range(4)]
+        rows = await list_outbox()
+        await engine.dispose()
+        AsyncSessionLocal.configure(bind=None)
+        return processed, rows
+
+    return asyncio.run(scenario())
+
+
+def test_assignment_notifications_are_queued_with_assignments(tmp_path):
+    async def scenario():
+        engine = await setup_assigned_group(tmp_path)
+        rows = await list_outbox()
+        await engine.dispose()
+        AsyncSessionLocal.configure(bind=None)
+        return rows
+
+    rows = asyncio.run(scenario())
+    assert [row.kind for row in rows].count(OutboxKind.ASSIGNMENT) == 3
+    assert [row.kind for row in rows].count(OutboxKind.SUMMARY) == 1
+    assert all(row.status == OutboxStatus.PENDING for row in rows)
+    assert len({row.batch_id for row in rows}) == 1
+
+
+def test_worker_delivers_and_posts_summary_last(tmp_path):
+    bot = FakeBot()
+    processed, rows = run_scenario(tmp_path, bot)
+    assert processed[0] == 4
+    assert sorted(chat_id for chat_id, _ in bot.sent[:3]) == [1, 2, 3]
+    assert bot.sent[-1] == (-100, game_flow.DISTRIBUTION_COMPLETED_TEXT)
+    assert all(row.status == OutboxStatus.SENT for row in rows)
+
+
+def test_worker_dead_letters_and_reports_unreachable(tmp_path):
+    bot = FakeBot(
+        {
+            2: TelegramForbiddenError(method=None, message="bot was blocked by the user"),
+            3: TelegramNetworkError(method=None, message="timeout"),
+        }
+    )
+    processed, rows = run_scenario(tmp_path, bot)
+    statuses = {row.chat_id: row.status for row in rows}
+    assert statuses == {1: OutboxStatus.SENT, 2: OutboxStatus.DEAD, 3: OutboxStatus.DEAD, -100: OutboxStatus.SENT}
+    attempts = {row.chat_id: row.attempts for row in rows}
+    assert attempts[2] == 1
+    assert attempts[3] == 2
+    summary_text = bot.sent[-1][1]
+    assert "@bob" in summary_text and "@carol" in summary_text
+
+
+def test_summary_is_claimed_by_one_worker_at_a_time(tmp_path):
+    async def scenario():
+        engine = await setup_assigned_group(tmp_path)
+        async with get_async_session() as session:
+            rows = await session.run_sync(lambda s: s.query(NotificationOutbox).all())
+            for row in rows:
+                if row.kind == OutboxKind.ASSIGNMENT:
+                    row.status = OutboxStatus.SENT
+        now = datetime.datetime.utcnow()
+        lease_until = now + datetime.timedelta(minutes=5)
+        claims = []
+        for _ in range(2):
+            async with get_async_session() as session:
+                claimed = await session.run_sync(repo.claim_ready_summaries, now, lease_until, 10)
+                claims.append([row.kind for row in claimed])
+        await engine.dispose()
+        AsyncSessionLocal.configure(bind=None)
+        return claims
+
+    assert asyncio.run(scenario()) == [[OutboxKind.SUMMARY], []]
@@ -0,0 +1,115 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import GroupStatus, repo
+from app.db.models import Base
+from app.services import game_flow
+from app.services.participant_list import PAGE_CHAR_BUDGET, PAGE_SIZE, ParticipantSnapshot
+
+
+def create_session():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+
+def count_statements(session, call):
+    statements = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(session.get_bind(), "before_cursor_execute", record)
+    result = call()
+    event.remove(session.get_bind(), "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_participant_rows_are_projected_in_one_query(make_group):
+    session = create_session()
+    group, _ = make_group(session, 30, pro=True)
+    session.expunge_all()
+
+    rows, statements = count_statements(session, lambda: game_flow.list_participants(session, group))
+    assert statements == 1
+    assert [row.telegram_id for row in rows] == list(range(1, 31))
+    assert game_flow.format_user_label(rows[0]) == "@user1"
+    assert all(row.has_private_chat for row in rows)
+    # Rows are plain tuples; nothing is added to the identity map.
+    assert not list(session.identity_map.values())
+
+
+def test_participant_rows_page_and_stream_by_user_id(make_group):
+    session = create_session()
+    group, _ = make_group(session, 25, pro=True)
+
+    first = repo.list_group_participant_rows(session, group.id, limit=10)
+    second = repo.list_group_participant_rows(session, group.id, after_id=first[-1].id, limit=10)
+    assert [row.telegram_id for row in first + second] == list(range(1, 21))
+
+    streamed, statements = count_statements(
+        session, lambda: list(repo.iter_group_participant_rows(session, group.id, page_size=10))
+    )
+    assert [row.telegram_id for row in streamed] == list(range(1, 26))
+    assert statements == 3
+
+
+def test_groups_for_user_filter_by_status_in_one_query(make_group):
+    session = create_session()
+    office, _ = make_group(session, 3, chat_id=-100)
+    family, _ = make_group(session, 3, chat_id=-200)
+    family.status = GroupStatus.ARCHIVED
+    session.commit()
+    user = repo.get_user_by_telegram_id(session, 1)
+
+    assert repo.list_groups_for_user(session, user.id) == [office, family]
+    groups, statements = count_statements(
+        session, lambda: repo.list_groups_for_user(session, user.id, statuses=[GroupStatus.OPEN])
+    )
+    assert groups == [office]
+    assert statements == 1
+
+
+def test_snapshot_pages_stay_under_the_message_limit(make_group):
+    session = create_session()
+    group, _ = make_group(session, 130, pro=True)
+    snapshot = game_flow.participant_snapshot(session, group)
+
+    pages = [snapshot.page_after()]
+    while pages[-1].next_after is not None:
+        pages.append(snapshot.page_after(pages[-1].next_after))
+    assert [len(page.lines) for page in pages] == [PAGE_SIZE, PAGE_SIZE, 30]
+    assert sum((page.lines for page in pages), []) == snapshot.lines
+    assert [page.first for page in pages] == [1, 51, 101]
+    assert pages[0].prev_before is None
+
+    back = snapshot.page_before(pages[2].prev_before)
+    assert back == pages[1]
+    assert snapshot.page_before(pages[1].prev_before) == pages[0]
+
+    long_names = ParticipantSnapshot(ids=list(range(1, 41)), lines=["x" * 200] * 40, all_have_private_chat=True)
+    page = long_names.page_after()
+    assert len("\n".join(page.lines)) <= PAGE_CHAR_BUDGET
+    assert long_names.page_after(page.next_after).first == len(page.lines) + 1
+
+
+def test_snapshot_is_cached_until_someone_joins_or_starts_the_bot(make_group):
+    session = create_session()
+    group, _ = make_group(session, 3)
+
+    first, statements = count_statements(session, lambda: game_flow.participant_snapshot(session, group))
+    again, cached_statements = count_statements(session, lambda: game_flow.participant_snapshot(session, group))
+    assert again is first
+    assert statements == 1 and cached_statements == 0
+
+    game_flow.join_group(session, 4, "user4", None, None, -100, "Office")
+    session.commit()
+    joined = game_flow.participant_snapshot(session, group)
+    assert joined.lines[-1] == "@user4"
+    assert not joined.all_have_private_chat
+
+    game_flow.register_private_chat(session, 4, "user4", None, None)
+    session.commit()
+    started = game_flow.participant_snapshot(session, group)
+    assert started.lines[-1] == "@user4 ✓"
+    assert started.all_have_private_chat
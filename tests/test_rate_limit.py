@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from app.db.models import Base
+from app.db.session import AsyncSessionLocal, init_async_engine
+from app.services import rate_limit
+from app.services.rate_limit import MemoryRateLimitStore, RateLimiter, SqlRateLimitStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+@pytest.mark.parametrize("mode", [rate_limit.MODE_GCRA, rate_limit.MODE_WINDOW])
+def test_burst_then_block_then_recover(clock, mode):
+    limiter = RateLimiter(max_calls=5, period_seconds=10, store=MemoryRateLimitStore(mode=mode))
+
+    def allow(key):
+        return asyncio.run(limiter.allow(key))
+
+    assert all(allow("1:join").allowed for _ in range(5))
+
+    blocked = allow("1:join")
+    assert not blocked.allowed
+    assert 0 < blocked.retry_after <= 10
+    assert allow("2:join").allowed
+
+    clock.now += 10.5
+    assert allow("1:join").allowed
+
+
+def test_gcra_refills_one_call_per_emission_interval(clock):
+    store = MemoryRateLimitStore()
+    for _ in range(5):
+        store.record("key", 5, 10)
+    result = store.record("key", 5, 10)
+    assert result.retry_after == pytest.approx(2.0)
+
+    clock.now += 2.0
+    assert store.record("key", 5, 10).allowed
+    assert not store.record("key", 5, 10).allowed
+
+
+def test_sweep_evicts_idle_keys(clock):
+    store = MemoryRateLimitStore(shards=4, sweep_interval=1.0)
+    for user_id in range(100):
+        store.record(f"{user_id}:join", 5, 10)
+    assert store.stats()["keys"] == 100
+
+    clock.now += 11
+    for _ in range(4):
+        clock.now += 1
+        store.record("active:join", 5, 10)
+    stats = store.stats()
+    assert stats["keys"] <= 1
+    assert stats["evicted_idle"] == 100
+
+
+def test_hard_cap_drops_least_recently_used_keys(clock):
+    store = MemoryRateLimitStore(max_keys=64, shards=4)
+    for user_id in range(1000):
+        store.record(f"{user_id}:wishlist", 5, 10)
+    stats = store.stats()
+    assert stats["keys"] <= 64
+    assert stats["evicted_forced"] >= 1000 - 64
+    assert stats["memory_bytes"] > 0
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        MemoryRateLimitStore(mode="leaky")
+
+
+def test_sql_store_shares_limits_and_batches_hits(tmp_path):
+    async def scenario():
+        engine = init_async_engine(f"sqlite:///{tmp_path / 'santa.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        store = SqlRateLimitStore()
+        first = RateLimiter(max_calls=3, period_seconds=60, store=store)
+        # A second limiter on a fresh store stands in for another worker process.
+        second = RateLimiter(max_calls=3, period_seconds=60, store=SqlRateLimitStore())
+
+        burst = await asyncio.gather(*(first.allow(f"{user_id}:join") for user_id in range(50)))
+        round_trips = store.round_trips
+        repeated = await asyncio.gather(*(first.allow("7:wish") for _ in range(2)))
+        elsewhere = [await second.allow("7:wish") for _ in range(2)]
+
+        await engine.dispose()
+        AsyncSessionLocal.configure(bind=None)
+        return burst, round_trips, repeated, elsewhere, store.stats()
+
+    burst, round_trips, repeated, elsewhere, stats = asyncio.run(scenario())
+    assert all(result.allowed for result in burst)
+    assert round_trips == 1
+    assert all(result.allowed for result in repeated)
+    assert elsewhere[0].allowed
+    assert not elsewhere[1].allowed
+    assert 0 < elsewhere[1].retry_after <= 20
+    assert stats["fallbacks"] == 0
+
+
+def test_sql_store_falls_back_to_local_limits_without_a_database():
+    limiter = RateLimiter(max_calls=1, period_seconds=60, store=SqlRateLimitStore())
+
+    async def scenario():
+        return [await limiter.allow("1:start") for _ in range(2)]
+
+    first, second = asyncio.run(scenario())
+    assert first.allowed
+    assert not second.allowed
+    assert limiter.stats()["fallbacks"] == 2
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from app.db import GroupStatus
+from app.db.models import Base
+from app.db.session import AsyncSessionLocal, init_async_engine
+from app.services import game_flow
+from app.services.assignment import AssignmentError, AssignmentJob
+from app.services.solver import SolverPool
+
+
+def constrained_job(time_budget=None):
+    participants = list(range(1, 41))
+    return AssignmentJob(
+        group_id=7,
+        participant_ids=participants,
+        exclusions=[(giver, giver + 1) for giver in participants[:-1]],
+        no_repeat_map={},
+        seed=3,
+        time_budget=time_budget,
+    )
+
+
+def test_thread_pool_solves_jobs_off_the_event_loop():
+    pool = SolverPool(max_workers=2)
+
+    async def scenario():
+        return await asyncio.gather(*(pool.solve(constrained_job()) for _ in range(3)))
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    for result in results:
+        assert result.group_id == 7 and not result.timed_out
+        assert sorted(result.assignments) == sorted(result.assignments.values()) == list(range(1, 41))
+        assert all(result.assignments[giver] != giver + 1 for giver in range(1, 40))
+
+
+def test_exhausted_budget_reports_a_timeout():
+    pool = SolverPool(time_budget=0)
+    try:
+        result = asyncio.run(pool.solve(constrained_job()))
+    finally:
+        pool.shutdown()
+    assert result.timed_out
+    assert result.assignments is None
+
+
+def test_unknown_executor_is_rejected():
+    with pytest.raises(ValueError):
+        SolverPool(kind="fibers")
+
+
+def test_assign_group_async_uses_the_solver_pool(tmp_path, monkeypatch, make_group):
+    def create_group(session):
+        group, (alice, bob, _, _) = make_group(session, ["alice", "bob", "carol", "dave"], pro=True)
+        game_flow.add_exclusion(session, group, alice, bob, symmetric=True)
+        session.commit()
+        return group
+
+    async def scenario(name, time_budget):
+        engine = init_async_engine(f"sqlite:///{tmp_path / name}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        pool = SolverPool(time_budget=time_budget)
+        monkeypatch.setattr(game_flow, "solver_pool", pool)
+        try:
+            async with AsyncSessionLocal() as session:
+                group = await session.run_sync(create_group)
+                return await game_flow.assign_group_async(session, group, seed=5)
+        finally:
+            pool.shutdown()
+            await engine.dispose()
+            AsyncSessionLocal.configure(bind=None)
+
+    result = asyncio.run(scenario("solved.db", 5.0))
+    assert len(result.assignments) == 4
+    assert result.group.status == GroupStatus.ASSIGNED
+
+    with pytest.raises(AssignmentError) as excinfo:
+        asyncio.run(scenario("timeout.db", 0))
+    assert str(excinfo.value) == game_flow.SOLVER_TIMEOUT_TEXT
+
+
+def test_group_is_unlocked_while_solving_and_a_stale_draw_is_solved_again(tmp_path, monkeypatch, make_group):
+    class JoiningPool(SolverPool):
+        jobs = []
+
+        async def solve(self, job):
+            self.jobs.append(job)
+            if len(self.jobs) == 1:
+                # Would wait on the group lock if the draw still held it.
+                async with AsyncSessionLocal() as other:
+                    await other.run_sync(game_flow.register_private_chat, 5, "erin", "Erin", None)
+                    await other.run_sync(game_flow.join_group, 5, "erin", "Erin", None, -100, "Office")
+                    await other.commit()
+            return await super().solve(job)
+
+    async def scenario():
+        engine = init_async_engine(f"sqlite:///{tmp_path / 'santa.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        pool = JoiningPool()
+        monkeypatch.setattr(game_flow, "solver_pool", pool)
+        try:
+            async with AsyncSessionLocal() as session:
+                group, _ = await session.run_sync(make_group, ["alice", "bob", "carol", "dave"])
+                result = await game_flow.assign_group_async(session, group, seed=5)
+                await session.commit()
+                return result, pool.jobs
+        finally:
+            pool.shutdown()
+            await engine.dispose()
+            AsyncSessionLocal.configure(bind=None)
+
+    result, jobs = asyncio.run(scenario())
+    assert [len(job.participant_ids) for job in jobs] == [4, 5]
+    assert len(result.assignments) == 5
+    assert result.group.status == GroupStatus.ASSIGNED
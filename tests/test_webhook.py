@@ -0,0 +1,85 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.api.webhook import build_webhook_app
+from app.core.config import Settings
+
+SETTINGS = Settings(
+    bot_token="42:TEST",
+    database_url="sqlite://",
+    log_level="INFO",
+    log_path="test.log",
+    mode="webhook",
+    webhook_url="https://example.com",
+    webhook_secret="s3cret",
+    webhook_max_in_flight=2,
+)
+
+
+def make_update(update_id):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": update_id, "type": "private"},
+            "text": "hello",
+        },
+    }
+
+
+def build_dispatcher(state):
+    dp = Dispatcher()
+
+    @dp.message()
+    async def slow_handler(message):
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        await asyncio.sleep(0.05)
+        state["running"] -= 1
+        state["done"].append(message.message_id)
+
+    return dp
+
+
+def run_client(scenario):
+    async def runner():
+        state = {"running": 0, "max_running": 0, "done": []}
+        app = build_webhook_app(build_dispatcher(state), Bot(token=SETTINGS.bot_token), SETTINGS)
+        client = TestClient(TestServer(app))
+        await client.start_server()
+        try:
+            result = await scenario(client)
+        finally:
+            await client.close()
+        return state, result
+
+    return asyncio.run(runner())
+
+
+def test_rejects_wrong_secret_token():
+    async def scenario(client):
+        response = await client.post(
+            "/webhook", json=make_update(1), headers={"X-Telegram-Bot-Api-Secret-Token": "nope"}
+        )
+        return response.status
+
+    state, status = run_client(scenario)
+    assert status == 401
+    assert state["done"] == []
+
+
+def test_limits_in_flight_updates_and_drains_on_shutdown():
+    async def scenario(client):
+        headers = {"X-Telegram-Bot-Api-Secret-Token": SETTINGS.webhook_secret}
+        responses = await asyncio.gather(
+            *(client.post("/webhook", json=make_update(i), headers=headers) for i in range(1, 6))
+        )
+        return [response.status for response in responses]
+
+    state, statuses = run_client(scenario)
+    assert statuses == [200] * 5
+    assert state["max_running"] <= SETTINGS.webhook_max_in_flight
+    assert sorted(state["done"]) == [1, 2, 3, 4, 5]
@@ -0,0 +1,40 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import NotificationOutbox, OutboxKind, repo
+from app.db.models import Base
+from app.services import game_flow
+
+
+def create_session():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+
+def test_wishlists_for_group_in_one_query(make_group):
+    session = create_session()
+    group, (alice, bob, carol) = make_group(session, ["alice", "bob", "carol"], pro=True)
+    repo.add_wishlist_item(session, group.id, alice.id, "socks")
+    repo.add_wishlist_item(session, group.id, alice.id, "tea")
+    repo.add_wishlist_item(session, group.id, bob.id, "book")
+    session.commit()
+
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    wishlists = repo.list_wishlist_items_for_group(session, group.id, [alice.id, bob.id, carol.id])
+
+    assert wishlists == {alice.id: ["socks", "tea"], bob.id: ["book"], carol.id: []}
+    assert len(statements) == 1
+
+
+def test_assignment_messages_include_receiver_wishlist(make_group):
+    session = create_session()
+    group, (alice, bob) = make_group(session, ["alice", "bob"], pro=True)
+    game_flow.add_wishlist_item(session, group, bob.id, "board game")
+    game_flow.assign_group(session, group, seed=1)
+    session.commit()
+
+    message = session.query(NotificationOutbox).filter_by(kind=OutboxKind.ASSIGNMENT, chat_id=alice.telegram_id).one()
+    assert "@bob" in message.text
+    assert "- board game" in message.text